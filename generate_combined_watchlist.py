@@ -2,16 +2,21 @@
 Combined Watchlist Generator: Top 25 CDC + Fibo Opportunities
 รวมทั้ง Trend Following (CDC) และ Mean Reversion (Fibo)
 
-รอบการทำงาน:
-  - Round 1: 21:35 น. ไทย (14:35 UTC) → Full Scan 500+ หุ้น + สร้าง Watchlist
-  - Round 2: 03:30 น. ไทย (20:30 UTC) → ใช้ Watchlist เดิม (ไม่ต้อง Rescan)
+รอบการทำงาน (ตัดสินจากปฏิทิน NYSE, วันหยุดตลาดจะข้ามทั้งหมด):
+  - Round 1: ภายใน 2 ชม. แรกหลังตลาดเปิด (cron 14:35 UTC) → Full Scan 500+ หุ้น + สร้าง Watchlist
+  - Round 2: ช่วงบ่ายของ session (cron 19:30 UTC) → ใช้ Watchlist เดิม (ไม่ต้อง Rescan)
 """
 
+import src.config as config
+from src.data.market_calendar import MarketCalendar
 from src.engine.scanner import MarketScanner
 from src.data.market_data import MarketData
-from src.strategies.cdc_action_zone import CDCActionZone
+from src.data.history_cache import date_column
+from src.strategies.cdc_action_zone import CDCActionZone, ZONE_GREEN
 from src.strategies.fibo_strategy import FiboZoneStrategy
 import json
+import numpy as np
+import pandas as pd
 from datetime import datetime, timezone, timedelta
 
 # ============================================================
@@ -23,27 +28,22 @@ def get_thai_time():
     """คืนเวลาปัจจุบันในเขตเวลาไทย (UTC+7)"""
     return datetime.now(THAI_TZ)
 
-def is_round1_scan_time(tolerance_minutes=30):
+def is_round1_scan_time(window_minutes=config.ROUND1_WINDOW_MINUTES):
     """
-    ตรวจสอบว่าเป็นเวลา Round 1 (21:35 น. ไทย) หรือไม่
-    คืนค่า True ถ้าอยู่ในช่วง ±tolerance_minutes จากเวลาเป้าหมาย
+    ตรวจสอบว่าเป็นเวลา Round 1 หรือไม่ (ตามปฏิทิน NYSE ไม่ใช่นาฬิกาไทย)
+    คืนค่า True ถ้าตลาดเปิดอยู่ และเพิ่งเปิดมาไม่เกิน window_minutes นาที
     
-    Round 1 Target: 21:35 น. ไทย → ช่วง 21:05 - 22:05 น.
-    Round 2 Target: 03:30 น. ไทย → ใช้ Watchlist เดิม ไม่ต้อง Rescan
+    ใช้ MarketCalendar จึงถูกต้องทั้งช่วง EST/EDT, วันหยุดตลาด และวันปิดเร็ว
+    Round 2 (ช่วงหลังของ session) → ใช้ Watchlist เดิม ไม่ต้อง Rescan
     """
-    now = get_thai_time()
-    thai_hour = now.hour
-    thai_min = now.minute
-    total_minutes = thai_hour * 60 + thai_min
+    calendar = MarketCalendar()
+    minutes = calendar.minutes_since_open()
+    is_round1 = minutes is not None and minutes <= window_minutes
     
-    # Target Round 1 = 21:35 น. = 21*60+35 = 1295 นาที
-    target_round1 = 21 * 60 + 35
-    diff = abs(total_minutes - target_round1)
-    
-    is_round1 = diff <= tolerance_minutes
-    
-    print(f"[TIME CHECK] เวลาไทยปัจจุบัน: {now.strftime('%Y-%m-%d %H:%M:%S %Z')}")
-    print(f"[TIME CHECK] เป้าหมาย Round 1: 21:35 น. ไทย (ค่าเบี่ยงเบน: {diff} นาที, tolerance: ±{tolerance_minutes} นาที)")
+    print(f"[TIME CHECK] เวลาไทยปัจจุบัน: {get_thai_time().strftime('%Y-%m-%d %H:%M:%S %Z')}")
+    print(f"[TIME CHECK] {calendar.describe()}")
+    if minutes is not None:
+        print(f"[TIME CHECK] เปิดตลาดมาแล้ว {minutes:.0f} นาที (Round 1: ภายใน {window_minutes} นาทีแรก)")
     print(f"[TIME CHECK] → {'✅ Round 1 (Full Scan)' if is_round1 else '⏩ Round 2 (Use Existing Watchlist)'}")
     
     return is_round1
@@ -98,28 +98,37 @@ def generate_combined_watchlist():
     cdc_opportunities = []
     fibo_opportunities = []
     
-    # สแกนทุกหุ้น
+    # ดึงข้อมูลทุกหุ้นในครั้งเดียว (get_history_many: request พร้อมกัน + cache)
+    histories = market_data.get_history_many(ALL_SYMBOLS, period='6mo')
+    
+    # จัดกลุ่มหุ้นที่มีวันที่ (แท่งเทียน) ตรงกันทุกแท่ง แล้วคำนวณ CDC/Fibo ทั้งกลุ่มเป็น Matrix เดียว
+    # หุ้นที่ขาดแท่งบางวันจะอยู่กลุ่มของตัวเอง จึงคำนวณบนวันที่ของตัวเองเหมือนเดิม
+    # (ไม่มี NaN แทรกใน rolling window ของ swing high/low หรือ change_pct)
+    groups = {}
     for symbol in ALL_SYMBOLS:
-        try:
-            print(f"  Scanning {symbol}...", end='\r')
-            
-            # ดึงข้อมูล
-            df = market_data.get_history(symbol, period='6mo')
-            if df.empty or len(df) < 120:
-                continue
-            
-            # วิเคราะห์ด้วย CDC
-            df_cdc = cdc_strategy.calculate(df.copy())
-            last_row = df_cdc.iloc[-1]
-            prev_row = df_cdc.iloc[-2]
-            
-            current_price = last_row['Close']
-            prev_price = prev_row['Close']
-            change_pct = ((current_price - prev_price) / prev_price) * 100
+        df = histories.get(symbol)
+        if df is None or df.empty or len(df) < 120:
+            continue
+        key = pd.DatetimeIndex(df[date_column(df)]).asi8.tobytes()
+        groups.setdefault(key, []).append(symbol)
+    
+    def scan_group(symbols):
+        close = np.column_stack([histories[s]['Close'].to_numpy(dtype=float) for s in symbols])
+        high = np.column_stack([histories[s]['High'].to_numpy(dtype=float) for s in symbols])
+        low = np.column_stack([histories[s]['Low'].to_numpy(dtype=float) for s in symbols])
+        
+        cdc = cdc_strategy.calculate_matrix(close)
+        fibo = fibo_strategy.calculate_matrix(close, high, low)
+        change_pct_all = (close[-1] - close[-2]) / close[-2] * 100
+        
+        cdc_found, fibo_found = [], []
+        for j, symbol in enumerate(symbols):
+            current_price = close[-1, j]
+            change_pct = change_pct_all[j]
             
             # CDC Signal (Green = Buy)
-            if last_row['Color'] == 'Green':
-                cdc_opportunities.append({
+            if cdc['zone'][-1, j] == ZONE_GREEN:
+                cdc_found.append({
                     'symbol': symbol,
                     'strategy': 'CDC',
                     'price': current_price,
@@ -128,15 +137,11 @@ def generate_combined_watchlist():
                     'signal_strength': 'Strong' if change_pct > 2 else 'Moderate'
                 })
             
-            # วิเคราะห์ด้วย Fibo
-            df_fibo = fibo_strategy.calculate(df.copy())
-            last_fibo = df_fibo.iloc[-1]
-            
             # Fibo Signal (In Zone = Buy)
-            if last_fibo.get('In_Fibo_Zone', False):
+            if fibo['in_zone'][-1, j]:
                 # คำนวณ % ที่ตกลงมา
-                swing_high = last_fibo['Swing_High']
-                swing_low = last_fibo['Swing_Low']
+                swing_high = fibo['swing_high'][-1, j]
+                swing_low = fibo['swing_low'][-1, j]
                 fibo_range = swing_high - swing_low
                 
                 if fibo_range > 0:
@@ -144,20 +149,36 @@ def generate_combined_watchlist():
                     
                     # เช็คว่าอยู่ในช่วง 50-78.6% จริงๆ
                     if 50 <= retracement_pct <= 78.6:
-                        fibo_opportunities.append({
+                        fibo_found.append({
                             'symbol': symbol,
                             'strategy': 'Fibo',
                             'price': current_price,
                             'swing_high': swing_high,
                             'swing_low': swing_low,
                             'retracement_pct': retracement_pct,
-                            'fibo_500': last_fibo['Fibo_500'],
-                            'fibo_786': last_fibo['Fibo_786'],
+                            'fibo_500': fibo['fibo_500'][-1, j],
+                            'fibo_786': fibo['fibo_786'][-1, j],
                             'discount': 'Deep' if retracement_pct > 65 else 'Moderate'
                         })
-        
-        except Exception as e:
-            continue
+        return cdc_found, fibo_found
+    
+    # สแกนทุกกลุ่ม
+    for symbols in groups.values():
+        try:
+            cdc_found, fibo_found = scan_group(symbols)
+        except Exception:
+            # กลุ่มพัง → สแกนทีละหุ้น เพื่อไม่ให้หุ้นตัวเดียวทำให้ทั้งกลุ่มหายไป
+            cdc_found, fibo_found = [], []
+            for symbol in symbols:
+                try:
+                    found = scan_group([symbol])
+                except Exception as e:
+                    print(f"  Error scanning {symbol}: {e}")
+                    continue
+                cdc_found.extend(found[0])
+                fibo_found.extend(found[1])
+        cdc_opportunities.extend(cdc_found)
+        fibo_opportunities.extend(fibo_found)
     
     print(" " * 80, end='\r')  # Clear line
     
@@ -241,19 +262,26 @@ if __name__ == "__main__":
     # ตรวจสอบว่า Force scan หรือไม่ (ส่ง argument "--force-scan" เพื่อ Force)
     force_scan = "--force-scan" in sys.argv
     
+    # วันหยุดตลาด / เสาร์-อาทิตย์ → ไม่ต้องสแกน เก็บ Watchlist เดิมไว้
+    calendar = MarketCalendar()
+    if not force_scan and not calendar.is_trading_day():
+        print(f"[SKIP] {calendar.describe()}")
+        print("[SKIP] วันนี้ตลาดปิด → ไม่สแกน (Watchlist เดิมยังใช้ต่อได้)")
+        sys.exit(0)
+    
     if force_scan:
         print("[MODE] Force Scan: ข้ามการตรวจสอบเวลา → Full Scan ทันที")
         watchlist = generate_combined_watchlist()
     
-    elif is_round1_scan_time(tolerance_minutes=30):
-        # ✅ Round 1: 21:35 น. ไทย → Full Scan + สร้าง Watchlist ใหม่
-        print("\n[ROUND 1] 21:35 น. ไทย → Full Scan 500+ หุ้น + สร้าง Watchlist ใหม่")
+    elif is_round1_scan_time():
+        # ✅ Round 1: ช่วงต้น session → Full Scan + สร้าง Watchlist ใหม่
+        print("\n[ROUND 1] ช่วงต้น session → Full Scan 500+ หุ้น + สร้าง Watchlist ใหม่")
         print("=" * 80)
         watchlist = generate_combined_watchlist()
     
     else:
-        # ⏩ Round 2: 03:30 น. ไทย → ใช้ Watchlist เดิม ไม่ต้อง Rescan
-        print("\n[ROUND 2] 03:30 น. ไทย → ใช้ Watchlist เดิม (ประหยัด API Quota)")
+        # ⏩ Round 2: ช่วงหลังของ session → ใช้ Watchlist เดิม ไม่ต้อง Rescan
+        print("\n[ROUND 2] ช่วงหลังของ session → ใช้ Watchlist เดิม (ประหยัด API Quota)")
         print("=" * 80)
         
         watchlist_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "watchlist.json")
@@ -276,6 +304,7 @@ if __name__ == "__main__":
     print("[DONE] ขั้นตอนถัดไป:")
     print("  1. Push ไป GitHub: git add data/ && git commit -m 'Update' && git push")
     print("  2. GitHub Actions จะรัน run_phase2_gh_action.py อัตโนมัติ 2 รอบ/วัน")
-    print("     - Round 1: 21:35 น. ไทย (Full Scan)")
-    print("     - Round 2: 03:30 น. ไทย (Trade Only)")
+    print("     - Round 1: 14:35 UTC, ช่วงต้น session (Full Scan)")
+    print("     - Round 2: 19:30 UTC, ช่วงบ่ายของ session (Trade Only)")
+    print("     (ข้ามวันหยุดตลาด NYSE อัตโนมัติ)")
     print("=" * 80)
@@ -173,12 +173,14 @@ def generate_top25_watchlist(strategy='hybrid'):
     # คำนวณคะแนนแต่ละหุ้น
     scored_stocks = []
     
+    # ดึงข้อมูลเพิ่มเติมของทุก Signal แบบ Batch
+    histories = market_data.get_history_many([sig['symbol'] for sig in all_signals], period='1mo')
+    
     for sig in all_signals:
         symbol = sig['symbol']
         
-        # ดึงข้อมูลเพิ่มเติม (ถ้าต้องการ)
         try:
-            df = market_data.get_history(symbol, period='1mo')
+            df = histories[symbol]
             score, details = calculate_score(symbol, sig, df)
             
             scored_stocks.append({
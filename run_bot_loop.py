@@ -1,10 +1,16 @@
-import time
+import asyncio
 import datetime
-import schedule
 import sys
+import threading
 import traceback
+import src.config as config
+from src.data.strategy_stats import StrategyStats
+from src.data.market_calendar import MarketCalendar
 from src.engine.scanner import MarketScanner
+from src.engine.async_scheduler import AsyncScheduler
 from src.execution.order_manager import OrderManager
+from src.execution.fill_simulator import fresh_quotes
+from src.execution.trade_store import TradeStore
 from src.risk.risk_manager import RiskManager
 from src.notification.alert_engine import AlertEngine
 
@@ -14,118 +20,253 @@ class AutonomousBot:
         self.alert_system.send_alert("SYSTEM", "Initializing StockRobo-US01...", "INFO")
         
         try:
-            self.scanner = MarketScanner()
-            self.order_manager = OrderManager(cash_balance=50000.0) # Paper Portfolio
+            # Backtest-derived win rates, kept current by the scanner (see run_strategy_stats.py)
+            self.stats = StrategyStats(config.STRATEGY_STATS_FILE, min_trades=config.STRATEGY_STATS_MIN_TRADES)
+            self.scanner = MarketScanner(max_workers=config.SCAN_MAX_WORKERS,
+                                         symbol_timeout=config.SCAN_SYMBOL_TIMEOUT_SECONDS,
+                                         incremental_state_file=config.CDC_STATE_FILE,
+                                         stats=self.stats, strategy_name='Scanner_CDC')
+            self.order_manager = OrderManager(cash_balance=50000.0, # Paper Portfolio
+                                              trade_store=TradeStore(config.TRADE_DB_FILE))
             self.risk_manager = RiskManager(portfolio_value=50000.0, risk_per_trade_pct=2.0)
             self.target_symbols = [
                 'SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD'
             ]
             self.is_running = True
+            self.scheduler = None
+            self.calendar = MarketCalendar()
+            self.warmed_session = None  # Open time of the session the cache was last warmed for
+            # A timed-out scan is cancelled but its order thread cannot be; the next
+            # scan's orders wait for it instead of sizing against the same cash
+            self.execution_lock = threading.Lock()
             self.alert_system.send_alert("SYSTEM", "Initialization Complete.", "INFO")
         except Exception as e:
             self.alert_system.send_alert("CRITICAL", f"Initialization Failed: {e}", "CRITICAL")
             raise e
 
-    def heartbeat(self):
-        """Simple check to show bot is alive."""
+    async def heartbeat(self):
+        """Simple check to show bot is alive, with the scan job's latency."""
         # Using a lower log level or just console for heartbeat to avoid flooding logs?
         # For now, let's keep it visible but maybe distinct.
-        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [HEARTBEAT] System Operational.")
+        status = ""
+        if self.scheduler is not None:
+            scan = self.scheduler.stats().get('market_scan', {})
+            if scan.get('last_duration') is not None:
+                status = (f" Scan: last {scan['last_duration']:.1f}s, p95 {scan['p95_duration']:.1f}s, "
+                          f"runs {scan['runs']}, skipped {scan['skipped']}, coalesced {scan['coalesced']}"
+                          f"{' (running)' if scan['running'] else ''}")
+        print(f"[{datetime.datetime.now().strftime('%H:%M:%S')}] [HEARTBEAT] System Operational. "
+              f"{self.calendar.describe()}.{status}")
+
+    def is_scan_time(self) -> bool:
+        """Scan gate for the scheduler: regular NYSE session only (unless disabled in config)."""
+        return not config.MARKET_HOURS_ONLY or self.calendar.is_open()
+
+    def is_warmup_time(self) -> bool:
+        """True in the last PRE_OPEN_WARMUP_MINUTES before an open the cache was not yet warmed for."""
+        if not config.MARKET_HOURS_ONLY or self.calendar.is_open():
+            return False
+        next_open = self.calendar.next_open()
+        if next_open == self.warmed_session:
+            return False
+        return self.calendar.seconds_until_open() <= config.PRE_OPEN_WARMUP_MINUTES * 60
+
+    def job_pre_open_warmup(self):
+        """Load history for the watchlist before the open so the first scan starts warm."""
+        next_open = self.calendar.next_open()
+        loaded = self.scanner.warm_cache(self.target_symbols)
+        self.warmed_session = next_open
+        self.alert_system.send_alert("SYSTEM", f"Pre-open cache warm-up: {loaded}/{len(self.target_symbols)} symbols "
+                                               f"ready for the {next_open.strftime('%Y-%m-%d %H:%M %Z')} open.", "INFO")
 
     def job_market_scan(self):
         """
         Main Routine: Scan -> Signal -> Size -> Execute
         """
+        asyncio.run(self.job_market_scan_async())
+
+    async def job_market_scan_async(self):
+        """
+        Streaming version of the main routine. Scanner events are handled as
+        soon as their symbol is evaluated (alerts, error reporting, orders):
+        the first buy signal is sized and executed right away, and the ones
+        arriving while an execution is in flight are ranked together and go
+        out as the next batch, sized against the cash left at that point.
+        Trade-off: ranking only spans signals that arrive together, so an
+        early lower-ranked signal can take cash a later, better one wanted.
+        Telegram alerts of the whole cycle go out as one digest message when it ends.
+        """
+        with self.alert_system.digest("Market Scan"):
+            await self._scan_cycle()
+
+    async def _scan_cycle(self):
         self.alert_system.send_alert("SCANNER", "Starting Scheduled Market Scan...", "INFO")
+        execution = None
         
         try:
-            # 1. Scan
-            results = self.scanner.scan(self.target_symbols)
-            
-            # Combine signals (Buy + Sell if we were handling shorts/exits)
-            # For this demo phase, let's focus on BUY signals from Scanner
             signals = []
+            pending = []   # buy signals not yet handed to execution
+            errors = []
+            orders_sent = 0
+
+            async def drain():
+                # Batches everything that arrived while the previous batch executed
+                nonlocal orders_sent
+                while pending:
+                    batch = pending[:]
+                    pending.clear()
+                    orders_sent += await asyncio.to_thread(self.execute_signals, batch)
             
-            # Process Buy Signals
-            for item in results.get('buy_signals', []):
-                # Alert for each signal found
-                self.alert_system.send_alert("SIGNAL", f"Found BUY signal: {item['symbol']} at {item['price']:.2f}", "INFO")
+            # 1. Scan (streamed)
+            async for event in self.scanner.scan_stream(self.target_symbols):
+                if event['type'] == 'error':
+                    # Symbols that failed or timed out do not block the rest of the cycle
+                    errors.append(event['symbol'])
                 
-                # Enrich signal with Strategy Tag (Scanner mostly does CDC currently)
-                item['strategy'] = 'Scanner_CDC' # Simplification
-                # Mock win rate for simulation
-                item['win_rate'] = 75.0 
-                signals.append(item)
+                elif event['type'] == 'heavy_drop':
+                    # Process Heavy Drops (Alert Only for now)
+                    self.alert_system.send_alert("WATCH", f"Heavy Drop Detected: {event['symbol']} ({event['change_pct']:.2f}%)", "WARNING")
+                    # In real implementation, FiboStrategy would run here
                 
-            # Process Heavy Drops (Alert Only for now)
-            for item in results.get('heavy_drops', []):
-                 self.alert_system.send_alert("WATCH", f"Heavy Drop Detected: {item['symbol']} ({item['change_pct']:.2f}%)", "WARNING")
-                 # In real implementation, FiboStrategy would run here
-                 pass
+                elif event['type'] == 'buy':
+                    # Process Buy Signals
+                    # (Sell signals are not acted on yet: long-only, no exits in this phase)
+                    item = {k: v for k, v in event.items() if k != 'type'}
+                    self.alert_system.send_alert("SIGNAL", f"Found BUY signal: {item['symbol']} at {item['price']:.2f}", "INFO")
+                    
+                    # Enrich signal with Strategy Tag (Scanner mostly does CDC currently)
+                    item['strategy'] = 'Scanner_CDC' # Simplification
+                    # Win rate / expectancy from the stats store (O(1) lookup)
+                    self.stats.enrich(item)
+                    signals.append(item)
+                    pending.append(item)
+                    # 2. Size & execute while the scan goes on
+                    # (in a worker thread so order handling never blocks the event loop)
+                    if execution is None or execution.done():
+                        if execution is not None:
+                            execution.result()   # surface a failed batch
+                        execution = asyncio.create_task(drain())
+            
+            if execution is not None:
+                await execution
+            if errors:
+                self.alert_system.send_alert("SCANNER", f"{len(errors)} symbols skipped: {', '.join(errors)}", "INFO")
 
             if not signals:
                 self.alert_system.send_alert("SCANNER", "No actionable signals found this cycle.", "INFO")
-                return
-
-            self.alert_system.send_alert("OPPORTUNITY", f"Found {len(signals)} potential candidates.", "INFO")
+                if not self.order_manager.working_orders:
+                    return
+                # Working orders left unfilled by earlier cycles are still retried
+                orders_sent = await asyncio.to_thread(self.execute_signals, [])
+            else:
+                self.alert_system.send_alert("OPPORTUNITY", f"Found {len(signals)} potential candidates.", "INFO")
             
-            # 2. Prioritize
-            ranked_signals = self.order_manager.prioritize_signals(signals)
+            if orders_sent:
+                self.alert_system.send_alert("EXECUTION", f"Sent {orders_sent} orders to market.", "INFO")
             
-            # 3. Execution Loop
-            orders_to_send = []
-            for sig in ranked_signals:
-                # Check Risk/Sizing
-                # stop loss logic usually comes from strategy. 
-                # For scanner results, we might assume a trailing stop or % stop
-                # Let's mock a Stop Loss 5% below entry for scanner results
-                entry_price = sig['price']
-                stop_price = entry_price * 0.95
-                
-                sizing = self.risk_manager.calculate_position_size(entry_price, stop_price)
-                if sizing['shares'] > 0:
-                    sig['entry'] = entry_price # Normalize keys
-                    
-                    order = self.order_manager.create_order(sig, sizing)
-                    if order:
-                        orders_to_send.append(order)
-                        self.alert_system.send_alert("ORDER_GEN", f"Generated Order for {sig['symbol']}: {sizing['shares']} shares", "INFO")
-            
-            # 4. Execute
-            if orders_to_send:
-                self.order_manager.execute_orders(orders_to_send)
-                self.alert_system.send_alert("EXECUTION", f"Sent {len(orders_to_send)} orders to market.", "INFO")
-            
-            # 5. Reconcile
-            self.order_manager.reconcile()
+            # 3. Reconcile
+            await asyncio.to_thread(self.order_manager.reconcile)
 
+        except asyncio.CancelledError:
+            # Shutdown or job timeout: the scanner cancels its own pending work
+            self.alert_system.send_alert("SCANNER", "Market scan cancelled.", "WARNING")
+            raise
         except Exception as e:
             self.alert_system.send_alert("ERROR", f"Error during market scan loop: {e}", "ERROR")
             traceback.print_exc() 
             # We do NOT raise here, effectively keeping the loop alive despite a crash in this job.
+        finally:
+            # A batch already in its worker thread finishes under the execution lock
+            if execution is not None and not execution.done():
+                execution.cancel()
 
-    def start_loop(self):
-        self.alert_system.send_alert("SYSTEM", "StockRobo-US01: Autonomous Loop STARTED", "INFO")
-        self.alert_system.send_alert("SYSTEM", f"Monitoring {len(self.target_symbols)} Symbols", "INFO")
-        
-        # Schedule Jobs
-        # In real world: Market hours check. Here: Run every 1 minute for DEMO.
-        schedule.every(1).minutes.do(self.job_market_scan)
-        schedule.every(30).seconds.do(self.heartbeat)
+    def execute_signals(self, signals) -> int:
+        """
+        Prioritize a batch of buy signals together, size them against the cash
+        left after each higher-ranked one, and execute the orders as one batch
+        (with the working orders of earlier cycles) against fresh quotes taken
+        now, never the bar the signals were computed on.
+        After a batch with fills the portfolio snapshot is rewritten, so the
+        portfolio_state.json the dashboard reads stays current during the session.
+        Returns the number of orders filled.
+        """
+        with self.execution_lock:
+            filled = self._execute_signals(signals)
+            if filled:
+                self.order_manager.save_state()
+            return filled
+
+    def _execute_signals(self, signals) -> int:
+        ranked_signals = self.order_manager.prioritize_signals(signals) if signals else []
+        temp_cash = self.order_manager.cash_balance
+        orders = []
         
-        # Initial Run immediately
-        self.job_market_scan()
+        for sig in ranked_signals:
+            # Check Risk/Sizing
+            # stop loss logic usually comes from strategy. 
+            # For scanner results, we might assume a trailing stop or % stop
+            # Let's mock a Stop Loss 5% below entry for scanner results
+            entry_price = sig['price']
+            stop_price = entry_price * 0.95
+            
+            sizing = self.risk_manager.calculate_position_size(entry_price, stop_price)
+            cost = sizing['shares'] * entry_price
+            if cost > temp_cash:
+                sizing['shares'] = int(temp_cash // entry_price)
+                cost = sizing['shares'] * entry_price
+            if sizing['shares'] <= 0:
+                continue
+            sig['entry'] = entry_price # Normalize keys
+            
+            order = self.order_manager.create_order(sig, sizing)
+            if not order:
+                continue
+            self.alert_system.send_alert("ORDER_GEN", f"Generated Order for {sig['symbol']}: {sizing['shares']} shares", "INFO")
+            orders.append(order)
+            temp_cash -= cost
         
+        batch = self.order_manager.working_orders + orders
+        if not batch:
+            return 0
+        quotes = fresh_quotes(self.scanner.market_data, [o['symbol'] for o in batch])
+        self.order_manager.execute_orders(orders, quotes)
+        return sum(1 for order in batch if order['status'] == 'FILLED')
+
+    def start_loop(self):
+        """Run the bot on the asyncio runtime until SIGINT/SIGTERM (or Ctrl+C)."""
         try:
-            while self.is_running:
-                schedule.run_pending()
-                time.sleep(1)
+            asyncio.run(self.run_async())
         except KeyboardInterrupt:
             self.alert_system.send_alert("SYSTEM", "Bot Stopped by User (KeyboardInterrupt).", "WARNING")
         except Exception as e:
             self.alert_system.send_alert("CRITICAL", f"Main Loop Crash: {e}", "CRITICAL")
             raise e
 
+    async def run_async(self):
+        self.alert_system.send_alert("SYSTEM", "StockRobo-US01: Autonomous Loop STARTED", "INFO")
+        self.alert_system.send_alert("SYSTEM", f"Monitoring {len(self.target_symbols)} Symbols", "INFO")
+        
+        self.alert_system.send_alert("SYSTEM", self.calendar.describe(), "INFO")
+        
+        # Schedule Jobs
+        # All run on a fixed grid; a scan still running when the next one is due is
+        # skipped or coalesced instead of piling up. Outside the NYSE session the scan
+        # ticks idle, and shortly before the open the history cache is warmed once.
+        self.scheduler = AsyncScheduler()
+        self.scheduler.every(config.SCAN_INTERVAL_SECONDS, self.job_market_scan_async, name='market_scan',
+                             overrun=config.SCAN_OVERRUN_POLICY, timeout=config.SCAN_JOB_TIMEOUT_SECONDS,
+                             when=self.is_scan_time)
+        self.scheduler.every(60, self.job_pre_open_warmup, name='pre_open_warmup',
+                             timeout=config.SCAN_JOB_TIMEOUT_SECONDS, when=self.is_warmup_time)
+        self.scheduler.every(config.HEARTBEAT_INTERVAL_SECONDS, self.heartbeat, name='heartbeat')
+        
+        await self.scheduler.run()
+        
+        self.is_running = False
+        # Fold the journaled fills into a fresh portfolio snapshot
+        self.order_manager.save_state()
+        self.alert_system.send_alert("SYSTEM", "Bot Stopped (shutdown signal). Running jobs cancelled.", "WARNING")
+
 if __name__ == "__main__":
     bot = AutonomousBot()
     bot.start_loop()
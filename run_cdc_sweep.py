@@ -0,0 +1,30 @@
+from src.engine.parameter_sweep import CDCParameterSweep
+
+def main():
+    print("==========================================")
+    print("   StockRobo-US01: CDC Parameter Sweep    ")
+    print("   Fast/Slow EMA grid, ranked by Sharpe   ")
+    print("==========================================")
+    
+    symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD']
+    fast_periods = range(5, 21)     # 5..20
+    slow_periods = range(20, 61, 2) # 20..60
+    
+    sweep = CDCParameterSweep(initial_capital=10_000)
+    ranked, detail = sweep.run_symbols(symbols, fast_periods, slow_periods, period="2y", sort_by='sharpe')
+    
+    if ranked.empty:
+        print("No results.")
+        return
+    
+    columns = ['rank', 'fast', 'slow', 'sharpe', 'total_return_pct', 'cagr_pct',
+               'max_drawdown_pct', 'win_rate_pct', 'profit_factor', 'trades']
+    print("\nTop 10 (fast, slow) pairs:")
+    print(ranked.head(10)[columns].to_string(index=False))
+    
+    default = ranked[(ranked['fast'] == 12) & (ranked['slow'] == 26)]
+    if not default.empty:
+        print(f"\nDefault (12, 26) ranks #{int(default['rank'].iloc[0])} of {len(ranked)}")
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 from src.strategies.fibo_strategy import FiboZoneStrategy
 from src.engine.backtest_engine import BacktestEngine
+from src.engine.parameter_sweep import FiboLookbackSweep
 import pandas as pd
 
 def main():
@@ -15,20 +16,31 @@ def main():
     # Test on volatile/growth stocks where corrections are deep
     symbols = ['TSLA', 'NVDA', 'AMD', 'COIN', 'META']
     
+    # Backtest all symbols in parallel (one process per core)
+    summary, trades = engine.run_many(symbols, strategy, period="2y")
+    
+    print("\nSummary:")
+    print(summary.to_string(index=False) if not summary.empty else "No results.")
+    
     for symbol in symbols:
         print(f"\n--- Processing {symbol} ---")
-        trades, df = engine.run(symbol, strategy, period="2y")
+        symbol_trades = trades[trades['Symbol'] == symbol] if not trades.empty else trades
         
-        if trades is not None and not trades.empty:
-            # Calculate Win Rate specific to this strategy
-            wins = trades[trades['PnL'] > 0]
-            win_rate = (len(wins) / len(trades[trades['Type'] == 'SELL'])) * 100 if len(trades[trades['Type'] == 'SELL']) > 0 else 0
+        if not symbol_trades.empty:
+            # Win Rate specific to this strategy comes from the summary table
+            win_rate = summary.loc[summary['Symbol'] == symbol, 'Win Rate %'].iloc[0]
             
             print(f"Win Rate: {win_rate:.2f}%")
             print("Transactions (Sample):")
-            print(trades.tail(5))
+            print(symbol_trades.tail(5))
         else:
             print("No trades triggered (Price maybe didn't hit the deep zone).")
 
+    # Lookback tuning: one High/Low range index, every lookback gathered from it
+    ranked, _ = FiboLookbackSweep(initial_capital=10_000).run_symbols(symbols, range(20, 201, 20), period="2y")
+    if not ranked.empty:
+        print("\nLookback ranking (by Sharpe):")
+        print(ranked[['rank', 'lookback', 'sharpe', 'total_return_pct', 'win_rate_pct', 'trades']].to_string(index=False))
+
 if __name__ == "__main__":
     main()
@@ -1,5 +1,6 @@
 from src.strategies.cdc_action_zone import CDCActionZone
 from src.engine.backtest_engine import BacktestEngine
+from src.engine.monte_carlo import MonteCarloSimulator
 import pandas as pd
 
 def main():
@@ -10,17 +11,33 @@ def main():
     # Initialize components
     strategy = CDCActionZone()
     engine = BacktestEngine(initial_capital=10_000)
+    monte_carlo = MonteCarloSimulator(n_paths=10_000, confidence=95.0)
     
     # Symbols to test
     symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA']
     
+    # Backtest all symbols in parallel (one process per core)
+    summary, trades = engine.run_many(symbols, strategy, period="2y")
+    
+    print("\nSummary:")
+    print(summary.to_string(index=False) if not summary.empty else "No results.")
+    
     for symbol in symbols:
         print(f"\nProcessing {symbol}...")
-        trades, df = engine.run(symbol, strategy, period="2y")
+        symbol_trades = trades[trades['Symbol'] == symbol] if not trades.empty else trades
         
-        if trades is not None and not trades.empty:
+        if not symbol_trades.empty:
             print("Last 3 Trades:")
-            print(trades.tail(3)[['Date', 'Type', 'Price', 'PnL']])
+            print(symbol_trades.tail(3)[['Date', 'Type', 'Price', 'PnL']])
+            
+            # Robustness: resample this symbol's trades into 10k synthetic paths
+            mc = monte_carlo.run_trades(symbol_trades)
+            if mc:
+                print(f"Monte Carlo ({mc['paths']:,} paths x {mc['trades']} trades): "
+                      f"Return {mc['total_return_pct']['low']:.1f}% .. {mc['total_return_pct']['high']:.1f}% | "
+                      f"Max DD {mc['max_drawdown_pct']['low']:.1f}% (worst 2.5%) | "
+                      f"Win Rate {mc['win_rate_pct']['low']:.1f}% .. {mc['win_rate_pct']['high']:.1f}% | "
+                      f"P(loss) {mc['prob_loss_pct']:.1f}%")
         else:
             print("No trades generated.")
             
@@ -1,6 +1,7 @@
 import sys
 import os
 import json
+import asyncio
 
 # --- CRITICAL FIX: Force Add Paths ---
 # 1. หาตำแหน่งไฟล์ปัจจุบัน
@@ -27,8 +28,13 @@ print(f"[DEBUG] System Path: {sys.path}")
 # -------------------------------------
 
 try:
+    import src.config as config
+    from src.data.strategy_stats import StrategyStats
+    from src.data.market_calendar import MarketCalendar
     from src.engine.scanner import MarketScanner
     from src.execution.order_manager import OrderManager
+    from src.execution.fill_simulator import fresh_quotes
+    from src.execution.trade_store import TradeStore
     from src.risk.risk_manager import RiskManager
     from src.notification.alert_engine import AlertEngine
 except ImportError as e:
@@ -49,6 +55,16 @@ def main():
         alert_system = MockAlert()
 
     print("--- [GH ACTION] StockRobo-US01 Phase 2 Execution ---")
+    
+    # Cron runs are fixed in UTC; only trade while the NYSE session is open
+    # (holidays, early closes and DST handled by the offline calendar).
+    # "--force" (manual runs) skips the check.
+    calendar = MarketCalendar()
+    print(f"[GH ACTION] {calendar.describe()}")
+    if "--force" not in sys.argv and not calendar.is_open():
+        print("[GH ACTION] Market closed. Skipping this run.")
+        return
+    
     alert_system.send_alert("GH_ACTION", "Starting Scheduled Scan...", "INFO")
     
     try:
@@ -56,9 +72,15 @@ def main():
         state_file_path = os.path.join(current_dir, "data", "portfolio_state.json")
         os.makedirs(os.path.dirname(state_file_path), exist_ok=True)
         
-        order_manager = OrderManager(state_file=state_file_path)
+        # The SQLite trade store is not committed; it is rebuilt from the order journal on load
+        order_manager = OrderManager(state_file=state_file_path,
+                                     trade_store=TradeStore(os.path.join(current_dir, config.TRADE_DB_FILE)))
         risk_manager = RiskManager(portfolio_value=50000.0, risk_per_trade_pct=2.0)
-        scanner = MarketScanner()
+        stats = StrategyStats(os.path.join(current_dir, config.STRATEGY_STATS_FILE),
+                              min_trades=config.STRATEGY_STATS_MIN_TRADES)
+        scanner = MarketScanner(max_workers=config.SCAN_MAX_WORKERS,
+                                symbol_timeout=config.SCAN_SYMBOL_TIMEOUT_SECONDS,
+                                stats=stats, strategy_name='Scanner_CDC')
         
         # Load watchlist (from file or use default)
         watchlist_path = os.path.join(current_dir, "data", "watchlist.json")
@@ -78,23 +100,19 @@ def main():
             target_symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD']
         
         print(f"[GH ACTION] Scanning {len(target_symbols)} symbols...")
-        results = scanner.scan(target_symbols)
         
+        order_manager.load_state() 
         signals = []
-        for item in results.get('buy_signals', []):
-            item['strategy'] = 'Scanner_CDC' 
-            item['win_rate'] = 75.0 
-            signals.append(item)
-            
-        print(f"[GH ACTION] Found {len(signals)} raw buy signals.")
-
+        pending = []   # buy signals not yet handed to execution
+        final_orders = []
         
-        if signals:
-            ranked_signals = order_manager.prioritize_signals(signals)
-            
-            order_manager.load_state() 
+        def execute_batch(batch_signals):
+            # Rank the batch, size it against the cash left now, and fill it together
+            # with the orders still working from earlier runs against quotes taken now
+            # (never the bar the signals came from), with spread / slippage / commission
             temp_cash = order_manager.cash_balance
-            final_orders = []
+            orders = []
+            ranked_signals = order_manager.prioritize_signals(batch_signals) if batch_signals else []
             
             for sig in ranked_signals:
                 entry_price = sig['price']
@@ -110,14 +128,62 @@ def main():
                     sig['entry'] = entry_price
                     order = order_manager.create_order(sig, sizing)
                     if order:
-                        final_orders.append(order)
-                        temp_cash -= cost 
+                        orders.append(order)
+                        temp_cash -= cost
+            
+            batch = order_manager.working_orders + orders
+            if batch:
+                order_manager.execute_orders(orders, fresh_quotes(scanner.market_data, [o['symbol'] for o in batch]))
+                final_orders.extend(o for o in batch if o['status'] == 'FILLED')
+        
+        async def drain():
+            while pending:
+                batch_signals = pending[:]
+                pending.clear()
+                await asyncio.to_thread(execute_batch, batch_signals)
+        
+        async def collect_signals():
+            # The watchlist downloads concurrently and buy signals are executed as
+            # they arrive: the first one right away, the ones arriving meanwhile
+            # ranked together as the next batch. Ranking therefore only spans
+            # signals that arrive together; an early lower-ranked one can take
+            # cash a later, better one wanted.
+            execution = None
+            try:
+                async for event in scanner.scan_stream(target_symbols):
+                    if event['type'] != 'buy':
+                        continue
+                    item = {k: v for k, v in event.items() if k != 'type'}
+                    item['strategy'] = 'Scanner_CDC' 
+                    stats.enrich(item)
+                    signals.append(item)
+                    pending.append(item)
+                    if execution is None or execution.done():
+                        if execution is not None:
+                            execution.result()   # surface a failed batch
+                        execution = asyncio.create_task(drain())
+                if execution is not None:
+                    await execution
+            finally:
+                if execution is not None and not execution.done():
+                    execution.cancel()
+        
+        asyncio.run(collect_signals())
+        print(f"[GH ACTION] Found {len(signals)} raw buy signals.")
+        
+        if not signals:
+            # No new orders: still retry the ones working from earlier runs
+            execute_batch([])
+        
+        # Fills were journaled one line each; fold them into the snapshot the dashboard reads
+        order_manager.save_state()
 
-            if final_orders:
-                order_manager.execute_orders(final_orders)
-                alert_system.send_alert("GH_ACTION", f"Successfully executed {len(final_orders)} orders.", "INFO")
-            else:
-                 print("[GH ACTION] No orders generated (Insufficient Cash).")
+        if final_orders:
+            alert_system.send_alert("GH_ACTION", f"Successfully executed {len(final_orders)} orders.", "INFO")
+        elif order_manager.working_orders:
+            print(f"[GH ACTION] {len(order_manager.working_orders)} orders working (retried next run).")
+        elif signals:
+            print("[GH ACTION] No orders generated (Insufficient Cash).")
         else:
             print("[GH ACTION] No signals found.")
 
@@ -11,7 +11,8 @@ def main():
     cash = 50_000
     risk_pct = 2.0
     
-    order_mgr = OrderManager(cash_balance=cash)
+    # In memory only: the demo must not write the live bot's journal / snapshot
+    order_mgr = OrderManager(cash_balance=cash, state_file=None)
     risk_mgr = RiskManager(portfolio_value=cash, risk_per_trade_pct=risk_pct)
     
     # 2. Simulate Signal Generation (From Scanner)
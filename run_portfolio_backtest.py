@@ -0,0 +1,32 @@
+from src.strategies.cdc_action_zone import CDCActionZone
+from src.engine.portfolio_backtest import PortfolioBacktester
+import json
+import os
+
+def main():
+    print("==========================================")
+    print("   StockRobo-US01: Portfolio Backtest     ")
+    print("   Shared $50k cash pool, bot sizing      ")
+    print("==========================================")
+    
+    # Same universe the bot trades: the generated watchlist, or the default list
+    symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD']
+    watchlist_path = os.path.join("data", "watchlist.json")
+    if os.path.exists(watchlist_path):
+        with open(watchlist_path, 'r') as f:
+            symbols = json.load(f).get('watchlist', symbols) or symbols
+    
+    backtester = PortfolioBacktester(initial_capital=50_000, risk_per_trade_pct=2.0, stop_loss_pct=5.0)
+    result = backtester.run_symbols(symbols, CDCActionZone(), period="2y")
+    
+    trades = result['trades']
+    if not trades.empty:
+        print("\nLast 10 Trades:")
+        print(trades.tail(10)[['Date', 'Symbol', 'Type', 'Price', 'Shares', 'PnL', 'Reason']])
+    else:
+        print("No trades generated.")
+    
+    print(f"\nOpen Positions: {result['positions']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+from src.strategies.cdc_action_zone import CDCActionZone
+from src.strategies.fibo_strategy import FiboZoneStrategy
+from src.engine.backtest_engine import BacktestEngine
+from src.data.strategy_stats import StrategyStats
+import src.config as config
+import json
+import os
+
+def main():
+    print("==========================================")
+    print("   StockRobo-US01: Strategy Stats Refresh ")
+    print("   Backtest win rates for prioritization  ")
+    print("==========================================")
+    
+    # Same universe the bot trades: the generated watchlist, or the default list
+    symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD']
+    watchlist_path = os.path.join("data", "watchlist.json")
+    if os.path.exists(watchlist_path):
+        with open(watchlist_path, 'r') as f:
+            symbols = json.load(f).get('watchlist', symbols) or symbols
+    
+    stats = StrategyStats(config.STRATEGY_STATS_FILE, min_trades=config.STRATEGY_STATS_MIN_TRADES)
+    engine = BacktestEngine(initial_capital=10_000)
+    
+    # Strategy tags must match the 'strategy' the bot puts on its signals
+    engine.run_many(symbols, CDCActionZone(), period="2y", stats=stats, strategy_name='Scanner_CDC')
+    engine.run_many(symbols, FiboZoneStrategy(lookback_period=120), period="2y", stats=stats, strategy_name='FiboZone')
+    stats.save()
+    
+    print(f"\n{'SYMBOL':<8} {'STRATEGY':<12} {'TRADES':>6} {'WIN %':>7} {'EXP %':>7}")
+    for symbol in symbols:
+        for strategy in ('Scanner_CDC', 'FiboZone'):
+            summary = stats.get(symbol, strategy)
+            if summary['trades']:
+                print(f"{symbol:<8} {strategy:<12} {summary['trades']:>6} "
+                      f"{summary['win_rate']:>7.1f} {summary['expectancy']:>7.2f}")
+    print(f"\nSaved to {config.STRATEGY_STATS_FILE}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from src.engine.walk_forward import WalkForwardOptimizer
+
+def main():
+    print("==========================================")
+    print("   StockRobo-US01: Walk-Forward Test      ")
+    print("   1y in-sample -> 3m out-of-sample       ")
+    print("==========================================")
+    
+    symbols = ['SPY', 'QQQ', 'NVDA', 'TSLA', 'AAPL', 'MSFT', 'AMZN', 'GOOGL', 'META', 'AMD']
+    optimizer = WalkForwardOptimizer(train_bars=252, test_bars=63, objective='sharpe')
+    
+    # CDC fast/slow EMA periods
+    cdc = optimizer.run_cdc(symbols, range(5, 21), range(20, 61, 2), period="5y")
+    if not cdc['windows'].empty:
+        print("\nCDC windows (chosen pair, in-sample vs out-of-sample Sharpe):")
+        print(cdc['windows'][['test_start', 'test_end', 'fast', 'slow', 'is_sharpe', 'oos_sharpe',
+                              'oos_total_return_pct']].to_string(index=False))
+        print("\nCDC out-of-sample (chained test periods):")
+        print(cdc['oos_metrics'][['total_return_pct', 'sharpe', 'max_drawdown_pct']].to_string())
+    
+    # Fibo lookback periods
+    fibo = optimizer.run_fibo(symbols, range(20, 201, 20), period="5y")
+    if not fibo['windows'].empty:
+        print("\nFibo windows (chosen lookback, in-sample vs out-of-sample Sharpe):")
+        print(fibo['windows'][['test_start', 'test_end', 'lookback', 'is_sharpe', 'oos_sharpe',
+                               'oos_total_return_pct']].to_string(index=False))
+
+if __name__ == "__main__":
+    main()
@@ -11,9 +11,64 @@
 TELEGRAM_ENABLED = False  # Set to True after you fill in the details below
 TELEGRAM_BOT_TOKEN = "YOUR_BOT_TOKEN_HERE"  # e.g., "123456789:ABCdefGHIjklMNOpqrsTUVwxyz"
 TELEGRAM_CHAT_ID = "YOUR_CHAT_ID_HERE"      # e.g., "123456789" or "-100..." for groups
+TELEGRAM_QUEUE_SIZE = 1000                # Alerts waiting to be sent; newer ones are dropped when full
+TELEGRAM_MAX_RETRIES = 3                  # Retries on 429 / 5xx / connection errors (exponential backoff)
+TELEGRAM_TIMEOUT_SECONDS = 5              # HTTP timeout per request (in the background worker)
+TELEGRAM_FLUSH_TIMEOUT_SECONDS = 10       # Time allowed at shutdown to send what is still queued
+ALERT_DEDUP_WINDOW_SECONDS = 300          # Identical alerts within this window are sent to Telegram once
+ALERT_RATE_LIMIT_PER_MINUTE = 6           # Telegram messages per alert channel (title); extra ones are held and combined
+ALERT_RATE_LIMIT_BURST = 3                # Messages a quiet channel may send back to back
 
 # ----------------------------------------------------
 # SYSTEM SETTINGS
 # ----------------------------------------------------
 LOG_LEVEL = "INFO"
+LOG_MAX_BYTES = 5 * 1024 * 1024           # Rotate the activity log past this size...
+LOG_ROTATE_DAILY = True                   # ...and at the first write of each day
+LOG_BACKUP_COUNT = 10                     # Rotated (gzipped) segments kept next to the log
+LOG_FLUSH_INTERVAL_SECONDS = 1.0          # Longest a log line waits in the write buffer
 SCAN_INTERVAL_SECONDS = 60
+HEARTBEAT_INTERVAL_SECONDS = 30
+SCAN_OVERRUN_POLICY = "coalesce"          # Scan still running when due: "skip" the tick or "coalesce" into one rerun
+SCAN_JOB_TIMEOUT_SECONDS = 300            # Cancel a scan cycle that runs longer than this
+
+# ----------------------------------------------------
+# MARKET DATA CACHE
+# ----------------------------------------------------
+HISTORY_CACHE_DIR = "data/cache"          # Local OHLCV store (set to None to disable)
+HISTORY_CACHE_MAX_AGE_SECONDS = 60        # Skip the top-up download if the cache is younger than this
+
+# ----------------------------------------------------
+# SCANNER
+# ----------------------------------------------------
+SCAN_MAX_WORKERS = 8                      # Symbols scanned in parallel by the live bot
+SCAN_SYMBOL_TIMEOUT_SECONDS = 20          # Per-symbol deadline; slower symbols are reported as errors
+CDC_STATE_FILE = "data/cdc_state.json"    # Incremental CDC state for the live loop (EMAs/colours per symbol)
+
+# ----------------------------------------------------
+# STRATEGY STATISTICS
+# ----------------------------------------------------
+STRATEGY_STATS_FILE = "data/strategy_stats.json"  # Backtest-derived win rate / expectancy per (symbol, strategy)
+STRATEGY_STATS_MIN_TRADES = 3                     # Fewer closed trades -> prioritize with the default 50% win rate
+
+# ----------------------------------------------------
+# MARKET HOURS (NYSE, offline calendar in src/data/market_calendar.py)
+# ----------------------------------------------------
+MARKET_HOURS_ONLY = True                  # Live bot scans only during the regular session
+PRE_OPEN_WARMUP_MINUTES = 15              # Pre-load the history cache this long before the open
+ROUND1_WINDOW_MINUTES = 120               # Watchlist round 1 (full scan) runs within this long after the open
+
+# ----------------------------------------------------
+# TRADE STORE
+# ----------------------------------------------------
+TRADE_DB_FILE = "data/trades.db"          # SQLite index of orders / fills / positions / cash (rebuilt from the order journal)
+
+# ----------------------------------------------------
+# PAPER FILLS
+# ----------------------------------------------------
+FILL_SLIPPAGE_BPS = 5.0                   # Market-order slippage, basis points
+FILL_SPREAD_BPS = 2.0                     # Full bid/ask spread, basis points (half paid per side)
+COMMISSION_PER_SHARE = 0.005              # Fee per share...
+COMMISSION_MIN = 1.0                      # ...with this minimum per order
+COMMISSION_PCT = 0.0                      # Plus % of notional
+WORKING_ORDER_MAX_AGE_MINUTES = 390       # Unfilled orders are cancelled after one regular session
@@ -0,0 +1,146 @@
+import os
+import json
+import time
+import pandas as pd
+from typing import Optional, Dict, Any
+
+# Parquet needs pyarrow. If it is missing we still cache, just as pickle files.
+try:
+    import pyarrow  # noqa: F401
+    _HAS_PARQUET = True
+except ImportError:
+    _HAS_PARQUET = False
+
+# Only bar intervals of one day or longer are cached. Intraday bars change
+# too quickly (and yfinance limits how far back they go) to be worth storing.
+CACHEABLE_INTERVALS = {'1d', '5d', '1wk', '1mo', '3mo'}
+
+# How far back each yfinance 'period' string reaches.
+PERIOD_OFFSETS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+
+def period_start(period: str, tz=None) -> Optional[pd.Timestamp]:
+    """
+    Convert a yfinance period string into the first timestamp it covers.
+
+    Returns:
+        pd.Timestamp (midnight, in `tz`), or None for 'max' (no lower bound).
+    """
+    today = pd.Timestamp.now(tz=tz).normalize()
+    if period == 'max':
+        return None
+    if period == 'ytd':
+        return today.replace(month=1, day=1)
+    if period not in PERIOD_OFFSETS:
+        raise ValueError(f"Unsupported period: {period}")
+    return today - PERIOD_OFFSETS[period]
+
+
+def date_column(df: pd.DataFrame) -> str:
+    """yfinance names the index 'Date' for daily bars and 'Datetime' for intraday."""
+    return 'Date' if 'Date' in df.columns else 'Datetime'
+
+
+class HistoryCache:
+    """
+    Local on-disk store of OHLCV history, one file per (symbol, interval).
+
+    Each data file has a small JSON sidecar that records how far back the
+    stored history was requested ('covered_from') and when it was last
+    topped up ('fetched_at'). MarketData uses it to download only the bars
+    that are missing since the last cached timestamp.
+    """
+
+    def __init__(self, cache_dir: str = "data/cache"):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def _base_path(self, symbol: str, interval: str) -> str:
+        safe_symbol = symbol.replace('/', '_').replace('^', '_')
+        return os.path.join(self.cache_dir, f"{safe_symbol}_{interval}")
+
+    def _data_path(self, symbol: str, interval: str) -> str:
+        ext = '.parquet' if _HAS_PARQUET else '.pkl'
+        return self._base_path(symbol, interval) + ext
+
+    def _meta_path(self, symbol: str, interval: str) -> str:
+        return self._base_path(symbol, interval) + '.json'
+
+    def load(self, symbol: str, interval: str) -> Optional[pd.DataFrame]:
+        """Return the cached frame, or None if nothing usable is stored."""
+        path = self._data_path(symbol, interval)
+        if not os.path.exists(path):
+            return None
+        try:
+            if _HAS_PARQUET:
+                return pd.read_parquet(path)
+            return pd.read_pickle(path)
+        except Exception as e:
+            print(f"[CACHE] Error reading {path}: {e}")
+            return None
+
+    def load_meta(self, symbol: str, interval: str) -> Dict[str, Any]:
+        path = self._meta_path(symbol, interval)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def save(self, symbol: str, interval: str, df: pd.DataFrame, covered_from: Optional[pd.Timestamp]):
+        """
+        Store `df` for (symbol, interval).
+
+        Args:
+            covered_from: Earliest timestamp the stored history was requested
+                          from (None when the full 'max' history is stored).
+        """
+        path = self._data_path(symbol, interval)
+        tmp_path = path + '.tmp'
+        try:
+            # Write to a temp file first so a crash never leaves a torn cache file.
+            if _HAS_PARQUET:
+                df.to_parquet(tmp_path, index=False)
+            else:
+                df.to_pickle(tmp_path)
+            os.replace(tmp_path, path)
+
+            meta = {
+                'covered_from': covered_from.isoformat() if covered_from is not None else None,
+                'fetched_at': time.time(),
+                'rows': len(df)
+            }
+            with open(self._meta_path(symbol, interval), 'w') as f:
+                json.dump(meta, f)
+        except Exception as e:
+            print(f"[CACHE] Error writing {path}: {e}")
+
+    def covers(self, meta: Dict[str, Any], start: Optional[pd.Timestamp]) -> bool:
+        """True if the cached history reaches back to `start`."""
+        if 'covered_from' not in meta:
+            return False
+        covered_from = meta['covered_from']
+        if covered_from is None:
+            return True  # Full 'max' history is stored
+        if start is None:
+            return False
+        return pd.Timestamp(covered_from) <= start
+
+    def is_fresh(self, meta: Dict[str, Any], max_age_seconds: float) -> bool:
+        """True if the cache was topped up less than `max_age_seconds` ago."""
+        fetched_at = meta.get('fetched_at')
+        if fetched_at is None or max_age_seconds <= 0:
+            return False
+        return (time.time() - fetched_at) < max_age_seconds
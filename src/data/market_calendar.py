@@ -0,0 +1,190 @@
+import sys
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+# NYSE trades in New York local time; zoneinfo handles the EST/EDT switch.
+# (On Windows the tz database comes from the 'tzdata' package.)
+NY_TZ = ZoneInfo("America/New_York")
+
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# One-off closures that no rule produces (national days of mourning, etc.)
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): "Hurricane Sandy",
+    date(2012, 10, 30): "Hurricane Sandy",
+    date(2018, 12, 5): "Day of Mourning (George H.W. Bush)",
+    date(2025, 1, 9): "Day of Mourning (Jimmy Carter)",
+}
+
+
+def easter_sunday(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th `weekday` (Mon=0) of a month; n=-1 for the last one."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _observed(day: date) -> date:
+    """Saturday holidays are observed on Friday, Sunday holidays on Monday."""
+    if day.weekday() == 5:
+        return day - timedelta(days=1)
+    if day.weekday() == 6:
+        return day + timedelta(days=1)
+    return day
+
+
+@lru_cache(maxsize=None)
+def nyse_holidays(year: int) -> Dict[date, str]:
+    """Full-day NYSE closures in `year`, computed from the exchange's rules."""
+    holidays = {}
+    new_year = date(year, 1, 1)
+    # A Saturday New Year's Day is not made up on the Friday before (NYSE Rule 7.2)
+    if new_year.weekday() != 5:
+        holidays[_observed(new_year)] = "New Year's Day"
+    if year >= 1998:
+        holidays[_nth_weekday(year, 1, 0, 3)] = "Martin Luther King Jr. Day"
+    holidays[_nth_weekday(year, 2, 0, 3)] = "Washington's Birthday"
+    holidays[easter_sunday(year) - timedelta(days=2)] = "Good Friday"
+    holidays[_nth_weekday(year, 5, 0, -1)] = "Memorial Day"
+    if year >= 2022:
+        holidays[_observed(date(year, 6, 19))] = "Juneteenth"
+    holidays[_observed(date(year, 7, 4))] = "Independence Day"
+    holidays[_nth_weekday(year, 9, 0, 1)] = "Labor Day"
+    holidays[_nth_weekday(year, 11, 3, 4)] = "Thanksgiving Day"
+    holidays[_observed(date(year, 12, 25))] = "Christmas Day"
+    for day, name in SPECIAL_CLOSURES.items():
+        if day.year == year:
+            holidays[day] = name
+    return holidays
+
+
+@lru_cache(maxsize=None)
+def nyse_early_closes(year: int) -> Dict[date, str]:
+    """13:00 early-close days in `year`."""
+    closes = {}
+    july_3 = date(year, 7, 3)
+    if july_3.weekday() < 4:  # Mon-Thu; a Friday July 3 is the observed holiday
+        closes[july_3] = "Independence Day Eve"
+    closes[_nth_weekday(year, 11, 3, 4) + timedelta(days=1)] = "Day after Thanksgiving"
+    christmas_eve = date(year, 12, 24)
+    if christmas_eve.weekday() < 4:  # Mon-Thu; a Friday Dec 24 is the observed holiday
+        closes[christmas_eve] = "Christmas Eve"
+    holidays = nyse_holidays(year)
+    return {day: name for day, name in closes.items() if day not in holidays}
+
+
+class MarketCalendar:
+    """
+    Offline NYSE calendar: trading days, holidays, early closes and session
+    times, all in New York time. No network calls, so it is safe to consult
+    every tick of the bot loop.
+    """
+
+    def __init__(self, tz: ZoneInfo = NY_TZ):
+        self.tz = tz
+
+    def now(self) -> datetime:
+        return datetime.now(self.tz)
+
+    def _local(self, when: Optional[datetime]) -> datetime:
+        if when is None:
+            return self.now()
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        return when.astimezone(self.tz)
+
+    def holiday_name(self, day: date) -> Optional[str]:
+        return nyse_holidays(day.year).get(day)
+
+    def is_trading_day(self, day: Optional[date] = None) -> bool:
+        day = day or self.now().date()
+        return day.weekday() < 5 and day not in nyse_holidays(day.year)
+
+    def session(self, day: Optional[date] = None) -> Optional[Tuple[datetime, datetime]]:
+        """(open, close) of the regular session on `day` (tz-aware), or None if closed."""
+        day = day or self.now().date()
+        if not self.is_trading_day(day):
+            return None
+        close = EARLY_CLOSE if day in nyse_early_closes(day.year) else REGULAR_CLOSE
+        return (datetime.combine(day, REGULAR_OPEN, tzinfo=self.tz),
+                datetime.combine(day, close, tzinfo=self.tz))
+
+    def is_open(self, when: Optional[datetime] = None) -> bool:
+        """True during the regular session."""
+        when = self._local(when)
+        session = self.session(when.date())
+        return session is not None and session[0] <= when < session[1]
+
+    def next_session(self, when: Optional[datetime] = None) -> Tuple[datetime, datetime]:
+        """The session in progress at `when`, or else the next one to open."""
+        when = self._local(when)
+        day = when.date()
+        for _ in range(15):  # Longest closure streaks are a few days
+            session = self.session(day)
+            if session is not None and when < session[1]:
+                return session
+            day += timedelta(days=1)
+        raise RuntimeError(f"No NYSE session found within 15 days of {when}")
+
+    def next_open(self, when: Optional[datetime] = None) -> datetime:
+        """Open of the next session that has not started yet."""
+        when = self._local(when)
+        session = self.next_session(when)
+        if session[0] <= when:
+            session = self.next_session(session[1])
+        return session[0]
+
+    def seconds_until_open(self, when: Optional[datetime] = None) -> float:
+        """0 while the market is open, else seconds until the next open."""
+        when = self._local(when)
+        if self.is_open(when):
+            return 0.0
+        return (self.next_open(when) - when).total_seconds()
+
+    def minutes_since_open(self, when: Optional[datetime] = None) -> Optional[float]:
+        """Minutes since today's open while the session is running, else None."""
+        when = self._local(when)
+        if not self.is_open(when):
+            return None
+        return (when - self.session(when.date())[0]).total_seconds() / 60
+
+    def describe(self, when: Optional[datetime] = None) -> str:
+        """One-line market status for logs."""
+        when = self._local(when)
+        if self.is_open(when):
+            close = self.session(when.date())[1]
+            return f"Market OPEN (closes {close.strftime('%H:%M %Z')})"
+        reason = self.holiday_name(when.date()) or ("weekend" if when.weekday() >= 5 else "outside session")
+        return f"Market CLOSED ({reason}); next open {self.next_open(when).strftime('%a %Y-%m-%d %H:%M %Z')}"
+
+
+if __name__ == "__main__":
+    # python -m src.data.market_calendar [--is-trading-day | --is-open]
+    # Exit code 0 = yes, 1 = no (for shell / workflow checks).
+    calendar = MarketCalendar()
+    print(calendar.describe())
+    if "--is-trading-day" in sys.argv:
+        sys.exit(0 if calendar.is_trading_day() else 1)
+    if "--is-open" in sys.argv:
+        sys.exit(0 if calendar.is_open() else 1)
@@ -1,14 +1,27 @@
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import Optional, List, Dict
+import src.config as config
+from src.data.history_cache import HistoryCache, CACHEABLE_INTERVALS, period_start, date_column
 
 class MarketData:
     """
     Handler for fetching market data using yfinance.
+    Daily (and longer) history is kept in a local HistoryCache so repeated
+    calls only download the bars added since the last call.
     """
     
-    def __init__(self):
-        pass
+    def __init__(self, cache_dir: Optional[str] = config.HISTORY_CACHE_DIR,
+                 max_age_seconds: float = config.HISTORY_CACHE_MAX_AGE_SECONDS):
+        """
+        Args:
+            cache_dir (str): Directory for the on-disk history cache. None disables caching.
+            max_age_seconds (float): Serve the cache without any download if it was
+                                     topped up less than this many seconds ago.
+        """
+        self.cache = HistoryCache(cache_dir) if cache_dir else None
+        self.max_age_seconds = max_age_seconds
 
     def get_history(self, symbol: str, period: str = "1y", interval: str = "1d") -> pd.DataFrame:
         """
@@ -25,9 +38,19 @@ class MarketData:
             pd.DataFrame: DataFrame containing Open, High, Low, Close, Volume.
                           Returns empty DataFrame if failed.
         """
+        if self.cache is not None and interval in CACHEABLE_INTERVALS:
+            return self._get_history_cached(symbol, period, interval)
+        return self._download(symbol, period=period, interval=interval)
+
+    def _download(self, symbol: str, period: Optional[str] = None, interval: str = "1d",
+                  start: Optional[pd.Timestamp] = None) -> pd.DataFrame:
+        """Single yfinance round trip, either by `period` or from `start` onwards."""
         try:
             ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            if start is not None:
+                df = ticker.history(start=start.strftime('%Y-%m-%d'), interval=interval)
+            else:
+                df = ticker.history(period=period, interval=interval)
             
             if df.empty:
                 print(f"Warning: No data found for {symbol}")
@@ -44,6 +67,234 @@ class MarketData:
             print(f"Error fetching data for {symbol}: {e}")
             return pd.DataFrame()
 
+    def _get_history_cached(self, symbol: str, period: str, interval: str) -> pd.DataFrame:
+        """
+        Serve history from the local cache, downloading only what is missing:
+        - No cache (or it does not reach back far enough): full download, stored.
+        - Cache covers the period: re-fetch from the last complete cached bar
+          onwards (the last bar may have been incomplete) and append.
+        - yfinance prices are split/dividend adjusted, so if the top-up shows a
+          new split or dividend, or the overlapping bar's close has changed,
+          the whole cached history is stale: it is downloaded again in full.
+        """
+        start = period_start(period, tz='UTC')
+        meta = self.cache.load_meta(symbol, interval)
+        cached = self.cache.load(symbol, interval) if self.cache.covers(meta, start) else None
+
+        if cached is None or cached.empty:
+            df = self._download(symbol, period=period, interval=interval)
+            if not df.empty:
+                self.cache.save(symbol, interval, df, start)
+            return df
+
+        if not self.cache.is_fresh(meta, self.max_age_seconds):
+            new_bars = self._download(symbol, interval=interval, start=self._overlap_date(cached))
+            if self._is_readjusted(cached, new_bars):
+                print(f"[CACHE] {symbol}: split/dividend adjustment detected, re-downloading history")
+                df = self._download(symbol, period=period, interval=interval)
+                if not df.empty:
+                    self.cache.save(symbol, interval, df, start)
+                return df
+            cached = self._append_bars(symbol, interval, cached, meta, new_bars)
+
+        return self._slice_period(cached, start)
+
+    @staticmethod
+    def _overlap_date(cached: pd.DataFrame) -> pd.Timestamp:
+        """Date to top up from: the last complete cached bar (the one before the latest)."""
+        dates = cached[date_column(cached)]
+        return dates.iloc[-2] if len(dates) > 1 else dates.iloc[-1]
+
+    @staticmethod
+    def _is_readjusted(cached: pd.DataFrame, new_bars: pd.DataFrame, rtol: float = 1e-4) -> bool:
+        """
+        True if the history in `cached` no longer matches yfinance's adjusted
+        prices: `new_bars` (downloaded from _overlap_date onwards) carry a split
+        or dividend the cache has not seen, or the overlapping complete bar's
+        close differs.
+        """
+        if new_bars.empty or len(cached) < 2:
+            return False
+        cached_dates = cached[date_column(cached)]
+        new_dates = new_bars[date_column(new_bars)]
+
+        for column in ('Dividends', 'Stock Splits'):
+            if column not in new_bars.columns:
+                continue
+            new_actions = set(new_dates[new_bars[column].fillna(0) != 0])
+            seen = set(cached_dates[cached[column].fillna(0) != 0]) if column in cached.columns else set()
+            if new_actions - seen:
+                return True
+
+        overlap = cached_dates.iloc[-2]
+        old_close = cached['Close'][cached_dates == overlap]
+        new_close = new_bars['Close'][new_dates == overlap]
+        if old_close.empty or new_close.empty:
+            return False
+        return not np.isclose(new_close.iloc[0], old_close.iloc[0], rtol=rtol)
+
+    def _append_bars(self, symbol: str, interval: str, cached: pd.DataFrame,
+                     meta: Dict, new_bars: pd.DataFrame) -> pd.DataFrame:
+        """Merge freshly downloaded bars into the cached history and store the result."""
+        if not new_bars.empty:
+            # Drop the cached copy of every bar we just received again
+            date_col = date_column(cached)
+            first_new = new_bars[date_column(new_bars)].iloc[0]
+            cached = cached[cached[date_col] < first_new]
+            cached = pd.concat([cached, new_bars], ignore_index=True)
+        covered_from = pd.Timestamp(meta['covered_from']) if meta.get('covered_from') else None
+        self.cache.save(symbol, interval, cached, covered_from)
+        return cached
+
+    def get_history_many(self, symbols: List[str], period: str = "1y", interval: str = "1d",
+                          batch_size: int = 50) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch historical data for many symbols, `batch_size` symbols per
+        yf.download() call.
+
+        This does not cut the number of HTTP requests for the symbols that are
+        downloaded: yf.download() makes one request per ticker (Yahoo has no
+        multi-symbol history endpoint), run concurrently on its own thread
+        pool. What it saves over a get_history() loop is wall time, from that
+        concurrency, and the requests the cache avoids: symbols topped up within
+        max_age_seconds are not requested at all, and stale ones only fetch the
+        bars since their last cached day.
+        
+        Args:
+            symbols (List[str]): Ticker symbols.
+            period (str): Same as get_history.
+            interval (str): Same as get_history.
+            batch_size (int): Symbols per yf.download() call.
+            
+        Returns:
+            Dict[str, pd.DataFrame]: symbol -> frame normalized exactly like get_history.
+                                     Symbols that failed map to an empty DataFrame.
+        """
+        results: Dict[str, pd.DataFrame] = {}
+        cold = []  # Need the full period downloaded
+        warm = []  # Cached, only need a top-up: (symbol, cached_df, meta)
+        
+        use_cache = self.cache is not None and interval in CACHEABLE_INTERVALS
+        start = period_start(period, tz='UTC') if use_cache else None
+        
+        for symbol in dict.fromkeys(symbols):
+            if not use_cache:
+                cold.append(symbol)
+                continue
+            meta = self.cache.load_meta(symbol, interval)
+            cached = self.cache.load(symbol, interval) if self.cache.covers(meta, start) else None
+            if cached is None or cached.empty:
+                cold.append(symbol)
+            elif self.cache.is_fresh(meta, self.max_age_seconds):
+                results[symbol] = self._slice_period(cached, start)
+            else:
+                warm.append((symbol, cached, meta))
+
+        for i in range(0, len(cold), batch_size):
+            batch = cold[i:i + batch_size]
+            frames = self._download_many(batch, period=period, interval=interval)
+            for symbol in batch:
+                df = frames.get(symbol, pd.DataFrame())
+                if use_cache and not df.empty:
+                    self.cache.save(symbol, interval, df, start)
+                results[symbol] = df
+
+        readjusted = []  # Split/dividend since they were cached: full re-download
+        for i in range(0, len(warm), batch_size):
+            batch = warm[i:i + batch_size]
+            # One yf.download() call (a request per symbol) from the oldest overlap bar in the batch
+            top_up_start = min(self._overlap_date(cached) for _, cached, _ in batch)
+            frames = self._download_many([b[0] for b in batch], interval=interval, start=top_up_start)
+            for symbol, cached, meta in batch:
+                new_bars = frames.get(symbol, pd.DataFrame())
+                if not new_bars.empty:
+                    overlap = self._overlap_date(cached)
+                    new_bars = new_bars[new_bars[date_column(new_bars)] >= overlap].reset_index(drop=True)
+                if self._is_readjusted(cached, new_bars):
+                    readjusted.append(symbol)
+                    continue
+                cached = self._append_bars(symbol, interval, cached, meta, new_bars)
+                results[symbol] = self._slice_period(cached, start)
+
+        if readjusted:
+            print(f"[CACHE] Split/dividend adjustment detected, re-downloading: {', '.join(readjusted)}")
+        for i in range(0, len(readjusted), batch_size):
+            batch = readjusted[i:i + batch_size]
+            frames = self._download_many(batch, period=period, interval=interval)
+            for symbol in batch:
+                df = frames.get(symbol, pd.DataFrame())
+                if not df.empty:
+                    self.cache.save(symbol, interval, df, start)
+                results[symbol] = df
+
+        return {symbol: results.get(symbol, pd.DataFrame()) for symbol in symbols}
+
+    def _download_many(self, symbols: List[str], period: Optional[str] = None, interval: str = "1d",
+                       start: Optional[pd.Timestamp] = None) -> Dict[str, pd.DataFrame]:
+        """
+        One yf.download() call for `symbols` (one concurrent request per
+        ticker inside yfinance). Output frames are shaped like Ticker.history()
+        after reset_index: tz-aware dates, adjusted prices and
+        Dividends / Stock Splits columns.
+        """
+        kwargs = {'start': start.strftime('%Y-%m-%d')} if start is not None else {'period': period}
+        try:
+            data = yf.download(symbols, interval=interval, group_by='ticker', auto_adjust=True,
+                               actions=True, ignore_tz=False, threads=True, progress=False, **kwargs)
+        except Exception as e:
+            print(f"Error fetching batch of {len(symbols)} symbols: {e}")
+            return {}
+
+        frames = {}
+        for symbol in symbols:
+            try:
+                if isinstance(data.columns, pd.MultiIndex):
+                    if symbol not in data.columns.get_level_values(0):
+                        continue
+                    df = data[symbol].copy()
+                elif len(symbols) == 1:
+                    df = data.copy()
+                else:
+                    continue
+                df.columns.name = None
+                df = df.dropna(how='all', subset=[c for c in ['Open', 'High', 'Low', 'Close'] if c in df.columns])
+                if df.empty:
+                    print(f"Warning: No data found for {symbol}")
+                    continue
+                columns = [c for c in ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+                           if c in df.columns]
+                df = df[columns]
+                df.reset_index(inplace=True)
+                frames[symbol] = df
+            except Exception as e:
+                print(f"Error unpacking data for {symbol}: {e}")
+        return frames
+
+    def _slice_period(self, df: pd.DataFrame, start: Optional[pd.Timestamp]) -> pd.DataFrame:
+        """Trim cached history down to the requested period."""
+        if start is None or df.empty:
+            return df.reset_index(drop=True)
+        dates = df[date_column(df)]
+        if dates.dt.tz is None:
+            start = start.tz_localize(None)
+        return df[dates >= start].reset_index(drop=True)
+
+    @staticmethod
+    def to_matrix(histories: Dict[str, pd.DataFrame], column: str = 'Close') -> pd.DataFrame:
+        """
+        Align per-symbol histories (e.g. from get_history_many) into one
+        (time x symbols) frame of `column`, NaN where a symbol has no bar.
+        Use .to_numpy() on the result for the strategies' calculate_matrix().
+        """
+        series = {}
+        for symbol, df in histories.items():
+            if df.empty or column not in df.columns:
+                continue
+            series[symbol] = df.set_index(date_column(df))[column]
+        if not series:
+            return pd.DataFrame()
+        return pd.concat(series, axis=1).sort_index()
+
     def get_realtime_price(self, symbol: str) -> Optional[float]:
         """
         Get the latest price (delayed real-time).
@@ -74,3 +325,15 @@ if __name__ == "__main__":
     
     price = md.get_realtime_price(symbol)
     print(f"Current Price of {symbol}: {price}")
+
+    # Cold-cache timing: one get_history() per symbol vs get_history_many()
+    import time
+    symbols = ["AAPL", "MSFT", "NVDA", "AMZN", "GOOGL", "META", "TSLA", "AMD", "NFLX", "AVGO"]
+    uncached = MarketData(cache_dir=None)
+    t0 = time.perf_counter()
+    for s in symbols:
+        uncached.get_history(s, period="6mo")
+    t1 = time.perf_counter()
+    uncached.get_history_many(symbols, period="6mo")
+    t2 = time.perf_counter()
+    print(f"{len(symbols)} symbols: sequential {t1 - t0:.2f}s, get_history_many {t2 - t1:.2f}s")
@@ -0,0 +1,201 @@
+import os
+import json
+import time
+import threading
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, Optional
+
+
+class StrategyStats:
+    """
+    Persisted per-(symbol, strategy) trade statistics: trade count, win rate
+    and expectancy, for OrderManager.prioritize_signals.
+
+    Filled from backtests with record_backtest(), then kept current bar by
+    bar with update_bars(), which runs the same entry/exit rules as
+    BacktestEngine.positions() (enter on the first Buy while flat, exit on
+    the first Sell while long) and only touches bars newer than the last one
+    seen. Lookups (win_rate, expectancy, get) are dict reads, with no
+    backtest work in the live loop.
+    """
+
+    def __init__(self, state_file: Optional[str] = "data/strategy_stats.json", min_trades: int = 3):
+        """
+        Args:
+            state_file (str): JSON file the stats persist to (None = in memory only).
+            min_trades (int): Below this many closed trades, win_rate() returns the default.
+        """
+        self.state_file = state_file
+        self.min_trades = min_trades
+        self.stats: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+        if self.state_file:
+            self.load()
+
+    @staticmethod
+    def _key(symbol: str, strategy: str) -> str:
+        return f"{symbol}|{strategy}"
+
+    @staticmethod
+    def _empty() -> Dict[str, Any]:
+        return {
+            'trades': 0,
+            'wins': 0,
+            'sum_return': 0.0,      # Sum of closed-trade returns (fractions)
+            'sum_win': 0.0,
+            'sum_loss': 0.0,
+            'position': 0,          # 1 while a trade is open
+            'entry_price': None,
+            'last_date': None,      # ISO timestamp of the last bar applied
+            'updated_at': None
+        }
+
+    def _close_trade(self, entry: Dict[str, Any], exit_price: float):
+        ret = exit_price / entry['entry_price'] - 1
+        entry['trades'] += 1
+        entry['sum_return'] += ret
+        if ret > 0:
+            entry['wins'] += 1
+            entry['sum_win'] += ret
+        else:
+            entry['sum_loss'] += ret
+        entry['position'] = 0
+        entry['entry_price'] = None
+
+    def record_backtest(self, symbol: str, strategy: str, trades: pd.DataFrame,
+                        last_date: Optional[Any] = None):
+        """
+        Replace a (symbol, strategy) entry with the results of a backtest.
+
+        Args:
+            trades: BacktestEngine trades frame (BUY/SELL rows with Price, Value, PnL).
+            last_date: Last bar the backtest covered; update_bars() continues after it.
+        """
+        entry = self._empty()
+        if trades is not None and not trades.empty:
+            sells = trades[trades['Type'] == 'SELL']
+            returns = sells['PnL'].to_numpy(dtype=float) / (sells['Value'] - sells['PnL']).to_numpy(dtype=float)
+            entry['trades'] = int(len(returns))
+            entry['wins'] = int((returns > 0).sum())
+            entry['sum_return'] = float(returns.sum())
+            entry['sum_win'] = float(returns[returns > 0].sum())
+            entry['sum_loss'] = float(returns[returns <= 0].sum())
+            last = trades.iloc[-1]
+            if last['Type'] == 'BUY':
+                # Still holding at the end of the backtest
+                entry['position'] = 1
+                entry['entry_price'] = float(last['Price'])
+        if last_date is not None:
+            entry['last_date'] = pd.Timestamp(last_date).isoformat()
+        entry['updated_at'] = time.time()
+        with self._lock:
+            self.stats[self._key(symbol, strategy)] = entry
+
+    def update_bars(self, symbol: str, strategy: str, dates, closes, signals) -> int:
+        """
+        Apply completed bars (oldest first) to a (symbol, strategy) entry.
+        Bars at or before the entry's last_date are skipped, so the same bars
+        can be passed on every scan.
+
+        Args:
+            dates: Bar timestamps.
+            closes: Bar closes (trade prices).
+            signals: Strategy signal per bar: 1 Buy, -1 Sell, 0 none.
+
+        Returns:
+            Number of bars applied.
+        """
+        dates = [pd.Timestamp(d).isoformat() for d in np.atleast_1d(dates)]
+        closes = np.atleast_1d(np.asarray(closes, dtype=float))
+        signals = np.atleast_1d(signals)
+        applied = 0
+        with self._lock:
+            entry = self.stats.setdefault(self._key(symbol, strategy), self._empty())
+            for date, close, signal in zip(dates, closes, signals):
+                if entry['last_date'] is not None and date <= entry['last_date']:
+                    continue
+                if signal == 1 and not entry['position']:
+                    entry['position'] = 1
+                    entry['entry_price'] = float(close)
+                elif signal == -1 and entry['position']:
+                    self._close_trade(entry, float(close))
+                entry['last_date'] = date
+                applied += 1
+            if applied:
+                entry['updated_at'] = time.time()
+        return applied
+
+    def last_date(self, symbol: str, strategy: str) -> Optional[str]:
+        """ISO timestamp of the last bar applied to an entry, or None before any."""
+        entry = self.stats.get(self._key(symbol, strategy))
+        return entry['last_date'] if entry is not None else None
+
+    def get(self, symbol: str, strategy: str) -> Dict[str, Any]:
+        """Summary for one (symbol, strategy): trades, win_rate (%), expectancy (% per trade), open."""
+        entry = self.stats.get(self._key(symbol, strategy))
+        if entry is None or entry['trades'] == 0:
+            return {'trades': 0, 'win_rate': None, 'expectancy': None,
+                    'open': bool(entry and entry['position'])}
+        trades = entry['trades']
+        return {
+            'trades': trades,
+            'win_rate': entry['wins'] / trades * 100,
+            'expectancy': entry['sum_return'] / trades * 100,
+            'avg_win': entry['sum_win'] / entry['wins'] * 100 if entry['wins'] else 0.0,
+            'avg_loss': entry['sum_loss'] / (trades - entry['wins']) * 100 if trades > entry['wins'] else 0.0,
+            'open': bool(entry['position'])
+        }
+
+    def win_rate(self, symbol: str, strategy: str, default: float = 50.0) -> float:
+        """Win rate % for prioritization; `default` until min_trades trades are recorded."""
+        entry = self.stats.get(self._key(symbol, strategy))
+        if entry is None or entry['trades'] < max(1, self.min_trades):
+            return default
+        return entry['wins'] / entry['trades'] * 100
+
+    def expectancy(self, symbol: str, strategy: str, default: float = 0.0) -> float:
+        """Average closed-trade return in %, or `default` without trades."""
+        entry = self.stats.get(self._key(symbol, strategy))
+        if entry is None or entry['trades'] == 0:
+            return default
+        return entry['sum_return'] / entry['trades'] * 100
+
+    def enrich(self, signal: Dict[str, Any], default: float = 50.0) -> Dict[str, Any]:
+        """Set 'win_rate' / 'expectancy' / 'trades' on a signal dict from its symbol and strategy."""
+        summary = self.get(signal['symbol'], signal['strategy'])
+        signal['win_rate'] = self.win_rate(signal['symbol'], signal['strategy'], default)
+        signal['expectancy'] = summary['expectancy'] if summary['expectancy'] is not None else 0.0
+        signal['trades'] = summary['trades']
+        return signal
+
+    def save(self, path: Optional[str] = None):
+        """Persist all entries to JSON (written to a temp file, then swapped in)."""
+        path = path or self.state_file
+        if not path:
+            return
+        with self._lock:
+            data = {'stats': {key: dict(entry) for key, entry in self.stats.items()}}
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(data, f, indent=1)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[STATS] Error saving strategy stats: {e}")
+
+    def load(self, path: Optional[str] = None):
+        """Restore entries saved by save()."""
+        path = path or self.state_file
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            with self._lock:
+                self.stats = {key: {**self._empty(), **entry} for key, entry in data.get('stats', {}).items()}
+        except Exception as e:
+            print(f"[STATS] Error loading strategy stats: {e}")
@@ -0,0 +1,268 @@
+import time
+import signal
+import asyncio
+import inspect
+import traceback
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+# What to do when a job is due while its previous run is still going
+OVERRUN_SKIP = 'skip'          # Drop the tick; the job runs again at the next one
+OVERRUN_COALESCE = 'coalesce'  # Run once more right after the current run, however many ticks were missed
+
+
+class AsyncScheduler:
+    """
+    Fixed-rate job runner on asyncio.
+
+    Each job gets its own timer task. Ticks stay on a fixed grid
+    (start + k * interval) measured with the monotonic clock, so a long job
+    does not push later runs back. A job is started as its own task rather
+    than awaited by its timer, so jobs run concurrently (a heartbeat keeps
+    ticking during a long scan). A job that is still running when it is due
+    again is never started twice; the tick is skipped or coalesced according
+    to the job's overrun policy.
+
+    Plain functions are run in a worker thread (asyncio.to_thread) so they
+    cannot stall the event loop; coroutine functions run on the loop.
+
+    Usage:
+        scheduler = AsyncScheduler()
+        scheduler.every(60, bot.job_market_scan_async, name='scan', overrun=OVERRUN_COALESCE)
+        scheduler.every(30, bot.heartbeat, name='heartbeat')
+        asyncio.run(scheduler.run())   # until stop(), SIGINT or SIGTERM
+    """
+
+    def __init__(self, latency_window: int = 100):
+        """
+        Args:
+            latency_window (int): Recent runs kept per job for the latency percentiles.
+        """
+        self.latency_window = latency_window
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self._stop_event: Optional[asyncio.Event] = None
+        self._timers: List[asyncio.Task] = []
+
+    def every(self, interval: float, func: Callable, name: Optional[str] = None,
+              overrun: str = OVERRUN_SKIP, run_immediately: bool = True,
+              timeout: Optional[float] = None, when: Optional[Callable[[], bool]] = None):
+        """
+        Register a job.
+
+        Args:
+            interval (float): Seconds between ticks.
+            func: Coroutine function or plain function, called without arguments.
+            name (str): Job name for stats/logs (default: function name).
+            overrun (str): OVERRUN_SKIP or OVERRUN_COALESCE.
+            run_immediately (bool): First run at start instead of after one interval.
+            timeout (float): Give up on a run after this many seconds (a coroutine is
+                             cancelled; a thread cannot be killed, so it is abandoned
+                             but the job still counts as running until it returns).
+            when: Optional cheap predicate checked at each tick; the job only runs
+                  while it returns True (e.g. market hours). Other ticks count as idle.
+        """
+        if overrun not in (OVERRUN_SKIP, OVERRUN_COALESCE):
+            raise ValueError(f"Unknown overrun policy: {overrun}")
+        name = name or getattr(func, '__name__', 'job')
+        self.jobs[name] = {
+            'name': name,
+            'interval': float(interval),
+            'func': func,
+            'overrun': overrun,
+            'run_immediately': run_immediately,
+            'timeout': timeout,
+            'when': when,
+            'task': None,                # Current run, if any
+            'thread': None,              # Worker-thread future of a plain-function run
+            'abandoned': False,          # That thread outlived its run's timeout
+            'pending': False,            # Coalesced run waiting for the current one
+            'runs': 0,
+            'errors': 0,
+            'skipped': 0,
+            'coalesced': 0,
+            'idle': 0,                   # Ticks passed over because `when` was False
+            'last_error': None,
+            'last_started': None,        # time.time() of the last start
+            'durations': deque(maxlen=self.latency_window),
+            'start_lags': deque(maxlen=self.latency_window)
+        }
+        return self
+
+    async def _call(self, job: Dict[str, Any]):
+        func = job['func']
+        if inspect.iscoroutinefunction(func):
+            if job['timeout']:
+                return await asyncio.wait_for(func(), timeout=job['timeout'])
+            return await func()
+        # The thread keeps running after a timeout; its future is tracked so no
+        # second copy of the job starts until the function has actually returned
+        thread = asyncio.ensure_future(asyncio.to_thread(func))
+        job['thread'] = thread
+        thread.add_done_callback(lambda _: self._on_thread_done(job, thread))
+        try:
+            return await asyncio.wait_for(asyncio.shield(thread), timeout=job['timeout'] or None)
+        except asyncio.TimeoutError:
+            job['abandoned'] = not thread.done()
+            raise
+
+    async def _execute(self, job: Dict[str, Any], due: float):
+        """One run of a job, with timing and error capture."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        job['start_lags'].append(max(0.0, started - due))
+        job['last_started'] = time.time()
+        try:
+            await self._call(job)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            job['errors'] += 1
+            job['last_error'] = f"timeout (> {job['timeout']:g}s)"
+            print(f"[SCHEDULER] Job '{job['name']}' timed out after {job['timeout']:g}s")
+        except Exception as e:
+            job['errors'] += 1
+            job['last_error'] = str(e)
+            print(f"[SCHEDULER] Job '{job['name']}' failed: {e}")
+            traceback.print_exc()
+        finally:
+            job['runs'] += 1
+            job['durations'].append(loop.time() - started)
+
+    def _start(self, job: Dict[str, Any], due: float):
+        """Launch a run as its own task; `due` is the loop time it was scheduled for."""
+        task = asyncio.ensure_future(self._execute(job, due))
+        job['task'] = task
+        task.add_done_callback(lambda _: self._on_done(job))
+
+    def _on_done(self, job: Dict[str, Any]):
+        job['task'] = None
+        if job['pending'] and not self._stopping() and not self._is_running(job):
+            job['pending'] = False
+            self._start(job, asyncio.get_running_loop().time())
+
+    def _on_thread_done(self, job: Dict[str, Any], thread: asyncio.Future):
+        if job['thread'] is not thread:
+            return
+        job['thread'] = None
+        if job['abandoned']:
+            job['abandoned'] = False
+            error = None if thread.cancelled() else thread.exception()
+            print(f"[SCHEDULER] Timed-out run of '{job['name']}' finished"
+                  f"{f' with error: {error}' if error else ''}.")
+        # A coalesced run held back by the abandoned thread can start now
+        if job['task'] is None:
+            self._on_done(job)
+
+    def _is_running(self, job: Dict[str, Any]) -> bool:
+        """A run's task is active, or a timed-out run's thread has not returned yet."""
+        task, thread = job['task'], job['thread']
+        return (task is not None and not task.done()) or (thread is not None and not thread.done())
+
+    def _stopping(self) -> bool:
+        return self._stop_event is None or self._stop_event.is_set()
+
+    async def _timer(self, job: Dict[str, Any]):
+        interval = job['interval']
+        loop = asyncio.get_running_loop()
+        next_due = loop.time() if job['run_immediately'] else loop.time() + interval
+        while not self._stopping():
+            delay = next_due - loop.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._stop_event.wait(), timeout=delay)
+                    break  # Stop requested while waiting
+                except asyncio.TimeoutError:
+                    pass
+
+            running = self._is_running(job)
+            if job['when'] is not None and not running and not self._is_active(job):
+                job['idle'] += 1
+            elif not running:
+                self._start(job, next_due)
+            elif job['overrun'] == OVERRUN_COALESCE:
+                if job['pending']:
+                    job['skipped'] += 1   # Already one run queued; fold this tick into it
+                else:
+                    job['pending'] = True
+                    job['coalesced'] += 1
+            else:
+                job['skipped'] += 1
+                print(f"[SCHEDULER] '{job['name']}' still running; skipping this tick.")
+
+            # Stay on the fixed grid; ticks missed while the loop was busy are dropped
+            next_due += interval
+            now = loop.time()
+            if next_due <= now:
+                missed = int((now - next_due) // interval) + 1
+                next_due += missed * interval
+
+    def _is_active(self, job: Dict[str, Any]) -> bool:
+        try:
+            return bool(job['when']())
+        except Exception as e:
+            print(f"[SCHEDULER] Condition for '{job['name']}' failed: {e}")
+            return False
+
+    def stop(self):
+        """Ask run() to finish: timers stop and running jobs are cancelled."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+
+    def _install_signal_handlers(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, self.stop)
+            except (NotImplementedError, RuntimeError, ValueError):
+                # Windows / non-main thread: KeyboardInterrupt still ends asyncio.run()
+                pass
+
+    async def run(self, handle_signals: bool = True):
+        """Run all jobs until stop() (or SIGINT/SIGTERM), then cancel whatever is still running."""
+        self._stop_event = asyncio.Event()
+        if handle_signals:
+            self._install_signal_handlers()
+        self._timers = [asyncio.ensure_future(self._timer(job)) for job in self.jobs.values()]
+        try:
+            await self._stop_event.wait()
+        finally:
+            self._stop_event.set()
+            await self.shutdown()
+
+    async def shutdown(self):
+        """Cancel timers and in-flight jobs and wait for them to unwind."""
+        tasks = list(self._timers)
+        for job in self.jobs.values():
+            job['pending'] = False
+            if job['task'] is not None:
+                tasks.append(job['task'])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._timers = []
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Per-job counters and latency in seconds: last / mean / p95 / max run
+        duration, and mean start lag (how late runs started versus their tick).
+        """
+        report = {}
+        for name, job in self.jobs.items():
+            durations = list(job['durations'])
+            lags = list(job['start_lags'])
+            ordered = sorted(durations)
+            report[name] = {
+                'runs': job['runs'],
+                'errors': job['errors'],
+                'skipped': job['skipped'],
+                'coalesced': job['coalesced'],
+                'idle': job['idle'],
+                'running': self._is_running(job),
+                'last_error': job['last_error'],
+                'last_duration': durations[-1] if durations else None,
+                'mean_duration': sum(durations) / len(durations) if durations else None,
+                'p95_duration': ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))] if ordered else None,
+                'max_duration': ordered[-1] if ordered else None,
+                'mean_start_lag': sum(lags) / len(lags) if lags else None
+            }
+        return report
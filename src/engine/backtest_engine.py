@@ -1,5 +1,33 @@
+import numpy as np
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Tuple, List, Optional, Dict, Any
 from src.data.market_data import MarketData
+from src.data.strategy_stats import StrategyStats
+from src.engine.metrics import compute_metrics
+
+
+def _run_backtest_worker(task: Tuple[str, Any, str, float]) -> Dict[str, Any]:
+    """Process-pool task for BacktestEngine.run_many (module level so it pickles)."""
+    symbol, strategy, period, initial_capital = task
+    engine = BacktestEngine(initial_capital=initial_capital)
+    # run_many has just topped up the cache; read it without another download
+    engine.market_data.max_age_seconds = float('inf')
+    try:
+        df = engine.market_data.get_history(symbol, period=period)
+        if df.empty:
+            return {'symbol': symbol, 'error': 'No data found.'}
+        df = strategy.calculate(df)
+        if 'Action_Zone_Signal' not in df.columns:
+            return {'symbol': symbol, 'error': "Strategy did not generate 'Action_Zone_Signal' column."}
+        trades, equity = engine.simulate(df)
+        position = engine.positions(df['Action_Zone_Signal'].to_numpy())
+        last_date = df['Date'].iloc[-1] if 'Date' in df.columns else df.index[-1]
+        return {'symbol': symbol, 'trades': trades, 'equity': equity, 'position': position,
+                'last_date': last_date}
+    except Exception as e:
+        return {'symbol': symbol, 'error': str(e)}
+
 
 class BacktestEngine:
     def __init__(self, initial_capital=10000.0):
@@ -25,65 +53,190 @@ class BacktestEngine:
             return None, None
 
         # 3. Simulate Trades
-        # Signal: 1 (Buy/Hold), -1 (Sell), 0 (Neutral)
-        
-        trades = []
-        position = 0 # 0: None, 1: Long
-        capital = self.initial_capital
-        shares = 0
-        
-        # Simplified Logic:
-        # Buy when Signal turns 1 (Green) from non-1 (or just check state if we want to valid always being in market)
-        # CDC typically: Green = Buy/Hold, Red = Sell/Stay Out.
-        # So we enter if Green AND position=0. We exit if Red AND position=1.
-        
-        for index, row in df.iterrows():
-            current_signal = row['Action_Zone_Signal']
-            price = row['Close']
-            # Date might be in index or column depending on reset_index in market_data
-            date = row['Date'] if 'Date' in row else index
-            
-            if position == 0:
-                if current_signal == 1:
-                    # BUY SIGNAL
-                    position = 1
-                    shares = capital / price
-                    trades.append({
-                        'Date': date,
-                        'Type': 'BUY',
-                        'Price': price,
-                        'Shares': shares,
-                        'Value': capital,
-                        'PnL': 0.0
-                    })
-            elif position == 1:
-                # Check for Exit
-                if current_signal == -1:
-                    # SELL SIGNAL
-                    position = 0
-                    new_capital = shares * price
-                    pnl = new_capital - capital
-                    capital = new_capital
-                    
-                    trades.append({
-                        'Date': date,
-                        'Type': 'SELL',
-                        'Price': price,
-                        'Shares': shares,
-                        'Value': capital,
-                        'PnL': pnl
-                    })
-                    shares = 0
+        trades, equity = self.simulate(df)
+        df['Position'] = self.positions(df['Action_Zone_Signal'].to_numpy())
+        df['Equity'] = equity
         
         # Calculate final portfolio value
-        final_value = capital
-        if position == 1:
-            current_price = df.iloc[-1]['Close']
-            final_value = shares * current_price
+        final_value = equity[-1]
             
         print(f"Initial Capital: {self.initial_capital:,.2f}")
         print(f"Final Value: {final_value:,.2f}")
         print(f"Return: {((final_value - self.initial_capital) / self.initial_capital) * 100:.2f}%")
         print(f"Total Trades: {len(trades)}")
         
-        return pd.DataFrame(trades), df
+        metrics = compute_metrics(equity, df['Position'].to_numpy())
+        print(f"CAGR: {metrics['cagr_pct']:.2f}% | Sharpe: {metrics['sharpe']:.2f} | Sortino: {metrics['sortino']:.2f}")
+        print(f"Max Drawdown: {metrics['max_drawdown_pct']:.2f}% ({metrics['max_drawdown_bars']:.0f} bars) | "
+              f"Exposure: {metrics['exposure_pct']:.1f}%")
+        print(f"Win Rate: {metrics['win_rate_pct']:.2f}% | Profit Factor: {metrics['profit_factor']:.2f} | "
+              f"Avg Win/Loss: {metrics['avg_win_pct']:.2f}% / {metrics['avg_loss_pct']:.2f}% | "
+              f"Avg Hold: {metrics['avg_holding_bars']:.1f} bars")
+        
+        return trades, df
+
+    def run_many(self, symbols: List[str], strategy, period="1y",
+                 max_workers: Optional[int] = None, stats: Optional[StrategyStats] = None,
+                 strategy_name: Optional[str] = None) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Backtest many symbols in parallel on a process pool.
+        History is fetched once up front with get_history_many (concurrent
+        downloads filling the local cache), then each worker reads its symbol
+        from the cache.
+        
+        Args:
+            symbols (List[str]): Symbols to backtest.
+            strategy: Strategy object with calculate(df); must be picklable.
+            period (str): History period per symbol.
+            max_workers (int): Worker processes (default: CPU count).
+            stats (StrategyStats): If given, each symbol's trades are recorded
+                                   under `strategy_name` (default: the strategy class name).
+            
+        Returns:
+            (summary DataFrame, one row per symbol,
+             all trades DataFrame with a 'Symbol' column)
+        """
+        print(f"--- Starting Backtest of {len(symbols)} symbols ({type(strategy).__name__}) ---")
+        self.market_data.get_history_many(symbols, period=period)
+        
+        tasks = [(symbol, strategy, period, self.initial_capital) for symbol in symbols]
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            results = list(pool.map(_run_backtest_worker, tasks))
+        
+        rows = []
+        all_trades = []
+        for result in results:
+            symbol = result['symbol']
+            if 'error' in result:
+                print(f"  {symbol}: {result['error']}")
+                continue
+            trades, equity = result['trades'], result['equity']
+            metrics = compute_metrics(equity, result['position'])
+            rows.append({
+                'Symbol': symbol,
+                'Trades': len(trades),
+                'Closed Trades': int(metrics['trades']),
+                'Win Rate %': 0.0 if np.isnan(metrics['win_rate_pct']) else metrics['win_rate_pct'],
+                'Final Value': equity[-1],
+                'Return %': metrics['total_return_pct'],
+                'CAGR %': metrics['cagr_pct'],
+                'Sharpe': metrics['sharpe'],
+                'Max DD %': metrics['max_drawdown_pct'],
+                'Exposure %': metrics['exposure_pct'],
+                'Profit Factor': metrics['profit_factor'],
+                'Avg Hold (bars)': metrics['avg_holding_bars']
+            })
+            if not trades.empty:
+                all_trades.append(trades.assign(Symbol=symbol))
+            if stats is not None:
+                stats.record_backtest(symbol, strategy_name or type(strategy).__name__, trades,
+                                      last_date=result['last_date'])
+        
+        summary = pd.DataFrame(rows)
+        trades = pd.concat(all_trades, ignore_index=True) if all_trades else pd.DataFrame()
+        return summary, trades
+
+    @staticmethod
+    def positions(signal: np.ndarray) -> np.ndarray:
+        """
+        Position held after each bar (1 = long, 0 = flat) for a signal array.
+        Signal: 1 (Buy/Hold), -1 (Sell), 0 (Neutral)
+        
+        CDC typically: Green = Buy/Hold, Red = Sell/Stay Out.
+        So we enter if Green AND flat, exit if Red AND long, i.e. the position
+        is decided by the most recent non-zero signal.
+        """
+        signal = np.asarray(signal)
+        # Works along axis 0, so a (time x columns) signal matrix is handled in one call
+        idx = np.arange(len(signal)).reshape((-1,) + (1,) * (signal.ndim - 1))
+        last_nonzero = np.maximum.accumulate(np.where(signal != 0, idx, -1), axis=0)
+        last_signal = np.take_along_axis(signal, np.maximum(last_nonzero, 0), axis=0)
+        last_signal = np.where(last_nonzero >= 0, last_signal, 0)
+        return (last_signal == 1).astype(np.int8)
+
+    @staticmethod
+    def equity_matrix(close: np.ndarray, position: np.ndarray, initial_capital: float = 10000.0) -> np.ndarray:
+        """
+        Equity curves for many columns at once (no trade list), same all-in
+        sizing as simulate(): a bar's return counts when the previous bar ended long.
+        
+        Args:
+            close (np.ndarray): (time x columns) closes; NaN bars carry the last price.
+            position (np.ndarray): (time x columns) positions from positions().
+            
+        Returns:
+            (time x columns) portfolio value after each bar.
+        """
+        close = pd.DataFrame(np.asarray(close, dtype=float)).ffill().to_numpy()
+        growth = np.ones_like(close)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            growth[1:] = close[1:] / close[:-1]
+        held = np.asarray(position)[:-1] == 1
+        growth[1:] = np.where(held & np.isfinite(growth[1:]), growth[1:], 1.0)
+        return initial_capital * np.cumprod(growth, axis=0)
+
+    def simulate(self, df: pd.DataFrame, close_col='Close') -> Tuple[pd.DataFrame, np.ndarray]:
+        """
+        Array-based trade simulation on a frame that already has 'Action_Zone_Signal'.
+        Entries/exits come from the position changes; only the per-trade capital
+        roll-forward is a loop (over trades, not bars), which keeps the
+        arithmetic identical to a bar-by-bar simulation.
+        
+        Returns:
+            (trades DataFrame with Date/Type/Price/Shares/Value/PnL rows,
+             equity curve: portfolio value after each bar)
+        """
+        price = df[close_col].to_numpy(dtype=float)
+        # Date might be in index or column depending on reset_index in market_data
+        dates = df['Date'].to_numpy() if 'Date' in df.columns else df.index.to_numpy()
+        
+        position = self.positions(df['Action_Zone_Signal'].to_numpy())
+        change = np.diff(position, prepend=0)
+        entries = np.flatnonzero(change == 1)
+        exits = np.flatnonzero(change == -1)
+        
+        # Capital roll-forward: shares = capital / entry, capital = shares * exit
+        capital = self.initial_capital
+        shares = np.empty(len(entries))
+        entry_value = np.empty(len(entries))
+        exit_value = np.empty(len(exits))
+        pnl = np.empty(len(exits))
+        for k, e in enumerate(entries):
+            entry_value[k] = capital
+            shares[k] = capital / price[e]
+            if k < len(exits):
+                new_capital = shares[k] * price[exits[k]]
+                pnl[k] = new_capital - capital
+                capital = new_capital
+                exit_value[k] = capital
+        
+        # Equity: shares * price while long, last realised capital while flat
+        cash_levels = np.concatenate([[self.initial_capital], exit_value])
+        cash = cash_levels[np.cumsum(change == -1)]
+        trade_id = np.cumsum(change == 1) - 1
+        held_value = shares[np.maximum(trade_id, 0)] * price if len(entries) else np.zeros(len(price))
+        equity = np.where(position == 1, held_value, cash)
+        
+        if len(entries) == 0:
+            return pd.DataFrame(), equity
+        
+        # Interleave BUY/SELL rows in time order
+        n_rows = len(entries) + len(exits)
+        rows = np.empty(n_rows, dtype=np.int64)
+        rows[0::2] = entries
+        rows[1::2] = exits
+        value = np.empty(n_rows)
+        value[0::2] = entry_value
+        value[1::2] = exit_value
+        row_pnl = np.zeros(n_rows)
+        row_pnl[1::2] = pnl
+        
+        trades = pd.DataFrame({
+            'Date': dates[rows],
+            'Type': np.where(np.arange(n_rows) % 2 == 0, 'BUY', 'SELL'),
+            'Price': price[rows],
+            'Shares': shares[np.arange(n_rows) // 2],
+            'Value': value,
+            'PnL': row_pnl
+        })
+        return trades, equity
@@ -0,0 +1,109 @@
+import numpy as np
+from typing import Dict, Optional, Union
+
+Metric = Union[float, np.ndarray]
+
+
+def compute_metrics(equity: np.ndarray, position: Optional[np.ndarray] = None,
+                    periods_per_year: int = 252) -> Dict[str, Metric]:
+    """
+    Backtest performance metrics in one vectorized pass.
+
+    Works on a single equity curve (shape (T,)) or on many at once (shape (T, K),
+    one column per symbol / parameter set), which keeps it cheap inside sweeps.
+
+    Args:
+        equity (np.ndarray): Portfolio value after each bar.
+        position (np.ndarray): Same shape, 1 while a position is held after the
+                               bar, 0 when flat (BacktestEngine.positions()).
+                               Trades are read from its 0->1 / 1->0 changes.
+                               Without it, exposure and trade metrics are NaN.
+        periods_per_year (int): Bars per year (252 for daily bars).
+
+    Returns:
+        Dict of floats (1-D input) or (K,) arrays (2-D input):
+            total_return_pct, cagr_pct, sharpe, sortino,
+            max_drawdown_pct, max_drawdown_bars, exposure_pct,
+            trades, win_rate_pct, profit_factor, avg_win_pct, avg_loss_pct,
+            avg_holding_bars
+    """
+    equity = np.asarray(equity, dtype=float)
+    single = equity.ndim == 1
+    if single:
+        equity = equity[:, None]
+        if position is not None:
+            position = np.asarray(position)[:, None]
+    n_bars, n_cols = equity.shape
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Returns
+        growth = equity[-1] / equity[0]
+        total_return = (growth - 1) * 100
+        years = (n_bars - 1) / periods_per_year
+        cagr = (growth ** (1 / years) - 1) * 100 if years > 0 else np.full(n_cols, np.nan)
+
+        rets = equity[1:] / equity[:-1] - 1
+        mean = rets.mean(axis=0) if len(rets) else np.full(n_cols, np.nan)
+        std = rets.std(axis=0, ddof=1) if len(rets) > 1 else np.full(n_cols, np.nan)
+        downside = np.sqrt((np.minimum(rets, 0) ** 2).mean(axis=0)) if len(rets) else np.full(n_cols, np.nan)
+        sharpe = np.where(std > 0, mean / std * np.sqrt(periods_per_year), np.nan)
+        sortino = np.where(downside > 0, mean / downside * np.sqrt(periods_per_year), np.nan)
+
+        # Drawdown depth and duration (bars since the last equity high)
+        peak = np.maximum.accumulate(equity, axis=0)
+        drawdown = equity / peak - 1
+        max_drawdown = drawdown.min(axis=0) * 100
+        bar = np.arange(n_bars)[:, None]
+        last_peak = np.maximum.accumulate(np.where(drawdown >= 0, bar, 0), axis=0)
+        max_dd_bars = (bar - last_peak).max(axis=0)
+
+        # Exposure and trades
+        nan = np.full(n_cols, np.nan)
+        exposure = trades = win_rate = profit_factor = avg_win = avg_loss = avg_hold = nan
+        if position is not None:
+            position = np.asarray(position).astype(np.int8)
+            exposure = position.mean(axis=0) * 100
+
+            change = np.diff(position, axis=0, prepend=0)
+            # Bar index of the most recent entry, for every bar
+            last_entry = np.maximum.accumulate(np.where(change == 1, bar, -1), axis=0)
+            exit_t, exit_c = np.nonzero(change == -1)
+            entry_t = last_entry[exit_t, exit_c]
+
+            pnl = equity[exit_t, exit_c] - equity[entry_t, exit_c]
+            trade_ret = equity[exit_t, exit_c] / equity[entry_t, exit_c] - 1
+            wins = trade_ret > 0
+
+            def per_col(weights):
+                return np.bincount(exit_c, weights=weights, minlength=n_cols)
+
+            trades = per_col(None)
+            n_wins = per_col(wins.astype(float))
+            gross_profit = per_col(np.where(pnl > 0, pnl, 0.0))
+            gross_loss = -per_col(np.where(pnl < 0, pnl, 0.0))
+
+            win_rate = np.where(trades > 0, n_wins / trades * 100, np.nan)
+            profit_factor = np.where(gross_loss > 0, gross_profit / gross_loss,
+                                     np.where(gross_profit > 0, np.inf, np.nan))
+            avg_win = per_col(np.where(wins, trade_ret, 0.0)) / n_wins * 100
+            avg_loss = per_col(np.where(~wins, trade_ret, 0.0)) / (trades - n_wins) * 100
+            avg_hold = per_col((exit_t - entry_t).astype(float)) / trades
+
+    metrics = {
+        'total_return_pct': total_return,
+        'cagr_pct': cagr,
+        'sharpe': sharpe,
+        'sortino': sortino,
+        'max_drawdown_pct': max_drawdown,
+        'max_drawdown_bars': max_dd_bars,
+        'exposure_pct': exposure,
+        'trades': trades,
+        'win_rate_pct': win_rate,
+        'profit_factor': profit_factor,
+        'avg_win_pct': avg_win,
+        'avg_loss_pct': avg_loss,
+        'avg_holding_bars': avg_hold
+    }
+    if single:
+        metrics = {key: float(np.asarray(value)[0]) for key, value in metrics.items()}
+    return metrics
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Optional
+
+
+def trade_returns(trades: pd.DataFrame) -> np.ndarray:
+    """
+    Per-trade returns (fractions) from a BacktestEngine trades frame:
+    PnL of each SELL row over the capital that went into the trade.
+    """
+    if trades is None or trades.empty:
+        return np.array([])
+    sells = trades[trades['Type'] == 'SELL']
+    cost = (sells['Value'] - sells['PnL']).to_numpy(dtype=float)
+    return sells['PnL'].to_numpy(dtype=float) / cost
+
+
+class MonteCarloSimulator:
+    """
+    Bootstrap robustness check for a strategy's trade list.
+
+    Trade returns are resampled with replacement into `n_paths` synthetic
+    trade sequences, held as one (paths x trades) array, and compounded with
+    a single cumprod. The spread of the outcomes shows how much of a
+    backtest's return, drawdown and win rate could be luck of the trade order
+    or of a small sample.
+    """
+
+    def __init__(self, n_paths: int = 10000, confidence: float = 95.0, seed: Optional[int] = None):
+        """
+        Args:
+            n_paths (int): Synthetic equity paths to draw.
+            confidence (float): Width of the reported intervals, in % (95 -> 2.5th..97.5th percentile).
+            seed (int): Random seed, for reproducible runs.
+        """
+        self.n_paths = n_paths
+        self.confidence = confidence
+        self.rng = np.random.default_rng(seed)
+
+    def simulate(self, returns: np.ndarray, n_trades: Optional[int] = None,
+                 fraction: float = 1.0) -> np.ndarray:
+        """
+        Equity multiples of the resampled paths.
+
+        Args:
+            returns (np.ndarray): Per-trade returns (fractions, e.g. trade_returns()).
+            n_trades (int): Trades per path (default: as many as in `returns`).
+            fraction (float): Share of equity put into each trade (1.0 = all in, as in BacktestEngine).
+
+        Returns:
+            (n_paths x n_trades) array: equity after each trade, starting from 1.0.
+        """
+        returns = np.asarray(returns, dtype=float)
+        n_trades = n_trades or len(returns)
+        sampled = returns[self.rng.integers(0, len(returns), size=(self.n_paths, n_trades))]
+        return np.cumprod(1.0 + fraction * sampled, axis=1)
+
+    def _interval(self, values: np.ndarray) -> Dict[str, float]:
+        tail = (100.0 - self.confidence) / 2
+        low, median, high = np.percentile(values, [tail, 50.0, 100.0 - tail])
+        return {'low': float(low), 'median': float(median), 'high': float(high)}
+
+    def run(self, returns: np.ndarray, n_trades: Optional[int] = None, fraction: float = 1.0,
+            initial_capital: float = 10000.0) -> Dict[str, Any]:
+        """
+        Resample `returns` and summarize the outcome distribution.
+
+        Returns:
+            Dict with 'paths', 'trades', 'prob_loss_pct', 'final_value' (median)
+            and 'low' / 'median' / 'high' intervals for 'total_return_pct',
+            'max_drawdown_pct' and 'win_rate_pct'. Empty dict without trades.
+        """
+        returns = np.asarray(returns, dtype=float)
+        returns = returns[np.isfinite(returns)]
+        if len(returns) == 0:
+            return {}
+        n_trades = n_trades or len(returns)
+        curve = self.simulate(returns, n_trades, fraction)
+
+        final = curve[:, -1]
+        # Drawdowns measured from the starting equity (1.0) as well as later highs
+        peak = np.maximum(np.maximum.accumulate(curve, axis=1), 1.0)
+        max_drawdown = (curve / peak - 1).min(axis=1)
+        # Win rate per path: share of trades that gained (resampling the same draws)
+        growth = np.diff(curve, axis=1, prepend=1.0)
+        win_rate = (growth > 0).mean(axis=1)
+
+        return {
+            'paths': self.n_paths,
+            'trades': n_trades,
+            'total_return_pct': self._interval((final - 1) * 100),
+            'max_drawdown_pct': self._interval(max_drawdown * 100),
+            'win_rate_pct': self._interval(win_rate * 100),
+            'prob_loss_pct': float((final < 1.0).mean() * 100),
+            'final_value': float(np.median(final) * initial_capital)
+        }
+
+    def run_trades(self, trades: pd.DataFrame, **kwargs) -> Dict[str, Any]:
+        """run() on the trade returns of a BacktestEngine trades frame."""
+        return self.run(trade_returns(trades), **kwargs)
@@ -0,0 +1,190 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from src.data.market_data import MarketData
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.metrics import compute_metrics
+from src.strategies.cdc_action_zone import ZONE_SIGNALS, ema_matrix, zone_codes
+from src.strategies.fibo_strategy import FiboZoneStrategy
+
+
+def score_signals(close: np.ndarray, signal: np.ndarray, symbols: Sequence[str],
+                  keys: List[str], grid: Sequence[Tuple], initial_capital: float,
+                  periods_per_year: int, sort_by: str) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Score stacked signals: column block k of `signal` holds parameter set grid[k]
+    for every symbol. Positions, equity curves and metrics are computed for all
+    columns at once.
+
+    Returns:
+        (ranked table: metrics averaged over symbols per parameter set, trades summed,
+         detail table: one row per (parameter set, symbol))
+    """
+    n_symbols = len(symbols)
+    position = BacktestEngine.positions(signal)
+    equity = BacktestEngine.equity_matrix(np.tile(close, len(grid)), position, initial_capital)
+    metrics = compute_metrics(equity, position, periods_per_year=periods_per_year)
+
+    detail = pd.DataFrame(metrics)
+    detail.insert(0, 'symbol', np.tile(symbols, len(grid)))
+    for i, key in reversed(list(enumerate(keys))):
+        detail.insert(0, key, np.repeat([params[i] for params in grid], n_symbols))
+
+    ranked = detail.drop(columns='symbol').replace([np.inf, -np.inf], np.nan)
+    ranked = ranked.groupby(keys, sort=False).mean()
+    ranked['trades'] = detail.groupby(keys, sort=False)['trades'].sum()
+    ranked = ranked.sort_values(sort_by, ascending=False, na_position='last').reset_index()
+    ranked.insert(0, 'rank', np.arange(1, len(ranked) + 1))
+    return ranked, detail
+
+
+class CDCParameterSweep:
+    """
+    Grid search over CDC Action Zone (fast, slow) EMA periods for a whole
+    universe in one batched computation.
+
+    Closes are aligned into one (time x symbols) matrix. Every distinct EMA
+    span in the grid is computed once with ema_matrix() and shared by all
+    pairs that use it. Each pair's zones, positions and equity curves are
+    then plain array operations, and compute_metrics() scores all
+    (pair x symbol) curves in a single call. signals() exposes the stacked
+    signals for other harnesses (e.g. WalkForwardOptimizer).
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, periods_per_year: int = 252):
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self.market_data = MarketData()
+
+    @staticmethod
+    def pairs(fast_periods: Iterable[int], slow_periods: Iterable[int]) -> List[Tuple[int, int]]:
+        """All (fast, slow) combinations with fast < slow."""
+        return [(fast, slow) for fast in sorted(set(fast_periods))
+                for slow in sorted(set(slow_periods)) if fast < slow]
+
+    def run_symbols(self, symbols: List[str], fast_periods: Iterable[int], slow_periods: Iterable[int],
+                    period: str = "2y", sort_by: str = 'sharpe') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fetch history for `symbols` once (concurrent, cached) and run()."""
+        histories = self.market_data.get_history_many(symbols, period=period)
+        return self.run(histories, fast_periods, slow_periods, sort_by=sort_by)
+
+    def run(self, histories: Dict[str, pd.DataFrame], fast_periods: Iterable[int],
+            slow_periods: Iterable[int], sort_by: str = 'sharpe') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Args:
+            histories: symbol -> OHLC history (as returned by get_history_many).
+            fast_periods / slow_periods: EMA periods to combine (pairs with fast >= slow are skipped).
+            sort_by (str): Metric (compute_metrics key) to rank pairs by, highest first;
+                           'max_drawdown_pct' ranks the shallowest drawdown first.
+
+        Returns:
+            (ranked table: one row per (fast, slow) pair, metrics averaged over symbols,
+             detail table: one row per (fast, slow, symbol))
+        """
+        stack = self.signals(histories, fast_periods, slow_periods)
+        if stack is None:
+            return pd.DataFrame(), pd.DataFrame()
+        ranked, detail = score_signals(stack['close'], stack['signal'], stack['symbols'], stack['keys'],
+                                       stack['grid'], self.initial_capital, self.periods_per_year, sort_by)
+        print(f"--- CDC Sweep: {len(stack['grid'])} pairs x {len(stack['symbols'])} symbols ---")
+        return ranked, detail
+
+    def signals(self, histories: Dict[str, pd.DataFrame], fast_periods: Iterable[int],
+                slow_periods: Iterable[int]) -> Optional[Dict[str, Any]]:
+        """
+        Signals of every (fast, slow) pair over the full history, stacked.
+
+        Returns:
+            Dict with 'dates', 'close' (time x symbols), 'symbols', 'keys' (['fast', 'slow']),
+            'grid' (list of pairs) and 'signal' (time x pairs*symbols, block k = grid[k]),
+            or None if there is nothing to evaluate.
+        """
+        close_df = self.market_data.to_matrix(histories, 'Close')
+        grid = self.pairs(fast_periods, slow_periods)
+        if close_df.empty or not grid:
+            return None
+        close = close_df.to_numpy(dtype=float)
+        n_bars, n_symbols = close.shape
+
+        # Each distinct span once
+        spans = sorted({span for pair in grid for span in pair})
+        emas = {span: ema_matrix(close, span) for span in spans}
+
+        signal = np.empty((n_bars, len(grid) * n_symbols), dtype=np.int8)
+        for k, (fast, slow) in enumerate(grid):
+            zone = zone_codes(close, emas[fast], emas[slow])
+            signal[:, k * n_symbols:(k + 1) * n_symbols] = ZONE_SIGNALS[zone]
+
+        return {'dates': close_df.index, 'close': close, 'symbols': list(close_df.columns),
+                'keys': ['fast', 'slow'], 'grid': grid, 'signal': signal}
+
+
+class FiboLookbackSweep:
+    """
+    Sweep of FiboZoneStrategy lookback periods over a universe.
+
+    The High/Low range indexes (RangeIndex sparse tables) are built once;
+    each lookback's swing levels are then a gather from them rather than
+    another rolling pass (FiboZoneStrategy.calculate_lookbacks). A symbol
+    with missing bars is evaluated on its own rows, as in its own frame.
+    """
+
+    def __init__(self, initial_capital: float = 10000.0, periods_per_year: int = 252,
+                 preceding_low: bool = True):
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self.preceding_low = preceding_low
+        self.market_data = MarketData()
+
+    def run_symbols(self, symbols: List[str], lookbacks: Iterable[int], period: str = "2y",
+                    sort_by: str = 'sharpe') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Fetch history for `symbols` once (concurrent, cached) and run()."""
+        histories = self.market_data.get_history_many(symbols, period=period)
+        return self.run(histories, lookbacks, sort_by=sort_by)
+
+    def run(self, histories: Dict[str, pd.DataFrame], lookbacks: Iterable[int],
+            sort_by: str = 'sharpe') -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns:
+            (ranked table: one row per lookback, metrics averaged over symbols,
+             detail table: one row per (lookback, symbol))
+        """
+        stack = self.signals(histories, lookbacks)
+        if stack is None:
+            return pd.DataFrame(), pd.DataFrame()
+        ranked, detail = score_signals(stack['close'], stack['signal'], stack['symbols'], stack['keys'],
+                                       stack['grid'], self.initial_capital, self.periods_per_year, sort_by)
+        print(f"--- Fibo Sweep: {len(stack['grid'])} lookbacks x {len(stack['symbols'])} symbols ---")
+        return ranked, detail
+
+    def signals(self, histories: Dict[str, pd.DataFrame], lookbacks: Iterable[int]) -> Optional[Dict[str, Any]]:
+        """Signals of every lookback over the full history, stacked (see CDCParameterSweep.signals)."""
+        close_df = self.market_data.to_matrix(histories, 'Close')
+        lookbacks = sorted(set(lookbacks))
+        if close_df.empty or not lookbacks:
+            return None
+        high = self.market_data.to_matrix(histories, 'High').reindex_like(close_df).to_numpy(dtype=float)
+        low = self.market_data.to_matrix(histories, 'Low').reindex_like(close_df).to_numpy(dtype=float)
+        close = close_df.to_numpy(dtype=float)
+        n_bars, n_symbols = close.shape
+
+        # Rolling swing windows must only span a symbol's own bars: symbols are
+        # grouped by the rows they have prices on and each group is evaluated on
+        # those rows alone (no signal, so the position holds, on the others)
+        valid = ~np.isnan(close)
+        groups = {}
+        for j in range(n_symbols):
+            groups.setdefault(valid[:, j].tobytes(), []).append(j)
+
+        strategy = FiboZoneStrategy(preceding_low=self.preceding_low)
+        signal = np.zeros((n_bars, len(lookbacks) * n_symbols), dtype=np.int8)
+        for columns in groups.values():
+            rows = np.flatnonzero(valid[:, columns[0]])
+            columns = np.array(columns)
+            results = strategy.calculate_lookbacks(close[np.ix_(rows, columns)], high[np.ix_(rows, columns)],
+                                                   low[np.ix_(rows, columns)], lookbacks)
+            for k, lookback in enumerate(lookbacks):
+                signal[np.ix_(rows, k * n_symbols + columns)] = results[lookback]['signal']
+
+        return {'dates': close_df.index, 'close': close, 'symbols': list(close_df.columns),
+                'keys': ['lookback'], 'grid': [(lookback,) for lookback in lookbacks], 'signal': signal}
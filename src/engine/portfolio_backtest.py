@@ -0,0 +1,185 @@
+import heapq
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from typing import List, Dict, Any, Optional
+from src.data.market_data import MarketData
+from src.execution.order_manager import OrderManager
+from src.risk.risk_manager import RiskManager
+
+
+class PortfolioBacktester:
+    """
+    Multi-symbol, event-driven backtest with one shared cash pool.
+
+    Per-symbol bar streams are merged in time order through a priority queue
+    (heapq.merge). At each timestamp:
+        1. Held positions are marked to market; stop-loss hits and Sell (-1)
+           signals are closed.
+        2. New Buy crossovers (signal turns 1) are ranked with
+           OrderManager.prioritize_signals and sized with
+           RiskManager.calculate_position_size against current equity,
+           capped by the cash left, the same way the live bot does it.
+
+    Strategy signals are computed per symbol up front (vectorized); only the
+    portfolio bookkeeping runs per bar.
+    """
+
+    def __init__(self, initial_capital: float = 50000.0, risk_per_trade_pct: float = 2.0,
+                 stop_loss_pct: float = 5.0, strategy_name: str = 'Scanner_CDC'):
+        """
+        Args:
+            initial_capital (float): Shared starting cash.
+            risk_per_trade_pct (float): Passed to RiskManager.
+            stop_loss_pct (float): Stop placed this % below entry (the bot uses 5%).
+            strategy_name (str): 'strategy' tag given to signals for prioritization.
+        """
+        self.initial_capital = initial_capital
+        self.risk_per_trade_pct = risk_per_trade_pct
+        self.stop_loss_pct = stop_loss_pct
+        self.strategy_name = strategy_name
+        self.market_data = MarketData()
+
+    def run_symbols(self, symbols: List[str], strategy, period: str = "2y",
+                    win_rates: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """Fetch history for `symbols` (concurrent, cached) and run()."""
+        histories = self.market_data.get_history_many(symbols, period=period)
+        return self.run(histories, strategy, win_rates=win_rates)
+
+    def run(self, histories: Dict[str, pd.DataFrame], strategy,
+            win_rates: Optional[Dict[str, float]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            histories: symbol -> OHLC history (as returned by get_history_many).
+            strategy: Object with calculate(df) producing 'Action_Zone_Signal'.
+            win_rates: Optional symbol -> win rate % used for prioritization (default 50).
+
+        Returns:
+            Dict with 'trades' (DataFrame), 'equity' (Series indexed by timestamp),
+            'positions' (open positions at the end) and 'final_value'.
+        """
+        win_rates = win_rates or {}
+        order_manager = OrderManager(cash_balance=self.initial_capital, state_file=None)
+        risk_manager = RiskManager(portfolio_value=self.initial_capital,
+                                   risk_per_trade_pct=self.risk_per_trade_pct)
+
+        # 1. Vectorized per-symbol preparation
+        symbols, data, streams = [], [], []
+        for symbol, df in histories.items():
+            if df is None or df.empty or len(df) < 2:
+                continue
+            df = strategy.calculate(df.copy())
+            if 'Action_Zone_Signal' not in df.columns:
+                continue
+            raw_dates = df['Date'] if 'Date' in df.columns else df.index
+            dates = pd.DatetimeIndex(pd.to_datetime(raw_dates, utc=True)).as_unit('ns')
+            close = df['Close'].to_numpy(dtype=float)
+            signal = df['Action_Zone_Signal'].to_numpy()
+            prev_signal = np.concatenate([[0], signal[:-1]])
+            prev_close = np.concatenate([[np.nan], close[:-1]])
+            sym_idx = len(symbols)
+            symbols.append(symbol)
+            data.append({
+                'dates': dates,
+                'close': close,
+                'open': df['Open'].to_numpy(dtype=float) if 'Open' in df.columns else close,
+                'low': df['Low'].to_numpy(dtype=float) if 'Low' in df.columns else close,
+                'signal': signal,
+                'entry': (signal == 1) & (prev_signal != 1),
+                'change_pct': (close - prev_close) / prev_close * 100
+            })
+            streams.append(zip(dates.asi8.tolist(), repeat(sym_idx), range(len(df))))
+
+        # 2. Event loop over the time-ordered merge of all bar streams
+        cash = self.initial_capital
+        holdings_value = 0.0
+        positions: Dict[int, Dict[str, Any]] = {}  # sym_idx -> {'shares', 'entry', 'stop', 'mark'}
+        trades = []
+        equity_ts, equity_values = [], []
+
+        def close_position(sym_idx, i, price, reason):
+            nonlocal cash, holdings_value
+            pos = positions.pop(sym_idx)
+            cash += pos['shares'] * price
+            holdings_value -= pos['shares'] * pos['mark']
+            trades.append({
+                'Date': data[sym_idx]['dates'][i], 'Symbol': symbols[sym_idx], 'Type': 'SELL',
+                'Price': price, 'Shares': pos['shares'], 'Value': pos['shares'] * price,
+                'PnL': pos['shares'] * (price - pos['entry']), 'Reason': reason
+            })
+
+        def process(ts, bars):
+            nonlocal cash, holdings_value
+            candidates = []
+            for sym_idx, i in bars:
+                d = data[sym_idx]
+                pos = positions.get(sym_idx)
+                if pos is not None:
+                    if d['low'][i] <= pos['stop']:
+                        # Gap below the stop fills at the open
+                        close_position(sym_idx, i, min(pos['stop'], d['open'][i]), 'stop')
+                    elif d['signal'][i] == -1:
+                        close_position(sym_idx, i, d['close'][i], 'signal')
+                    else:
+                        holdings_value += pos['shares'] * (d['close'][i] - pos['mark'])
+                        pos['mark'] = d['close'][i]
+                elif d['entry'][i]:
+                    candidates.append({
+                        'symbol': symbols[sym_idx],
+                        'strategy': self.strategy_name,
+                        'price': d['close'][i],
+                        'change_pct': d['change_pct'][i],
+                        'win_rate': win_rates.get(symbols[sym_idx], 50.0),
+                        '_bar': (sym_idx, i)
+                    })
+
+            if candidates:
+                equity = cash + holdings_value
+                risk_manager.portfolio_value = equity
+                for sig in order_manager.prioritize_signals(candidates, verbose=False):
+                    sym_idx, i = sig['_bar']
+                    price = sig['price']
+                    stop = price * (1 - self.stop_loss_pct / 100.0)
+                    sizing = risk_manager.calculate_position_size(price, stop)
+                    shares = min(sizing['shares'], int(cash // price))
+                    if shares <= 0:
+                        continue
+                    cash -= shares * price
+                    holdings_value += shares * price
+                    positions[sym_idx] = {'shares': shares, 'entry': price, 'stop': stop, 'mark': price}
+                    trades.append({
+                        'Date': data[sym_idx]['dates'][i], 'Symbol': symbols[sym_idx], 'Type': 'BUY',
+                        'Price': price, 'Shares': shares, 'Value': shares * price,
+                        'PnL': 0.0, 'Reason': 'signal'
+                    })
+
+            equity_ts.append(ts)
+            equity_values.append(cash + holdings_value)
+
+        current_ts, bars = None, []
+        for ts, sym_idx, i in heapq.merge(*streams):
+            if ts != current_ts and bars:
+                process(current_ts, bars)
+                bars = []
+            current_ts = ts
+            bars.append((sym_idx, i))
+        if bars:
+            process(current_ts, bars)
+
+        equity = pd.Series(equity_values, index=pd.to_datetime(equity_ts, utc=True), name='Equity')
+        open_positions = {symbols[k]: {'shares': p['shares'], 'entry': p['entry'], 'mark': p['mark']}
+                          for k, p in positions.items()}
+        final_value = equity_values[-1] if equity_values else self.initial_capital
+
+        print(f"--- Portfolio Backtest: {len(symbols)} symbols ---")
+        print(f"Initial Capital: {self.initial_capital:,.2f}")
+        print(f"Final Value: {final_value:,.2f}")
+        print(f"Return: {((final_value - self.initial_capital) / self.initial_capital) * 100:.2f}%")
+        print(f"Total Trades: {len(trades)} | Open Positions: {len(open_positions)}")
+
+        return {
+            'trades': pd.DataFrame(trades),
+            'equity': equity,
+            'positions': open_positions,
+            'final_value': final_value
+        }
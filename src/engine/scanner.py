@@ -1,81 +1,326 @@
+import time
+import asyncio
+import threading
 import pandas as pd
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import List, Dict, Any, Optional, AsyncIterator
 from src.data.market_data import MarketData
-from src.strategies.cdc_action_zone import CDCActionZone
+from src.data.strategy_stats import StrategyStats
+from src.strategies.cdc_action_zone import CDCActionZone, IncrementalCDC, ZONE_GREEN, ZONE_RED, ZONE_LABELS, ZONE_SIGNALS
+
+# results key -> event 'type' emitted by scan_stream
+EVENT_TYPES = {
+    'buy_signals': 'buy',
+    'sell_signals': 'sell',
+    'heavy_drops': 'heavy_drop'
+}
 
 class MarketScanner:
-    def __init__(self):
+    def __init__(self, max_workers: int = 1, symbol_timeout: float = 20.0,
+                 incremental_state_file: Optional[str] = None,
+                 stats: Optional[StrategyStats] = None, strategy_name: str = 'Scanner_CDC'):
+        """
+        Args:
+            max_workers (int): Symbols processed in parallel. 1 = batched sequential scan.
+            symbol_timeout (float): Seconds one symbol may take in concurrent mode
+                                    before it is reported as timed out.
+            incremental_state_file (str): If set, CDC colours are kept up to date with
+                                          IncrementalCDC (persisted to this file) instead
+                                          of recalculating the full history every scan.
+            stats (StrategyStats): If set, each scan feeds the signals of every completed
+                                   bar since the last one it applied into it under
+                                   `strategy_name`, keeping win rates current between backtests.
+        """
         self.market_data = MarketData()
         self.strategy = CDCActionZone()
+        self.max_workers = max_workers
+        self.symbol_timeout = symbol_timeout
+        self.incremental = IncrementalCDC(self.strategy, incremental_state_file) if incremental_state_file else None
+        self.stats = stats
+        self.strategy_name = strategy_name
+
+    def _empty_results(self) -> Dict[str, List[Dict[str, Any]]]:
+        return {
+            'buy_signals': [],
+            'sell_signals': [],
+            'heavy_drops': [], # For stocks dropping hard (regardless of trend change)
+            'errors': []       # Symbols that failed or timed out: {'symbol', 'error'}
+        }
 
-    def scan(self, symbols: List[str]) -> Dict[str, List[Dict[str, Any]]]:
+    def scan(self, symbols: List[str], concurrent: Optional[bool] = None) -> Dict[str, List[Dict[str, Any]]]:
         """
         Scans values for Buy and Sell signals.
         
+        Args:
+            symbols (List[str]): Symbols to scan.
+            concurrent (bool): Use the worker pool. Defaults to True when max_workers > 1.
+        
         Returns:
-            Dict containing lists of 'buy_signals' and 'sell_signals'.
+            Dict containing lists of 'buy_signals', 'sell_signals', 'heavy_drops'
+            and a per-symbol 'errors' report.
         """
-        results = {
-            'buy_signals': [],
-            'sell_signals': [],
-            'heavy_drops': [] # For stocks dropping hard (regardless of trend change)
-        }
+        results = self._empty_results()
+        
+        if concurrent is None:
+            concurrent = self.max_workers > 1
         
         print(f"Scanning {len(symbols)} symbols...")
         
+        if concurrent:
+            self._scan_concurrent(symbols, results)
+            self._save_incremental_state()
+            return results
+        
+        # We need enough data for EMA26 + some buffer. 
+        # 60 days is usually enough for calculation, but 3mo is safer.
+        # Fetch everything up front with get_history_many (concurrent, cached).
+        histories = self.market_data.get_history_many(symbols, period="6mo")
+        
         for symbol in symbols:
             try:
-                # We need enough data for EMA26 + some buffer. 
-                # 60 days is usually enough for calculation, but 3mo is safer.
-                df = self.market_data.get_history(symbol, period="6mo")
-                
-                if df.empty or len(df) < 30:
-                    continue
-                
-                # Apply Strategy
-                df = self.strategy.calculate(df)
-                
-                # Get the last two rows to check for crossover
-                last_row = df.iloc[-1]
-                prev_row = df.iloc[-2]
-                
-                current_price = last_row['Close']
-                prev_price = prev_row['Close']
-                pct_change = ((current_price - prev_price) / prev_price) * 100
+                self._evaluate_symbol(symbol, histories[symbol], results)
+            except Exception as e:
+                print(f"Error scanning {symbol}: {e}")
+                results['errors'].append({'symbol': symbol, 'error': str(e)})
+                continue
+        
+        self._save_incremental_state()
+        return results
+
+    def warm_cache(self, symbols: List[str]) -> int:
+        """
+        Pre-load the history cache for `symbols` via get_history_many (e.g. just
+        before the open), so the first scan of the session only tops up bars.
+
+        Returns:
+            Number of symbols with data.
+        """
+        histories = self.market_data.get_history_many(symbols, period="6mo")
+        return sum(1 for df in histories.values() if df is not None and not df.empty)
+
+    def _save_incremental_state(self):
+        if self.incremental is not None:
+            self.incremental.save()
+        if self.stats is not None:
+            self.stats.save()
+
+    def _scan_symbol(self, symbol: str, started: Dict[str, float], live: Optional[set] = None,
+                     lock: Optional[threading.Lock] = None) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+        """
+        Worker task: download and evaluate one symbol.
+
+        With `live` / `lock`, the evaluation (which updates the shared
+        IncrementalCDC / StrategyStats state) runs under `lock` and only if the
+        symbol is still in `live`. The scan removes symbols it has abandoned
+        (timed out, or the scan finished) from `live` under the same lock, so
+        a late worker never changes state after it has been saved.
+        Returns None for an abandoned symbol.
+        """
+        started[symbol] = time.monotonic()
+        partial = self._empty_results()
+        df = self.market_data.get_history(symbol, period="6mo")
+        if lock is None:
+            self._evaluate_symbol(symbol, df, partial)
+            return partial
+        with lock:
+            if symbol not in live:
+                return None
+            self._evaluate_symbol(symbol, df, partial)
+        return partial
+
+    def _scan_concurrent(self, symbols: List[str], results: Dict[str, List[Dict[str, Any]]]):
+        """
+        Scan symbols on a bounded thread pool. A symbol that runs longer than
+        `symbol_timeout` is abandoned and reported in results['errors'], so one
+        slow ticker cannot hold up the rest of the scan.
+        """
+        started: Dict[str, float] = {}
+        partials: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        live = set(symbols)
+        lock = threading.Lock()
+        
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        futures = {executor.submit(self._scan_symbol, symbol, started, live, lock): symbol for symbol in symbols}
+        pending = set(futures)
+        try:
+            while pending:
+                done, pending = wait(pending, timeout=0.25, return_when=FIRST_COMPLETED)
+                for future in done:
+                    symbol = futures[future]
+                    try:
+                        partials[symbol] = future.result()
+                    except Exception as e:
+                        print(f"Error scanning {symbol}: {e}")
+                        results['errors'].append({'symbol': symbol, 'error': str(e)})
                 
-                # 1. Detect Buy Signal (Just turned Green)
-                # Current is Green, Previous was NOT Green (Red, Blue, Yellow)
-                if last_row['Color'] == 'Green' and prev_row['Color'] != 'Green':
-                    results['buy_signals'].append({
-                        'symbol': symbol,
-                        'price': current_price,
-                        'change_pct': pct_change,
-                        'date': last_row['Date'] if 'Date' in last_row else last_row.name
-                    })
+                # Deadline check: only symbols that actually started can time out
+                now = time.monotonic()
+                for future in list(pending):
+                    symbol = futures[future]
+                    if symbol in started and now - started[symbol] > self.symbol_timeout:
+                        pending.discard(future)
+                        future.cancel()
+                        with lock:
+                            live.discard(symbol)
+                        print(f"Timeout scanning {symbol} (> {self.symbol_timeout:.0f}s)")
+                        results['errors'].append({'symbol': symbol, 'error': 'timeout'})
+        finally:
+            # Do not wait for abandoned workers; they finish in the background
+            # but no longer touch the incremental state
+            with lock:
+                live.clear()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        # Merge in input order so the output does not depend on completion order
+        for symbol in symbols:
+            if symbol in partials:
+                for key in ('buy_signals', 'sell_signals', 'heavy_drops'):
+                    results[key].extend(partials[symbol][key])
+
+    def _unseen_bars(self, symbol: str, raw_dates) -> int:
+        """
+        Index of the first completed bar the stats store has not applied yet
+        (len - 1 when there is none: the last bar may still be forming).
+        Walks back from the end, so a scan after a normal gap checks 1-2 dates.
+        """
+        if self.stats is None:
+            return len(raw_dates) - 1
+        last = self.stats.last_date(symbol, self.strategy_name)
+        start = len(raw_dates) - 1
+        while start > 0 and (last is None or pd.Timestamp(raw_dates[start - 1]).isoformat() > last):
+            start -= 1
+        return start
+
+    def _evaluate_symbol(self, symbol: str, df: pd.DataFrame, results: Dict[str, List[Dict[str, Any]]]):
+        """Run the strategy on one symbol's history and append any signals to `results`."""
+        if df.empty or len(df) < 30:
+            return
+        
+        raw_dates = (df['Date'] if 'Date' in df.columns else df.index).to_numpy()
+        
+        if self.incremental is not None:
+            # O(1) update from the last known bar instead of a full recalculation
+            state = self.incremental.sync(symbol, df)
+            current_price, prev_price = state['close'], state['prev_close']
+            zone, prev_zone = state['zone'], state['prev_zone']
+            start = self._unseen_bars(symbol, raw_dates)
+            if start == len(df) - 2:
+                # Usual case: only the bar before the forming one is new
+                self.stats.update_bars(symbol, self.strategy_name, raw_dates[-2:-1],
+                                       [prev_price], ZONE_SIGNALS[[prev_zone]])
+            elif start < len(df) - 2:
+                # Several bars missed (downtime, new symbol): zones for all of them
+                full = self.strategy.calculate(df.copy())
+                self.stats.update_bars(symbol, self.strategy_name, raw_dates[start:-1],
+                                       full['Close'].to_numpy()[start:-1],
+                                       ZONE_SIGNALS[full['Zone'].to_numpy()[start:-1]])
+        else:
+            # Apply Strategy
+            df = self.strategy.calculate(df)
+            
+            # Only the last two bars matter for the crossover check
+            closes = df['Close'].to_numpy()
+            zones = df['Zone'].to_numpy()
+            current_price, prev_price = closes[-1], closes[-2]
+            zone, prev_zone = zones[-1], zones[-2]
+            start = self._unseen_bars(symbol, raw_dates)
+            if start < len(df) - 1:
+                self.stats.update_bars(symbol, self.strategy_name, raw_dates[start:-1],
+                                       closes[start:-1], ZONE_SIGNALS[zones[start:-1]])
+        
+        date = df['Date'].iloc[-1] if 'Date' in df.columns else df.index[-1]
+        pct_change = ((current_price - prev_price) / prev_price) * 100
+        
+        # 1. Detect Buy Signal (Just turned Green)
+        # Current is Green, Previous was NOT Green (Red, Blue, Yellow)
+        if zone == ZONE_GREEN and prev_zone != ZONE_GREEN:
+            results['buy_signals'].append({
+                'symbol': symbol,
+                'price': current_price,
+                'change_pct': pct_change,
+                'date': date
+            })
 
-                # 2. Detect Sell Signal (Just turned Red)
-                # Current is Red, Previous was NOT Red
-                if last_row['Color'] == 'Red' and prev_row['Color'] != 'Red':
-                    results['sell_signals'].append({
-                        'symbol': symbol,
-                        'price': current_price,
-                        'change_pct': pct_change,
-                        'date': last_row['Date'] if 'Date' in last_row else last_row.name
-                    })
-                    
-                # 3. Detect "Heavy Drop" (Panic Selling Watchlist)
-                # Criteria: Drop more than 3% in one day (configurable)
-                # regardless of trend, though usually happens in Red/Yellow.
-                if pct_change <= -3.0:
-                    results['heavy_drops'].append({
-                        'symbol': symbol,
-                        'price': current_price,
-                        'change_pct': pct_change,
-                        'color': last_row['Color']
-                    })
+        # 2. Detect Sell Signal (Just turned Red)
+        # Current is Red, Previous was NOT Red
+        if zone == ZONE_RED and prev_zone != ZONE_RED:
+            results['sell_signals'].append({
+                'symbol': symbol,
+                'price': current_price,
+                'change_pct': pct_change,
+                'date': date
+            })
+            
+        # 3. Detect "Heavy Drop" (Panic Selling Watchlist)
+        # Criteria: Drop more than 3% in one day (configurable)
+        # regardless of trend, though usually happens in Red/Yellow.
+        if pct_change <= -3.0:
+            results['heavy_drops'].append({
+                'symbol': symbol,
+                'price': current_price,
+                'change_pct': pct_change,
+                'color': ZONE_LABELS[zone]
+            })
 
+    async def scan_stream(self, symbols: List[str]) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of scan(): yields each event as soon as its symbol
+        has been evaluated, instead of one dict after the whole scan.
+        
+        Each event is the same dict scan() would put in its lists, plus a
+        'type' key: 'buy', 'sell', 'heavy_drop', or 'error' (with 'error' text
+        for symbols that failed or exceeded `symbol_timeout`).
+        
+        Usage:
+            async for event in scanner.scan_stream(symbols):
+                if event['type'] == 'buy': ...
+        """
+        print(f"Streaming scan of {len(symbols)} symbols...")
+        
+        loop = asyncio.get_running_loop()
+        workers = max(1, self.max_workers)
+        executor = ThreadPoolExecutor(max_workers=workers)
+        # One slot per pool thread, held until the thread is actually free again
+        # (not just until the deadline), so a symbol's deadline never counts
+        # time spent queued behind an abandoned worker
+        semaphore = asyncio.Semaphore(workers)
+        started: Dict[str, float] = {}
+        live = set(symbols)
+        lock = threading.Lock()
+        
+        async def run_one(symbol: str):
+            await semaphore.acquire()
+            future = loop.run_in_executor(executor, self._scan_symbol, symbol, started, live, lock)
+            future.add_done_callback(lambda _: semaphore.release())
+            try:
+                done, _ = await asyncio.wait({future}, timeout=self.symbol_timeout)
+                if not done:
+                    with lock:
+                        live.discard(symbol)
+                    print(f"Timeout scanning {symbol} (> {self.symbol_timeout:.0f}s)")
+                    return symbol, None, 'timeout'
+                return symbol, future.result(), None
             except Exception as e:
                 print(f"Error scanning {symbol}: {e}")
-                continue
-                
-        return results
+                return symbol, None, str(e)
+        
+        tasks = [asyncio.ensure_future(run_one(symbol)) for symbol in symbols]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                symbol, partial, error = await next_done
+                if error is not None:
+                    yield {'type': 'error', 'symbol': symbol, 'error': error}
+                    continue
+                for key, event_type in EVENT_TYPES.items():
+                    for item in partial[key]:
+                        yield {'type': event_type, **item}
+        finally:
+            # Consumer stopped early (or we are done): drop whatever is still queued
+            for task in tasks:
+                task.cancel()
+            # Workers still running finish in the background without touching
+            # the state saved here
+            with lock:
+                live.clear()
+                self._save_incremental_state()
+            executor.shutdown(wait=False, cancel_futures=True)
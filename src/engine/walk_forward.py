@@ -0,0 +1,159 @@
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.metrics import compute_metrics
+from src.engine.parameter_sweep import CDCParameterSweep, FiboLookbackSweep, score_signals
+
+
+def _evaluate_window(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Process-pool task for WalkForwardOptimizer: pick the best parameter set on
+    the train bars, then trade it on the test bars (starting flat).
+    Module level so it pickles.
+    """
+    close, signal, train_bars = task['close'], task['signal'], task['train_bars']
+    symbols, keys, grid = task['symbols'], task['keys'], task['grid']
+    n_symbols = len(symbols)
+
+    ranked, _ = score_signals(close[:train_bars], signal[:train_bars], symbols, keys, grid,
+                              task['initial_capital'], task['periods_per_year'], task['objective'])
+    best = ranked.iloc[0]
+    # Look the winner up in the grid to keep the parameters' original types
+    k = grid.index(tuple(best[key] for key in keys))
+
+    test_close = close[train_bars:]
+    position = BacktestEngine.positions(signal[train_bars:, k * n_symbols:(k + 1) * n_symbols])
+    equity = BacktestEngine.equity_matrix(test_close, position, task['initial_capital'])
+    metrics = compute_metrics(equity, position, periods_per_year=task['periods_per_year'])
+    return {
+        'window': task['window'],
+        'params': grid[k],
+        'in_sample': float(best[task['objective']]),
+        'metrics': metrics,
+        'equity': equity
+    }
+
+
+class WalkForwardOptimizer:
+    """
+    Rolling walk-forward optimization over the vectorized sweeps.
+
+    History is split into windows of `train_bars` followed by `test_bars`,
+    advancing `step_bars` at a time. In each window the parameter set with
+    the best in-sample `objective` (averaged over symbols) is chosen and then
+    evaluated out-of-sample on the test bars.
+
+    Signals for every parameter set are computed once over the full history
+    (CDCParameterSweep.signals / FiboLookbackSweep.signals) and each window
+    only slices them. The indicators are causal, so a slice sees no future
+    bars, and overlapping windows share the same computation. Windows are
+    scored in parallel on a process pool.
+    """
+
+    def __init__(self, train_bars: int = 252, test_bars: int = 63, step_bars: Optional[int] = None,
+                 objective: str = 'sharpe', initial_capital: float = 10000.0,
+                 periods_per_year: int = 252, max_workers: Optional[int] = None):
+        """
+        Args:
+            train_bars (int): In-sample bars per window (252 = 1 year of daily bars).
+            test_bars (int): Out-of-sample bars per window.
+            step_bars (int): Bars between window starts (default: test_bars, non-overlapping tests).
+            objective (str): compute_metrics key to maximize in-sample.
+            max_workers (int): Worker processes (default: CPU count).
+        """
+        self.train_bars = train_bars
+        self.test_bars = test_bars
+        self.step_bars = step_bars or test_bars
+        self.objective = objective
+        self.initial_capital = initial_capital
+        self.periods_per_year = periods_per_year
+        self.max_workers = max_workers
+
+    def windows(self, n_bars: int) -> List[Tuple[int, int, int]]:
+        """(start, train_end, test_end) bar offsets of every full window."""
+        size = self.train_bars + self.test_bars
+        return [(start, start + self.train_bars, start + size)
+                for start in range(0, n_bars - size + 1, self.step_bars)]
+
+    def run_cdc(self, symbols: List[str], fast_periods: Iterable[int], slow_periods: Iterable[int],
+                period: str = "5y") -> Dict[str, Any]:
+        """Walk-forward over CDC (fast, slow) EMA pairs."""
+        sweep = CDCParameterSweep(self.initial_capital, self.periods_per_year)
+        histories = sweep.market_data.get_history_many(symbols, period=period)
+        return self.run(sweep.signals(histories, fast_periods, slow_periods))
+
+    def run_fibo(self, symbols: List[str], lookbacks: Iterable[int], period: str = "5y") -> Dict[str, Any]:
+        """Walk-forward over FiboZoneStrategy lookback periods."""
+        sweep = FiboLookbackSweep(self.initial_capital, self.periods_per_year)
+        histories = sweep.market_data.get_history_many(symbols, period=period)
+        return self.run(sweep.signals(histories, lookbacks))
+
+    def run(self, stack: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Args:
+            stack: Stacked signals from a sweep's signals() method.
+
+        Returns:
+            Dict with:
+                'windows'     -> DataFrame, one row per window: dates, chosen parameters,
+                                 in-sample objective and out-of-sample metrics (mean over symbols)
+                'oos_equity'  -> DataFrame (dates x symbols), test periods chained together
+                'oos_metrics' -> DataFrame, compute_metrics of the chained curve per symbol
+        """
+        empty = {'windows': pd.DataFrame(), 'oos_equity': pd.DataFrame(), 'oos_metrics': pd.DataFrame()}
+        if stack is None:
+            print("No data for walk-forward.")
+            return empty
+        dates, close, signal = stack['dates'], stack['close'], stack['signal']
+        windows = self.windows(len(close))
+        if not windows:
+            print(f"Not enough history for a {self.train_bars}+{self.test_bars} bar window.")
+            return empty
+
+        print(f"--- Walk-Forward: {len(windows)} windows x {len(stack['grid'])} parameter sets "
+              f"x {len(stack['symbols'])} symbols ---")
+        tasks = [{
+            'window': w,
+            'close': close[start:test_end],
+            'signal': signal[start:test_end],
+            'train_bars': train_end - start,
+            'symbols': stack['symbols'],
+            'keys': stack['keys'],
+            'grid': stack['grid'],
+            'objective': self.objective,
+            'initial_capital': self.initial_capital,
+            'periods_per_year': self.periods_per_year
+        } for w, (start, train_end, test_end) in enumerate(windows)]
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            results = list(pool.map(_evaluate_window, tasks))
+
+        rows = []
+        growth, growth_dates = [], []
+        for result in results:
+            start, train_end, test_end = windows[result['window']]
+            row = {
+                'window': result['window'],
+                'train_start': dates[start],
+                'test_start': dates[train_end],
+                'test_end': dates[test_end - 1]
+            }
+            row.update(zip(stack['keys'], result['params']))
+            row[f"is_{self.objective}"] = result['in_sample']
+            for name, value in result['metrics'].items():
+                finite = value[np.isfinite(value)]
+                row[f"oos_{name}"] = finite.mean() if len(finite) else np.nan
+            rows.append(row)
+
+            # Chain the non-overlapping part of each test period
+            equity = result['equity'][:self.step_bars]
+            growth.append(np.vstack([np.ones((1, equity.shape[1])), equity[1:] / equity[:-1]]))
+            growth_dates.append(dates[train_end:train_end + len(equity)])
+
+        oos = self.initial_capital * np.cumprod(np.vstack(growth), axis=0)
+        oos_equity = pd.DataFrame(oos, index=np.concatenate(growth_dates), columns=stack['symbols'])
+        oos_metrics = pd.DataFrame(compute_metrics(oos, periods_per_year=self.periods_per_year),
+                                   index=stack['symbols'])
+        oos_metrics = oos_metrics.dropna(axis=1, how='all')
+        return {'windows': pd.DataFrame(rows), 'oos_equity': oos_equity, 'oos_metrics': oos_metrics}
@@ -0,0 +1,201 @@
+import time
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, List, Optional
+import src.config as config
+
+# Fill statuses
+FILLED = 'FILLED'
+UNFILLED = 'PENDING'      # Limit not touched, or no quote newer than the signal: the order stays working
+REJECTED = 'REJECTED'     # No price data, not enough cash, or selling more than is held
+
+
+def quotes_from_history(histories: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, float]]:
+    """
+    Latest bar per symbol as a quote dict {'open', 'high', 'low', 'close', 'time'},
+    from histories such as MarketData.get_history_many() returns. 'time' is
+    the bar's timestamp (epoch seconds), so the bar a signal was computed on
+    never fills that signal's order.
+    """
+    quotes = {}
+    for symbol, df in histories.items():
+        if df is None or df.empty:
+            continue
+        bar = df.iloc[-1]
+        quotes[symbol] = {key: float(bar[key.capitalize()]) for key in ('open', 'high', 'low', 'close')}
+        date_col = 'Date' if 'Date' in df.columns else 'Datetime'
+        if date_col in df.columns:
+            quotes[symbol]['time'] = pd.Timestamp(bar[date_col]).timestamp()
+    return quotes
+
+
+def quotes_from_prices(prices: Dict[str, float], at: Optional[float] = None) -> Dict[str, Dict[str, float]]:
+    """Live prices as flat quotes (open = high = low = close), stamped `at` (default: now)."""
+    at = time.time() if at is None else at
+    return {symbol: {'open': price, 'high': price, 'low': price, 'close': price, 'time': at}
+            for symbol, price in prices.items() if price}
+
+
+def fresh_quotes(market_data, symbols: Iterable[str]) -> Dict[str, Dict[str, float]]:
+    """
+    Quotes taken after the signals: the live price per symbol, falling back
+    to the latest cached daily bar (which, being stamped with its own date,
+    only fills orders signalled on an earlier bar).
+
+    Args:
+        market_data: MarketData instance.
+        symbols: Symbols of the orders to fill.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    quotes = quotes_from_history(market_data.get_history_many(symbols, period="5d"))
+    prices = {symbol: market_data.get_realtime_price(symbol) for symbol in symbols}
+    quotes.update(quotes_from_prices(prices))
+    return quotes
+
+
+class FillSimulator:
+    """
+    Paper-trading fill engine: fills a whole batch of order tickets against
+    bar/quote data in one set of numpy operations.
+
+    Cost model (all adverse to the trader):
+        - Half the bid/ask spread: buys pay close * (1 + spread/2), sells get close * (1 - spread/2).
+        - Slippage on market orders, on top of the spread.
+        - Commission: max(per-share fee x shares, minimum) + percentage of notional.
+
+    MARKET orders fill at the bar close (the latest price) plus costs.
+    LIMIT orders fill only if the bar touched the limit through the spread
+    (buy: low's ask <= limit; sell: high's bid >= limit), at the limit or at
+    the open if the bar gapped through it. Untouched limits stay PENDING.
+    Without quotes (logic tests) a LIMIT order fills at its limit price,
+    with no spread and no touch test.
+
+    No look-ahead: an order only fills against a quote whose 'time' is after
+    the order's 'signal_time' (the bar its signal was computed on). Orders
+    without such a quote stay PENDING until a later one arrives.
+    """
+
+    def __init__(self, slippage_bps: float = config.FILL_SLIPPAGE_BPS,
+                 spread_bps: float = config.FILL_SPREAD_BPS,
+                 commission_per_share: float = config.COMMISSION_PER_SHARE,
+                 commission_min: float = config.COMMISSION_MIN,
+                 commission_pct: float = config.COMMISSION_PCT):
+        """
+        Args:
+            slippage_bps (float): Market-order slippage in basis points.
+            spread_bps (float): Full bid/ask spread in basis points (half is paid per side).
+            commission_per_share (float): Fee per share.
+            commission_min (float): Minimum fee per order.
+            commission_pct (float): Fee as % of notional.
+        """
+        self.slippage_bps = slippage_bps
+        self.spread_bps = spread_bps
+        self.commission_per_share = commission_per_share
+        self.commission_min = commission_min
+        self.commission_pct = commission_pct
+
+    def _bars(self, orders: List[Dict[str, Any]], quotes: Optional[Dict[str, Dict[str, float]]]) -> np.ndarray:
+        """
+        (n, 4) open/high/low/close per order; NaN where there is no usable quote.
+        Without any quotes (logic tests, no market data) each order gets a flat
+        bar at the price it was sized at.
+        """
+        bars = np.full((len(orders), 4), np.nan)
+        for i, order in enumerate(orders):
+            if quotes is None:
+                price = order.get('reference_price') or order.get('limit_price')
+                if price:
+                    bars[i] = price
+                continue
+            quote = quotes.get(order['symbol'])
+            if quote is None:
+                continue
+            signal_time = order.get('signal_time')
+            if quote.get('time') is not None and signal_time is not None and quote['time'] <= signal_time:
+                continue  # The signal's own bar (or older): not tradeable for this order
+            bars[i] = [quote.get('open', np.nan), quote.get('high', np.nan),
+                       quote.get('low', np.nan), quote.get('close', np.nan)]
+        # Missing fields of a partial quote default to the close
+        return np.where(np.isnan(bars), bars[:, 3:4], bars)
+
+    def simulate(self, orders: List[Dict[str, Any]], quotes: Optional[Dict[str, Dict[str, float]]] = None,
+                 cash: float = np.inf, holdings: Optional[Dict[str, int]] = None) -> Dict[str, np.ndarray]:
+        """
+        Fill a batch of order tickets.
+
+        Args:
+            orders: Tickets from OrderManager.create_order (symbol, action, quantity,
+                    order_type, limit_price, reference_price).
+            quotes: {symbol: {'open', 'high', 'low', 'close', 'time'}} (e.g. fresh_quotes()).
+                    None fills every order against its own sized price (logic tests only):
+                    LIMIT orders at the limit, MARKET orders at the reference price plus costs.
+            cash (float): Cash available. Fills take it in batch order: sells add their
+                          proceeds, a buy that does not fit is rejected and takes nothing.
+            holdings (dict): Shares held per symbol (plus earlier buys in the batch);
+                             larger sells are rejected.
+
+        Returns:
+            Dict of arrays aligned with `orders`: 'status', 'fill_price',
+            'commission', 'cash_delta' (negative for buys, after commission).
+        """
+        n = len(orders)
+        if n == 0:
+            empty = np.array([])
+            return {'status': np.array([], dtype=object), 'fill_price': empty,
+                    'commission': empty, 'cash_delta': empty}
+
+        holdings = holdings or {}
+        side = np.array([-1.0 if o.get('action') == 'SELL' else 1.0 for o in orders])
+        qty = np.array([float(o['quantity']) for o in orders])
+        is_limit = np.array([o.get('order_type') == 'LIMIT' and o.get('limit_price') is not None for o in orders])
+        limit = np.array([float(o['limit_price']) if o.get('limit_price') is not None else np.nan for o in orders])
+        held = np.array([float(holdings.get(o['symbol'], 0)) for o in orders])
+        bar_open, bar_high, bar_low, bar_close = self._bars(orders, quotes).T
+
+        half_spread = self.spread_bps / 2 / 1e4
+        slippage = self.slippage_bps / 1e4
+
+        # Market: close through the half spread plus slippage, against the trader
+        market_price = bar_close * (1 + side * (half_spread + slippage))
+        # Limit: touched through the spread; a gap through the limit fills at the open
+        touched = np.where(side > 0, bar_low * (1 + half_spread) <= limit, bar_high * (1 - half_spread) >= limit)
+        open_quote = bar_open * (1 + side * half_spread)
+        limit_price = np.where(side > 0, np.fmin(limit, open_quote), np.fmax(limit, open_quote))
+        if quotes is None:
+            # No market data to touch: a limit order fills at its own limit
+            touched = np.ones(n, dtype=bool)
+            limit_price = limit
+
+        has_data = ~np.isnan(bar_close)
+        fills = has_data & (~is_limit | touched)
+        fill_price = np.where(is_limit, limit_price, market_price)
+
+        notional = qty * fill_price
+        commission = np.maximum(qty * self.commission_per_share, self.commission_min) + notional * self.commission_pct / 100
+        cash_delta = -side * notional - commission
+
+        status = np.where(fills, FILLED, UNFILLED).astype(object)
+        if quotes is None:
+            status[~has_data] = REJECTED  # Nothing to price the order at, now or later
+
+        # Cash / holdings: allocated in batch order over the fills only, so a
+        # rejected order takes nothing and a sell's proceeds fund later buys
+        available = cash
+        shares = {}
+        for i in np.flatnonzero(fills):
+            symbol = orders[i]['symbol']
+            position = shares.get(symbol, held[i])
+            if side[i] < 0 and qty[i] > position:
+                status[i] = REJECTED
+            elif side[i] > 0 and -cash_delta[i] > available:
+                status[i] = REJECTED
+            else:
+                available += cash_delta[i]
+                shares[symbol] = position + side[i] * qty[i]
+        filled = status == FILLED
+        return {
+            'status': status,
+            'fill_price': np.where(filled, fill_price, np.nan),
+            'commission': np.where(filled, commission, 0.0),
+            'cash_delta': np.where(filled, cash_delta, 0.0)
+        }
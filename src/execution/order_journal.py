@@ -0,0 +1,178 @@
+import os
+import json
+import time
+from typing import Any, Dict, Iterator, List, Optional
+
+
+class OrderJournal:
+    """
+    Append-only event log for OrderManager state, with snapshots.
+
+    Every state change (a fill) is one JSON line appended to `journal_file`,
+    so a write costs the same however long the history is. Recovery loads
+    the last snapshot (the portfolio_state.json OrderManager already wrote)
+    and replays the journal lines after it.
+
+    compact() writes a fresh snapshot, moves the replayed lines to
+    `history_file` and empties the journal, so the tail to replay stays
+    short. The history file is append-only too and keeps every event.
+
+    Event layout:
+        {'seq': 12, 'ts': 1737900000.0, 'type': 'fill', 'order': {...},
+         'symbol': 'NVDA', 'quantity': 10, 'cash_delta': -1450.0, 'cash_balance': 48550.0}
+    """
+
+    def __init__(self, journal_file: str, history_file: str, snapshot_file: str,
+                 snapshot_every: int = 200, fsync: bool = False):
+        """
+        Args:
+            journal_file (str): Events since the last snapshot (JSON Lines).
+            history_file (str): Every compacted event, oldest first (JSON Lines).
+            snapshot_file (str): State snapshot (JSON) with the seq of the last event it includes.
+            snapshot_every (int): needs_compaction() turns True after this many journal events.
+            fsync (bool): fsync each append (durable across power loss, slower).
+        """
+        self.journal_file = journal_file
+        self.history_file = history_file
+        self.snapshot_file = snapshot_file
+        self.snapshot_every = snapshot_every
+        self.fsync = fsync
+        self.seq = 0            # Last event written or replayed
+        self.pending = 0        # Events in the journal since the last snapshot
+
+    @staticmethod
+    def _read_lines(path: str) -> Iterator[Dict[str, Any]]:
+        if not os.path.exists(path):
+            return
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # Torn last line from a crash mid-append: everything before it is intact
+                    print(f"[EXEC] Skipping unreadable journal line in {path}")
+
+    @staticmethod
+    def _last_seq(path: str) -> int:
+        """seq of the last complete line of a JSON Lines file, read from its end."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return 0
+        with open(path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.seek(max(0, end - 65536))
+            lines = f.read().splitlines()
+        for line in reversed(lines):
+            try:
+                return int(json.loads(line)['seq'])
+            except (ValueError, KeyError, TypeError):
+                continue
+        return 0
+
+    @staticmethod
+    def _drop_torn_line(path: str):
+        """Cut a partial last line (crash mid-append), so the next append starts on a new line."""
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return
+        with open(path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            f.seek(end - 1)
+            if f.read(1) == b'\n':
+                return
+            # Walk back to the end of the last complete line
+            pos = end
+            while pos > 0:
+                start = max(0, pos - 65536)
+                f.seek(start)
+                cut = f.read(pos - start).rfind(b'\n')
+                if cut != -1:
+                    f.truncate(start + cut + 1)
+                    break
+                pos = start
+            else:
+                f.truncate(0)
+        print(f"[EXEC] Dropped a torn last line from {path}")
+
+    @staticmethod
+    def _ensure_dir(path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Snapshot state, or None if there is none."""
+        if not os.path.exists(self.snapshot_file):
+            return None
+        with open(self.snapshot_file, 'r') as f:
+            return json.load(f)
+
+    def tail(self, after_seq: int) -> List[Dict[str, Any]]:
+        """
+        Journal events newer than `after_seq` (the snapshot's), oldest first.
+        Also sets the journal's seq / pending counters for the next append,
+        after cutting a line torn by a crash mid-append off both files.
+        seq continues after the highest one in the snapshot, the history file
+        or the journal, so a lost or stale snapshot never reuses an event's seq
+        (TradeStore.sync skips events at or below its watermark).
+        """
+        for path in (self.journal_file, self.history_file):
+            self._drop_torn_line(path)
+        events = [e for e in self._read_lines(self.journal_file) if e.get('seq', 0) > after_seq]
+        self.seq = max([after_seq, self._last_seq(self.history_file), self._last_seq(self.journal_file)]
+                       + [e['seq'] for e in events])
+        self.pending = len(events)
+        return events
+
+    def append(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Write one event (seq and ts are added). Returns the written record."""
+        self.seq += 1
+        record = {'seq': self.seq, 'ts': time.time(), **event}
+        self._ensure_dir(self.journal_file)
+        with open(self.journal_file, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+            if self.fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        self.pending += 1
+        return record
+
+    def needs_compaction(self) -> bool:
+        return self.pending >= self.snapshot_every
+
+    def compact(self, state: Dict[str, Any]):
+        """
+        Snapshot `state` (as of the last appended event) and fold the journal
+        into the history file.
+
+        Order matters for crash safety: history first (lines already there are
+        skipped by seq), then the snapshot (atomic replace), then the journal
+        is emptied. A crash at any step leaves snapshot + journal replayable.
+        """
+        history_seq = self._last_seq(self.history_file)
+        events = [e for e in self._read_lines(self.journal_file) if e.get('seq', 0) > history_seq]
+        if events:
+            self._ensure_dir(self.history_file)
+            with open(self.history_file, 'a') as f:
+                for event in events:
+                    f.write(json.dumps(event, separators=(',', ':')) + '\n')
+
+        self._ensure_dir(self.snapshot_file)
+        tmp_path = self.snapshot_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({**state, 'journal_seq': self.seq}, f, indent=4)
+        os.replace(tmp_path, self.snapshot_file)
+
+        open(self.journal_file, 'w').close()
+        self.pending = 0
+
+    def history(self) -> Iterator[Dict[str, Any]]:
+        """Every event ever journaled, oldest first (history file, then the live journal)."""
+        last = 0
+        for path in (self.history_file, self.journal_file):
+            for event in self._read_lines(path):
+                if event.get('seq', 0) > last:
+                    last = event['seq']
+                    yield event
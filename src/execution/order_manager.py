@@ -1,8 +1,11 @@
 from typing import List, Dict, Any, Optional
 import time
 import uuid
-import json
 import os
+import src.config as config
+from src.execution.fill_simulator import FillSimulator, FILLED, UNFILLED, REJECTED
+from src.execution.order_journal import OrderJournal
+from src.execution.trade_store import TradeStore
 
 class OrderManager:
     """
@@ -11,56 +14,142 @@ class OrderManager:
     Supports Persistence for stateless environments (e.g., GitHub Actions).
     """
     
-    def __init__(self, cash_balance: float = 50000.0, state_file: str = "data/portfolio_state.json"):
+    def __init__(self, cash_balance: float = 50000.0, state_file: Optional[str] = "data/portfolio_state.json",
+                 journal_file: Optional[str] = None, history_file: Optional[str] = None,
+                 snapshot_every: int = 200, trade_store: Optional[TradeStore] = None,
+                 fill_simulator: Optional[FillSimulator] = None,
+                 working_order_max_age: float = config.WORKING_ORDER_MAX_AGE_MINUTES * 60):
+        # state_file=None keeps everything in memory (e.g. inside backtests)
         self.state_file = state_file
         # Default starting values
+        self.initial_cash = cash_balance
         self.cash_balance = cash_balance
         self.orders = []
         self.portfolio: Dict[str, int] = {} # Symbol -> Quantity
+        # Unfilled orders, re-evaluated by every execute_orders() call until they
+        # fill or are cancelled after `working_order_max_age` seconds
+        self.working_orders: List[Dict[str, Any]] = []
+        self.working_order_max_age = working_order_max_age
+        
+        # Fills are appended to a journal next to the snapshot (state_file);
+        # save_state() snapshots and compacts it (see OrderJournal)
+        self.journal = None
+        if self.state_file is not None:
+            data_dir = os.path.dirname(self.state_file)
+            self.journal = OrderJournal(journal_file or os.path.join(data_dir, "order_journal.jsonl"),
+                                        history_file or os.path.join(data_dir, "order_history.jsonl"),
+                                        self.state_file, snapshot_every=snapshot_every)
+        # Optional SQLite index of the same fills, for aggregate queries (see TradeStore)
+        self.trade_store = trade_store
+        # Paper fills with spread / slippage / commission (see FillSimulator)
+        self.fill_simulator = fill_simulator or FillSimulator()
         
         # Load previous state if available
         self.load_state()
 
     def load_state(self):
-        """Load portfolio and orders from JSON file."""
-        if os.path.exists(self.state_file):
+        """Load the portfolio snapshot, then replay the journal events written after it."""
+        if self.journal is None:
+            return
+        try:
+            data = self.journal.load()
+            if data is not None:
+                self.cash_balance = data.get('cash_balance', self.initial_cash)
+                self.portfolio = data.get('portfolio', {})
+                self.orders = data.get('orders', [])
+                self.working_orders = data.get('working_orders', [])
+            else:
+                self.cash_balance = self.initial_cash
+                self.portfolio = {}
+                self.orders = []
+                self.working_orders = []
+            events = self.journal.tail(data.get('journal_seq', 0) if data else 0)
+            for event in events:
+                self._apply_event(event)
+            if self.trade_store is not None and self.trade_store.last_seq() < self.journal.seq:
+                # Store missing (or behind, e.g. a fresh checkout): catch up from the journal
+                imported = self.trade_store.sync(self.journal.history())
+                print(f"[EXEC] Trade store synced: {imported} fills imported")
+            if data is None and not events:
+                print("[EXEC] No saved state found. Starting fresh.")
+                return
+            print(f"[EXEC] Loaded persistence state from {self.state_file} (+{len(events)} journal events)")
+            print(f"       Cash: ${self.cash_balance:.2f} | Positions: {len(self.portfolio)}")
+        except Exception as e:
+            print(f"[EXEC] Error loading state: {e}")
+
+    def _apply_event(self, event: Dict[str, Any]):
+        """
+        Apply one journal event to the in-memory state (used live and on replay).
+        Types: 'fill', 'working' (order left unfilled), 'cancel' (working order dropped).
+        """
+        event_type = event.get('type')
+        if event_type == 'fill':
+            self.orders.append(event['order'])
+            symbol = event['symbol']
+            shares = -event['quantity'] if event['order'].get('action') == 'SELL' else event['quantity']
+            self.portfolio[symbol] = self.portfolio.get(symbol, 0) + shares
+            self.cash_balance += event['cash_delta']
+            self._drop_working(event['order']['order_id'])
+        elif event_type == 'working':
+            self._drop_working(event['order']['order_id'])
+            self.working_orders.append(event['order'])
+        elif event_type == 'cancel':
+            self._drop_working(event['order_id'])
+
+    def _drop_working(self, order_id: str):
+        self.working_orders = [o for o in self.working_orders if o['order_id'] != order_id]
+
+    def _record_fill(self, order: Dict[str, Any], cash_delta: float, commission: float = 0.0):
+        """Journal a fill (one appended line) and apply it."""
+        self._record_event({'type': 'fill', 'order': order, 'symbol': order['symbol'],
+                            'quantity': order['quantity'], 'cash_delta': cash_delta, 'commission': commission,
+                            'cash_balance': self.cash_balance + cash_delta})
+
+    def _record_event(self, event: Dict[str, Any]):
+        """Journal an event (one appended line), apply it and index it in the trade store."""
+        if self.journal is not None:
             try:
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
-                    self.cash_balance = data.get('cash_balance', self.cash_balance)
-                    self.portfolio = data.get('portfolio', {})
-                    self.orders = data.get('orders', [])
-                    print(f"[EXEC] Loaded persistence state from {self.state_file}")
-                    print(f"       Cash: ${self.cash_balance:.2f} | Positions: {len(self.portfolio)}")
+                event = self.journal.append(event)
             except Exception as e:
-                print(f"[EXEC] Error loading state: {e}")
-        else:
-            print("[EXEC] No saved state found. Starting fresh.")
+                print(f"[EXEC] Error writing order journal: {e}")
+        self._apply_event(event)
+        if self.trade_store is not None and 'seq' in event:
+            try:
+                if not self.trade_store.record_event(event):
+                    # An earlier write failed: backfill the gap (and this event) from the journal
+                    self.trade_store.sync(self.journal.history())
+            except Exception as e:
+                print(f"[EXEC] Error writing trade store: {e}")
 
     def save_state(self):
-        """Save current portfolio and orders to JSON file."""
+        """Snapshot the portfolio and compact the journal into the order history."""
+        if self.journal is None:
+            return
         data = {
             'timestamp': time.time(),
             'cash_balance': self.cash_balance,
             'portfolio': self.portfolio,
-            'orders': self.orders[-50:] # Keep last 50 orders history
+            'orders': self.orders[-50:], # Recent orders for the dashboard; full history in order_history.jsonl
+            'working_orders': self.working_orders
         }
         try:
-            os.makedirs(os.path.dirname(self.state_file), exist_ok=True)
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f, indent=4)
+            self.journal.compact(data)
             print(f"[EXEC] State saved to {self.state_file}")
         except Exception as e:
             print(f"[EXEC] Error saving state: {e}")
         
-    def prioritize_signals(self, signals: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def prioritize_signals(self, signals: List[Dict[str, Any]], verbose: bool = True) -> List[Dict[str, Any]]:
         """
         Rank signals based on criteria:
         1. Backtest Win Rate (if available)
         2. Signal Strength (e.g., Fibo Deep Discount > Shallow Dip)
         3. Risk/Reward Ratio (implied)
+        
+        verbose=False skips the console ranking (used by backtests).
         """
-        print(f"\n[EXEC] Prioritizing {len(signals)} signals...")
+        if verbose:
+            print(f"\n[EXEC] Prioritizing {len(signals)} signals...")
         
         # Scoring Logic
         for sig in signals:
@@ -72,8 +161,12 @@ class OrderManager:
             elif sig['strategy'] == 'CDCActionZone':
                 score += 30 # Trend Following
             
-            # Criterion 2: Win Rate (Simulated data field)
-            win_rate = sig.get('win_rate', 50.0)
+            # Criterion 2: Win Rate (from the stats store; else live trades, if recorded)
+            win_rate = sig.get('win_rate')
+            if win_rate is None:
+                win_rate = 50.0
+                if self.trade_store is not None:
+                    win_rate = self.trade_store.win_rate(sig['strategy'], sig['symbol'], min_trades=3, default=50.0)
             score += win_rate # e.g., +80 points for 80% win rate
             
             sig['priority_score'] = score
@@ -81,8 +174,9 @@ class OrderManager:
         # Sort by Score descending
         sorted_signals = sorted(signals, key=lambda x: x['priority_score'], reverse=True)
         
-        for i, sig in enumerate(sorted_signals):
-            print(f"  #{i+1}: {sig['symbol']} ({sig['strategy']}) - Score: {sig['priority_score']}")
+        if verbose:
+            for i, sig in enumerate(sorted_signals):
+                print(f"  #{i+1}: {sig['symbol']} ({sig['strategy']}) - Score: {sig['priority_score']}")
             
         return sorted_signals
 
@@ -121,47 +215,89 @@ class OrderManager:
             'quantity': shares,
             'order_type': order_type,
             'limit_price': limit_price, # Only for LIMIT
+            'reference_price': price,   # Price the order was sized at (fill fallback without quotes)
+            'signal_time': self._signal_time(signal), # Only quotes after this can fill the order
             'status': 'PENDING',
+            'strategy': signal['strategy'],
             'timestamp': time.time(),
             'notes': f"Strategy: {signal['strategy']} | Score: {signal.get('priority_score')}"
         }
         
         return order
 
-    def execute_orders(self, orders: List[Dict[str, Any]]):
+    @staticmethod
+    def _signal_time(signal: Dict[str, Any]) -> float:
+        """Epoch time of the bar the signal was computed on (now if the signal has no date)."""
+        date = signal.get('date')
+        if hasattr(date, 'timestamp'):
+            return float(date.timestamp())
+        return time.time()
+
+    def _expire_working(self):
+        """Cancel working orders older than working_order_max_age."""
+        now = time.time()
+        for order in list(self.working_orders):
+            if now - order.get('timestamp', now) > self.working_order_max_age:
+                order['status'] = 'EXPIRED'
+                print(f"  [EXPIRED]: {order['symbol']} (ID: {order['order_id']}) - not filled in time")
+                self._record_event({'type': 'cancel', 'order_id': order['order_id'], 'reason': 'expired'})
+
+    def execute_orders(self, orders: List[Dict[str, Any]], quotes: Optional[Dict[str, Dict[str, float]]] = None):
         """
         Process the orders (Paper Trade Execution).
+        
+        Working orders from earlier calls come first, then the new ones; the
+        whole batch is filled in one FillSimulator step against `quotes`
+        ({symbol: {'open', 'high', 'low', 'close', 'time'}}, e.g. from
+        fresh_quotes). An order only fills on a quote newer than its signal's
+        bar; otherwise (or if its limit is not reached) it is journaled as
+        working and retried on the next call. Without quotes at all (logic
+        tests) orders fill at the price they were sized at, LIMIT orders at
+        their limit without the spread. Cash moves by the fill price plus costs.
         """
-        print(f"\n[EXEC] Processing {len(orders)} Orders...")
+        self._expire_working()
+        working_ids = {order['order_id'] for order in self.working_orders}
+        pending = list(self.working_orders) + [order for order in orders
+                                               if order['status'] == 'PENDING' and order['order_id'] not in working_ids]
+        print(f"\n[EXEC] Processing {len(pending)} Orders ({len(working_ids)} working)...")
+        if not pending:
+            return
+        
+        # 1. Fill Simulation (Liquidity / Limit touch / Cash / Holdings checks), one vectorized step
+        result = self.fill_simulator.simulate(pending, quotes, cash=self.cash_balance, holdings=self.portfolio)
         
-        for order in orders:
-            cost = order['quantity'] * (order['limit_price'] if order['limit_price'] else 0) # Estimates
+        # 2. Book the results
+        for i, order in enumerate(pending):
+            side = order.get('action', 'BUY')
+            print(f"  >>> {order['order_type']} ORDER: {side.capitalize()} {order['quantity']} {order['symbol']} "
+                  f"@ {order['limit_price'] if order['limit_price'] else 'Market'}")
+            status = result['status'][i]
+            if status != FILLED:
+                order['status'] = status
+                if status == REJECTED:
+                    print(f"  [REJECTED]: {order['symbol']} (ID: {order['order_id']}) - no price, cash or shares")
+                    if order['order_id'] in working_ids:
+                        self._record_event({'type': 'cancel', 'order_id': order['order_id'], 'reason': 'rejected'})
+                elif status == UNFILLED:
+                    print(f"  [WORKING]: {order['symbol']} no quote after the signal or limit not reached "
+                          f"(ID: {order['order_id']})")
+                    if order['order_id'] not in working_ids:
+                        self._record_event({'type': 'working', 'order': order})
+                continue
             
-            # 1. Validation (Liquidity Check / Cash Check)
-            # (In simulation we assume we calculated size correctly already)
+            order['status'] = FILLED
+            order['filled_price'] = float(result['fill_price'][i])
+            order['commission'] = float(result['commission'][i])
+            print(f"  [FILLED]: {order['symbol']} @ {order['filled_price']:.2f} (ID: {order['order_id']})")
             
-            # 2. Execution
-            if order['status'] == 'PENDING':
-                print(f"  >>> Sending {order['order_type']} ORDER: Buy {order['quantity']} {order['symbol']} @ {order['limit_price'] if order['limit_price'] else 'Market'} ...")
-                time.sleep(0.5) # Simulate network
-                
-                # 3. Fill Simulation
-                order['status'] = 'FILLED'
-                order['filled_price'] = order['limit_price'] if order['limit_price'] else 100.00 # Mock fill
-                
-                print(f"  [FILLED]: {order['symbol']} (ID: {order['order_id']})")
-                self.orders.append(order)
-                
-                # Update Portfolio
-                qty = self.portfolio.get(order['symbol'], 0)
-                self.portfolio[order['symbol']] = qty + order['quantity']
-                
-                # Update Cash (Simulated)
-                self.cash_balance -= cost
-                print(f"  [CASH] Deducted ${cost:.2f}. New Balance: ${self.cash_balance:.2f}")
+            # Journal the fill, then update Portfolio and Cash
+            self._record_fill(order, float(result['cash_delta'][i]), order['commission'])
+            print(f"  [CASH] {float(result['cash_delta'][i]):+.2f} (commission ${order['commission']:.2f}). "
+                  f"New Balance: ${self.cash_balance:.2f}")
 
-        # Save State after batch execution
-        self.save_state()
+        # Snapshot + compact only every `snapshot_every` fills; each fill above was one appended line
+        if self.journal is not None and self.journal.needs_compaction():
+            self.save_state()
 
     def reconcile(self):
         """
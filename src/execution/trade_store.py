@@ -0,0 +1,335 @@
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    order_id     TEXT PRIMARY KEY,
+    ts           REAL NOT NULL,
+    symbol       TEXT NOT NULL,
+    strategy     TEXT,
+    action       TEXT NOT NULL,
+    quantity     INTEGER NOT NULL,
+    order_type   TEXT,
+    limit_price  REAL,
+    status       TEXT,
+    filled_price REAL,
+    notes        TEXT
+);
+CREATE TABLE IF NOT EXISTS fills (
+    seq          INTEGER PRIMARY KEY,      -- OrderJournal seq of the fill event
+    order_id     TEXT NOT NULL,
+    ts           REAL NOT NULL,
+    symbol       TEXT NOT NULL,
+    strategy     TEXT,
+    side         TEXT NOT NULL,
+    quantity     INTEGER NOT NULL,
+    price        REAL NOT NULL,
+    commission   REAL NOT NULL DEFAULT 0,
+    realized_pnl REAL                      -- Sells only: vs. average cost, net of commission
+);
+CREATE TABLE IF NOT EXISTS positions (
+    symbol       TEXT PRIMARY KEY,
+    quantity     INTEGER NOT NULL,
+    avg_price    REAL NOT NULL,
+    realized_pnl REAL NOT NULL DEFAULT 0,
+    updated_ts   REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cash_ledger (
+    seq          INTEGER PRIMARY KEY,
+    ts           REAL NOT NULL,
+    amount       REAL NOT NULL,
+    balance      REAL,
+    reason       TEXT,
+    order_id     TEXT
+);
+-- Running totals per (strategy, symbol), updated with every fill, so the
+-- all-time summaries read a few hundred rows instead of every fill
+CREATE TABLE IF NOT EXISTS totals (
+    strategy      TEXT NOT NULL,
+    symbol        TEXT NOT NULL,
+    fills         INTEGER NOT NULL DEFAULT 0,
+    buy_notional  REAL NOT NULL DEFAULT 0,
+    closed_trades INTEGER NOT NULL DEFAULT 0,
+    wins          INTEGER NOT NULL DEFAULT 0,
+    realized_pnl  REAL NOT NULL DEFAULT 0,
+    commission    REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (strategy, symbol)
+);
+-- Sync watermark: every journal event up to this seq is in the store
+CREATE TABLE IF NOT EXISTS sync_state (
+    id            INTEGER PRIMARY KEY CHECK (id = 1),
+    journal_seq   INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_totals_symbol ON totals(symbol);
+CREATE INDEX IF NOT EXISTS idx_orders_symbol_ts ON orders(symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_orders_strategy_ts ON orders(strategy, ts);
+CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders(ts);
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_ts ON fills(symbol, ts);
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_side ON fills(symbol, side);
+CREATE INDEX IF NOT EXISTS idx_fills_strategy_side ON fills(strategy, side, symbol);
+CREATE INDEX IF NOT EXISTS idx_fills_order ON fills(order_id);
+CREATE INDEX IF NOT EXISTS idx_fills_ts ON fills(ts);
+CREATE INDEX IF NOT EXISTS idx_cash_ts ON cash_ledger(ts);
+"""
+
+_STRATEGY_NOTE = re.compile(r"Strategy:\s*([^|]+?)\s*(\||$)")
+
+
+def order_strategy(order: Dict[str, Any]) -> Optional[str]:
+    """Strategy of an order ticket; older tickets only carry it in 'notes'."""
+    if order.get('strategy'):
+        return order['strategy']
+    match = _STRATEGY_NOTE.search(order.get('notes') or '')
+    return match.group(1) if match else None
+
+
+class TradeStore:
+    """
+    Embedded SQLite store of orders, fills, positions and the cash ledger,
+    indexed by symbol, strategy and timestamp, for aggregate queries
+    (per-strategy / per-symbol PnL, win rates, recent orders) that would
+    otherwise mean loading and scanning every order.
+
+    It is an index over the OrderJournal, not a second source of truth:
+    every row comes from a journal fill event and carries its seq, so
+    sync() can catch the database up from the journal at any time (or
+    rebuild it from scratch after the file is deleted).
+    """
+
+    def __init__(self, db_path: str = "data/trades.db"):
+        """
+        Args:
+            db_path (str): SQLite file (":memory:" for a throwaway store).
+        """
+        self.db_path = db_path
+        if db_path != ":memory:" and os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        # One connection shared by the bot's worker threads, serialized by the lock
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self.conn:
+            if db_path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+    # ---- Writes ------------------------------------------------------------
+
+    def last_seq(self) -> int:
+        """Journal seq up to which every event is in the store (the sync watermark)."""
+        with self._lock:
+            return self._watermark() or 0
+
+    def _watermark(self) -> Optional[int]:
+        row = self.conn.execute("SELECT journal_seq FROM sync_state WHERE id = 1").fetchone()
+        return row[0] if row else None
+
+    def _set_watermark(self, seq: int):
+        self.conn.execute("INSERT INTO sync_state (id, journal_seq) VALUES (1, ?) "
+                          "ON CONFLICT (id) DO UPDATE SET journal_seq = excluded.journal_seq", (seq,))
+
+    def _is_legacy(self) -> bool:
+        """Fills written before the watermark existed: gaps cannot be ruled out."""
+        return self._watermark() is None and self.conn.execute("SELECT 1 FROM fills LIMIT 1").fetchone() is not None
+
+    def _clear(self):
+        for table in ('fills', 'orders', 'positions', 'cash_ledger', 'totals', 'sync_state'):
+            self.conn.execute(f"DELETE FROM {table}")
+
+    def _insert_fill(self, event: Dict[str, Any]):
+        order = event['order']
+        seq, ts = event['seq'], event.get('ts', order.get('timestamp', 0.0))
+        symbol, side = event['symbol'], order.get('action', 'BUY')
+        strategy = order_strategy(order)
+        quantity = int(event['quantity'])
+        price = float(order.get('filled_price') or order.get('limit_price') or 0.0)
+        commission = float(event.get('commission', 0.0))
+
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO fills (seq, order_id, ts, symbol, strategy, side, quantity, price, commission) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (seq, order['order_id'], ts, symbol, strategy, side, quantity, price, commission))
+        if cur.rowcount == 0:
+            return  # Already imported
+
+        self.conn.execute(
+            "INSERT OR REPLACE INTO orders (order_id, ts, symbol, strategy, action, quantity, order_type, "
+            "limit_price, status, filled_price, notes) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (order['order_id'], order.get('timestamp', ts), symbol, strategy, side, int(order['quantity']),
+             order.get('order_type'), order.get('limit_price'), order.get('status'),
+             order.get('filled_price'), order.get('notes')))
+
+        # Position: average cost on buys, realized PnL against it on sells
+        pnl = 0.0
+        row = self.conn.execute("SELECT quantity, avg_price, realized_pnl FROM positions WHERE symbol = ?",
+                                (symbol,)).fetchone()
+        held, avg_price, realized = (row['quantity'], row['avg_price'], row['realized_pnl']) if row else (0, 0.0, 0.0)
+        if side == 'SELL':
+            pnl = (price - avg_price) * quantity - commission
+            self.conn.execute("UPDATE fills SET realized_pnl = ? WHERE seq = ?", (pnl, seq))
+            held, realized = held - quantity, realized + pnl
+            if held <= 0:
+                held, avg_price = 0, 0.0
+        else:
+            total = held + quantity
+            avg_price = (avg_price * held + price * quantity + commission) / total if total else 0.0
+            held = total
+        self.conn.execute(
+            "INSERT OR REPLACE INTO positions (symbol, quantity, avg_price, realized_pnl, updated_ts) "
+            "VALUES (?, ?, ?, ?, ?)", (symbol, held, avg_price, realized, ts))
+
+        self.conn.execute(
+            "INSERT INTO totals (strategy, symbol, fills, buy_notional, closed_trades, wins, realized_pnl, commission) "
+            "VALUES (?, ?, 1, ?, ?, ?, ?, ?) ON CONFLICT (strategy, symbol) DO UPDATE SET "
+            "fills = fills + 1, buy_notional = buy_notional + excluded.buy_notional, "
+            "closed_trades = closed_trades + excluded.closed_trades, wins = wins + excluded.wins, "
+            "realized_pnl = realized_pnl + excluded.realized_pnl, commission = commission + excluded.commission",
+            (strategy or '', symbol, price * quantity if side == 'BUY' else 0.0, int(side == 'SELL'),
+             int(side == 'SELL' and pnl > 0), pnl, commission))
+
+        self.conn.execute(
+            "INSERT OR IGNORE INTO cash_ledger (seq, ts, amount, balance, reason, order_id) VALUES (?, ?, ?, ?, ?, ?)",
+            (seq, ts, float(event.get('cash_delta', 0.0)), event.get('cash_balance'),
+             f"{side} {quantity} {symbol}", order['order_id']))
+
+    def record_event(self, event: Dict[str, Any]) -> bool:
+        """
+        Store the next OrderJournal event (already-stored seqs are ignored).
+
+        Positions and totals are built incrementally, so events must arrive in
+        seq order. If an earlier event is missing (its write failed), nothing
+        is stored and False is returned: sync() from the journal backfills it.
+        """
+        seq = event.get('seq', 0)
+        with self._lock, self.conn:
+            watermark = self._watermark() or 0
+            if seq <= watermark:
+                return True
+            if seq != watermark + 1 or self._is_legacy():
+                return False
+            if event.get('type') == 'fill':
+                self._insert_fill(event)
+            self._set_watermark(seq)
+        return True
+
+    def sync(self, events: Iterable[Dict[str, Any]]) -> int:
+        """
+        Import the journal events after the watermark (last_seq()), oldest
+        first, in one transaction, e.g. sync(journal.history()). A store
+        written before the watermark existed is rebuilt from scratch.
+        Returns how many fills were imported.
+        """
+        imported = 0
+        with self._lock, self.conn:
+            if self._is_legacy():
+                self._clear()
+            watermark = self._watermark() or 0
+            for event in events:
+                seq = event.get('seq', 0)
+                if seq <= watermark:
+                    continue
+                if event.get('type') == 'fill':
+                    self._insert_fill(event)
+                    imported += 1
+                watermark = seq
+            self._set_watermark(watermark)
+        return imported
+
+    # ---- Queries -----------------------------------------------------------
+
+    def _rows(self, sql: str, params: tuple = ()) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(row) for row in self.conn.execute(sql, params).fetchall()]
+
+    def positions(self) -> List[Dict[str, Any]]:
+        """Open positions: symbol, quantity, avg_price, realized_pnl."""
+        return self._rows("SELECT symbol, quantity, avg_price, realized_pnl, updated_ts FROM positions "
+                          "WHERE quantity > 0 ORDER BY symbol")
+
+    def cash_balance(self) -> Optional[float]:
+        """Balance after the newest ledger entry (None if empty)."""
+        rows = self._rows("SELECT balance FROM cash_ledger ORDER BY seq DESC LIMIT 1")
+        return rows[0]['balance'] if rows else None
+
+    def cash_ledger(self, since: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Newest cash movements first."""
+        return self._rows("SELECT * FROM cash_ledger WHERE ts >= ? ORDER BY ts DESC LIMIT ?",
+                          (since or 0.0, limit))
+
+    def recent_orders(self, limit: int = 50, symbol: Optional[str] = None,
+                      strategy: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Newest orders first, optionally for one symbol and/or strategy."""
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if strategy:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return self._rows(f"SELECT * FROM orders {where} ORDER BY ts DESC LIMIT ?", (*params, limit))
+
+    def strategy_summary(self, since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Per strategy: fills, buy notional, closed trades (sells), wins,
+        win_rate (%), realized PnL and commission. All-time figures come from
+        the running totals; `since` (epoch seconds) aggregates the fills after it.
+        """
+        if since is None:
+            return self._rows(
+                "SELECT NULLIF(strategy, '') AS strategy, SUM(fills) AS fills, SUM(buy_notional) AS buy_notional, "
+                "SUM(closed_trades) AS closed_trades, SUM(wins) AS wins, "
+                "100.0 * SUM(wins) / NULLIF(SUM(closed_trades), 0) AS win_rate, "
+                "SUM(realized_pnl) AS realized_pnl, SUM(commission) AS commission "
+                "FROM totals GROUP BY strategy ORDER BY realized_pnl DESC")
+        return self._rows(
+            "SELECT strategy, COUNT(*) AS fills, "
+            "SUM(CASE WHEN side = 'BUY' THEN quantity * price ELSE 0 END) AS buy_notional, "
+            "SUM(side = 'SELL') AS closed_trades, "
+            "SUM(side = 'SELL' AND realized_pnl > 0) AS wins, "
+            "100.0 * SUM(side = 'SELL' AND realized_pnl > 0) / NULLIF(SUM(side = 'SELL'), 0) AS win_rate, "
+            "COALESCE(SUM(realized_pnl), 0) AS realized_pnl, SUM(commission) AS commission "
+            "FROM fills WHERE ts >= ? GROUP BY strategy ORDER BY realized_pnl DESC",
+            (since,))
+
+    def symbol_pnl(self, strategy: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Per symbol: fills, closed trades, win_rate (%), realized PnL, plus the open position."""
+        where, params = ("WHERE t.strategy = ?", (strategy,)) if strategy else ("", ())
+        return self._rows(
+            "SELECT t.symbol, SUM(t.fills) AS fills, SUM(t.closed_trades) AS closed_trades, "
+            "100.0 * SUM(t.wins) / NULLIF(SUM(t.closed_trades), 0) AS win_rate, "
+            "SUM(t.realized_pnl) AS realized_pnl, "
+            "COALESCE(p.quantity, 0) AS position, p.avg_price "
+            f"FROM totals t LEFT JOIN positions p ON p.symbol = t.symbol {where} "
+            "GROUP BY t.symbol ORDER BY realized_pnl DESC", params)
+
+    def win_rate(self, strategy: Optional[str] = None, symbol: Optional[str] = None,
+                 min_trades: int = 1, default: Optional[float] = None) -> Optional[float]:
+        """Live win rate (%) of closed trades, or `default` below `min_trades`."""
+        clauses, params = [], []
+        if strategy:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._rows(f"SELECT SUM(closed_trades) AS n, SUM(wins) AS wins FROM totals {where}", tuple(params))
+        n, wins = rows[0]['n'] or 0, rows[0]['wins'] or 0
+        if n < max(1, min_trades):
+            return default
+        return wins / n * 100
+
+    def daily_cash_flow(self, days: int = 30) -> List[Dict[str, Any]]:
+        """Net cash movement per (UTC) day, newest first."""
+        return self._rows(
+            "SELECT date(ts, 'unixepoch') AS day, SUM(amount) AS net, COUNT(*) AS entries "
+            "FROM cash_ledger GROUP BY day ORDER BY day DESC LIMIT ?", (days,))
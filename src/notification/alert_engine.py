@@ -1,23 +1,69 @@
 import os
+import time
+import atexit
 import datetime
-import requests
+import threading
 import traceback
-from typing import Optional
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
 import src.config as config
+from src.notification.log_writer import BufferedLogWriter
+from src.notification.telegram_dispatcher import TelegramDispatcher
 
 class AlertEngine:
     """
     Handles system-wide notifications and logging.
     Supports Console output, File logging, and Telegram.
+
+    Console and file get every alert. Telegram-bound alerts are coalesced:
+    an identical alert within ALERT_DEDUP_WINDOW_SECONDS is suppressed, each
+    channel (alert title) is rate-limited by a token bucket, with alerts over
+    the limit held and sent as one combined message once the channel has
+    room again (by a timer thread, so they go out even if no later alert
+    arrives), and inside `with digest():` everything is merged into a
+    single message. CRITICAL alerts skip the rate limit and the digest.
     """
+    TELEGRAM_MAX_CHARS = 4000  # Telegram caps messages at 4096 characters
+
     def __init__(self, log_file: str = "system_alerts.log"):
         self.log_file = log_file
         self.ensure_log_dir()
+        # Lines are batched and written (and rotated) by a background thread
+        self.log_writer = BufferedLogWriter(log_file,
+                                            max_bytes=config.LOG_MAX_BYTES,
+                                            rotate_daily=config.LOG_ROTATE_DAILY,
+                                            backup_count=config.LOG_BACKUP_COUNT,
+                                            flush_interval=config.LOG_FLUSH_INTERVAL_SECONDS)
+        atexit.register(self.close)
         
         # Telegram Setup
         self.tg_enabled = config.TELEGRAM_ENABLED
         self.tg_token = config.TELEGRAM_BOT_TOKEN
         self.tg_chat_id = config.TELEGRAM_CHAT_ID
+        # Messages are posted by a background worker so send_alert never waits on the network
+        self.telegram = None
+        if self.tg_enabled and "YOUR_" not in self.tg_token:
+            self.telegram = TelegramDispatcher(self.tg_token, self.tg_chat_id,
+                                               max_queue=config.TELEGRAM_QUEUE_SIZE,
+                                               max_retries=config.TELEGRAM_MAX_RETRIES,
+                                               timeout=config.TELEGRAM_TIMEOUT_SECONDS)
+
+        # Coalescing state (see class docstring)
+        self.dedup_window = config.ALERT_DEDUP_WINDOW_SECONDS
+        self.rate_per_second = config.ALERT_RATE_LIMIT_PER_MINUTE / 60.0
+        self.rate_burst = config.ALERT_RATE_LIMIT_BURST
+        self.suppressed = 0                                          # Duplicates not sent
+        self._recent: Dict[Tuple[str, str, str], float] = {}         # (title, level, message) -> last sent
+        self._buckets: Dict[str, List[float]] = {}                   # title -> [tokens, last refill]
+        self._held: Dict[str, List[Tuple[str, str]]] = defaultdict(list)  # title -> [(emoji, message)]
+        self._digest: List[Tuple[str, str, str]] = []                # (title, emoji, message)
+        self._digest_depth = 0
+        self._alert_lock = threading.Lock()
+        # Wakes the release thread when alerts are held or a digest ends
+        self._alert_cond = threading.Condition(self._alert_lock)
+        self._release_thread: Optional[threading.Thread] = None
+        self._closed = False
 
     def ensure_log_dir(self):
         """Ensures the directory for the log file exists."""
@@ -25,23 +71,164 @@ class AlertEngine:
             os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
 
     def send_telegram(self, message: str):
-        """Sends a message to the configured Telegram Chat."""
-        if not self.tg_enabled or "YOUR_" in self.tg_token:
+        """Queues a message for the configured Telegram Chat (returns immediately)."""
+        if self.telegram is None:
             return
+        self.telegram.submit(message)
+
+    def _take_token(self, channel: str, now: float) -> bool:
+        tokens, last = self._buckets.get(channel, (self.rate_burst, now))
+        tokens = min(self.rate_burst, tokens + (now - last) * self.rate_per_second)
+        allowed = tokens >= 1
+        self._buckets[channel] = [tokens - 1 if allowed else tokens, now]
+        return allowed
+
+    def _is_duplicate(self, key: Tuple[str, str, str], now: float) -> bool:
+        last = self._recent.get(key)
+        if last is not None and now - last < self.dedup_window:
+            return True
+        self._recent[key] = now
+        if len(self._recent) > 1000:
+            self._recent = {k: t for k, t in self._recent.items() if now - t < self.dedup_window}
+        return False
+
+    def _release_held(self, now: float, force: bool = False) -> List[str]:
+        """Combine held alerts of every channel that has a token again (all of them if `force`)."""
+        messages = []
+        for channel in list(self._held):
+            if self._held[channel] and (force or self._take_token(channel, now)):
+                held = self._held.pop(channel)
+                emoji = held[0][0]
+                messages.extend(self._format_block(f"{emoji} *{channel}* ({len(held)})",
+                                                   [f"• {message}" for _, message in held]))
+        return messages
+
+    def _next_release(self, now: float) -> Optional[float]:
+        """Seconds until some channel with held alerts has a token again (None if nothing can be released)."""
+        if self._digest_depth or self.rate_per_second <= 0:
+            return None  # The digest's exit releases them
+        waits = []
+        for channel, held in self._held.items():
+            if held:
+                tokens, last = self._buckets.get(channel, (self.rate_burst, now))
+                tokens = min(self.rate_burst, tokens + (now - last) * self.rate_per_second)
+                waits.append(max(0.0, (1 - tokens) / self.rate_per_second))
+        return min(waits) if waits else None
+
+    def _ensure_release_worker(self):
+        if self._release_thread is None:
+            self._release_thread = threading.Thread(target=self._release_worker, name="alert-release", daemon=True)
+            self._release_thread.start()
+
+    def _release_worker(self):
+        """Sends held alerts as soon as their channel's bucket refills."""
+        while True:
+            with self._alert_cond:
+                while not self._closed:
+                    wait = self._next_release(time.monotonic())
+                    if wait is not None and wait <= 0:
+                        break
+                    # Small margin so the refill has happened when we wake
+                    self._alert_cond.wait(None if wait is None else wait + 0.01)
+                if self._closed:
+                    return
+                outgoing = self._release_held(time.monotonic())
+            for tg_msg in outgoing:
+                self.send_telegram(tg_msg)
+
+    def _format_block(self, header: str, lines: List[str]) -> List[str]:
+        """Header plus lines, split into as many messages as the Telegram size limit needs."""
+        messages, current = [], header
+        for line in lines:
+            if len(current) + len(line) + 1 > self.TELEGRAM_MAX_CHARS:
+                messages.append(current)
+                current = f"{header} (cont.)"
+            current += "\n" + line
+        messages.append(current)
+        return messages
+
+    def _dispatch(self, title: str, message: str, level: str, emoji: str):
+        """Route one Telegram-bound alert through dedup, digest and the per-channel rate limit."""
+        now = time.monotonic()
+        outgoing = []
+        with self._alert_lock:
+            if self._is_duplicate((title, level, message), now):
+                self.suppressed += 1
+                return
+            if level != "CRITICAL" and self._digest_depth:
+                self._digest.append((title, emoji, message))
+                return
+            outgoing.extend(self._release_held(now))
+            if level == "CRITICAL" or self._take_token(title, now):
+                outgoing.append(f"{emoji} *{title}*\n{message}")
+            else:
+                self._held[title].append((emoji, message))
+                self._ensure_release_worker()
+                self._alert_cond.notify_all()
+        for tg_msg in outgoing:
+            self.send_telegram(tg_msg)
+
+    @contextmanager
+    def digest(self, title: str = "Digest"):
+        """
+        Merge the Telegram alerts raised inside the block into one message,
+        grouped by channel, sent when the block exits. Nested blocks join the
+        outermost one.
 
-        url = f"https://api.telegram.org/bot{self.tg_token}/sendMessage"
-        payload = {
-            "chat_id": self.tg_chat_id,
-            "text": message,
-            "parse_mode": "Markdown"
-        }
+        Usage:
+            with alert_system.digest("Market Scan"):
+                ...  # send_alert() as usual
+        """
+        with self._alert_lock:
+            self._digest_depth += 1
         try:
-            # Timeout is important to not hang the bot loop
-            response = requests.post(url, json=payload, timeout=5)
-            if response.status_code != 200:
-                print(f"[AlertEngine] Telegram Error: {response.text}")
-        except Exception as e:
-            print(f"[AlertEngine] Telegram Connection Failed: {e}")
+            yield self
+        finally:
+            with self._alert_lock:
+                self._digest_depth -= 1
+                outgoing = []
+                if self._digest_depth == 0:
+                    collected, self._digest = self._digest, []
+                    outgoing = self._release_held(time.monotonic())
+                    if collected:
+                        outgoing.extend(self._format_digest(title, collected))
+                    # Channels still over their limit are left to the release thread
+                    self._alert_cond.notify_all()
+            for tg_msg in outgoing:
+                self.send_telegram(tg_msg)
+
+    def _format_digest(self, title: str, collected: List[Tuple[str, str, str]]) -> List[str]:
+        groups: Dict[str, List[Tuple[str, str]]] = {}
+        for channel, emoji, message in collected:
+            groups.setdefault(channel, []).append((emoji, message))
+        lines = []
+        for channel, items in groups.items():
+            lines.append(f"{items[0][0]} *{channel}* ({len(items)})")
+            lines.extend(f"  • {message}" for _, message in items)
+        return self._format_block(f"📋 *{title}* ({len(collected)} alerts)", lines)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Sends held alerts, then waits until buffered log lines are written and queued Telegram messages sent. False on timeout."""
+        with self._alert_lock:
+            held = self._release_held(time.monotonic(), force=True)
+        for tg_msg in held:
+            self.send_telegram(tg_msg)
+        flushed = self.log_writer.flush(timeout)
+        if self.telegram is not None:
+            flushed = self.telegram.flush(timeout) and flushed
+        return flushed
+
+    def close(self):
+        """Writes out the log buffer, sends held and queued alerts and stops both workers (also run at exit)."""
+        with self._alert_lock:
+            held = self._release_held(time.monotonic(), force=True)
+            self._closed = True
+            self._alert_cond.notify_all()
+        for tg_msg in held:
+            self.send_telegram(tg_msg)
+        self.log_writer.close()
+        if self.telegram is not None:
+            self.telegram.close(timeout=config.TELEGRAM_FLUSH_TIMEOUT_SECONDS)
 
     def send_alert(self, title: str, message: str, level: str = "INFO", color: str = None):
         """
@@ -83,15 +270,10 @@ class AlertEngine:
              emoji = "🤖"
 
         if should_send and self.tg_enabled:
-            tg_msg = f"{emoji} *{title}*\n{message}"
-            self.send_telegram(tg_msg)
+            self._dispatch(title, message, level, emoji)
 
     def log_to_file(self, message: str):
-        try:
-            with open(self.log_file, "a", encoding="utf-8") as f:
-                f.write(message + "\n")
-        except Exception as e:
-            print(f"Error writing to log file: {e}")
+        self.log_writer.write(message)
 
     def test_alert(self):
         self.send_alert("TEST", "This is a test alert.", "INFO")
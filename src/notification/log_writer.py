@@ -0,0 +1,190 @@
+import os
+import glob
+import gzip
+import time
+import shutil
+import datetime
+import threading
+from collections import deque
+from typing import Deque, Optional
+
+
+class BufferedLogWriter:
+    """
+    Append-only log file written by a background thread.
+
+    write() only appends the line to an in-memory buffer. The worker thread
+    writes the buffer in one batch when it reaches `flush_bytes` or every
+    `flush_interval` seconds, keeping the file open between batches. Before
+    each batch the file is rotated if it would pass `max_bytes` or if the
+    day has changed; the old segment is renamed to
+    '<log>.<YYYY-MM-DD>.<n>', gzipped, and only the newest `backup_count`
+    segments are kept, so disk use stays bounded.
+    """
+
+    def __init__(self, path: str, max_bytes: int = 5 * 1024 * 1024, rotate_daily: bool = True,
+                 backup_count: int = 10, compress: bool = True, flush_interval: float = 1.0,
+                 flush_bytes: int = 64 * 1024, max_buffer_lines: int = 100000):
+        """
+        Args:
+            path (str): Log file.
+            max_bytes (int): Rotate before the file would grow past this (0 = no size limit).
+            rotate_daily (bool): Start a new file on the first write of each day.
+            backup_count (int): Rotated segments kept; older ones are deleted.
+            compress (bool): gzip rotated segments.
+            flush_interval (float): Longest time a line waits in the buffer, in seconds.
+            flush_bytes (int): Buffered size that triggers an immediate write.
+            max_buffer_lines (int): Lines held while the disk falls behind; the oldest are dropped past this.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.backup_count = backup_count
+        self.compress = compress
+        self.flush_interval = flush_interval
+        self.flush_bytes = flush_bytes
+        self.max_buffer_lines = max_buffer_lines
+        self.dropped = 0
+
+        self._buffer: Deque[str] = deque()
+        self._buffer_bytes = 0
+        self._flush_requested = False
+        self._written_seq = 0      # Lines handed to the file so far
+        self._queued_seq = 0       # Lines accepted by write() so far
+        self._cond = threading.Condition()
+        self._closing = False
+        self._file = None
+        self._file_day: Optional[datetime.date] = None
+        self._thread: Optional[threading.Thread] = None
+
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+    def _ensure_worker(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._worker, name="log-writer", daemon=True)
+            self._thread.start()
+
+    def write(self, line: str):
+        """Queue one line (newline added). Never touches the disk."""
+        data = line + "\n"
+        with self._cond:
+            if self._closing:
+                return
+            self._ensure_worker()
+            if len(self._buffer) >= self.max_buffer_lines:
+                self._buffer_bytes -= len(self._buffer.popleft())
+                self.dropped += 1
+            self._buffer.append(data)
+            self._buffer_bytes += len(data)
+            self._queued_seq += 1
+            if self._buffer_bytes >= self.flush_bytes:
+                self._cond.notify_all()
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                deadline = time.monotonic() + self.flush_interval
+                while not (self._closing or self._flush_requested or self._buffer_bytes >= self.flush_bytes):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._flush_requested = False
+                batch, self._buffer, self._buffer_bytes = self._buffer, deque(), 0
+                seq = self._queued_seq
+                closing = self._closing
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    print(f"Error writing to log file: {e}")
+            with self._cond:
+                self._written_seq = seq
+                self._cond.notify_all()
+                if closing and not self._buffer:
+                    break
+        self._close_file()
+
+    def _open(self):
+        self._file = open(self.path, "a", encoding="utf-8")
+        if os.path.getsize(self.path) > 0:
+            self._file_day = datetime.date.fromtimestamp(os.path.getmtime(self.path))
+        else:
+            self._file_day = datetime.date.today()
+
+    def _close_file(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _write_batch(self, lines: Deque[str]):
+        """Write a batch, splitting it across segments where it crosses max_bytes."""
+        if self._file is None:
+            self._open()
+        if self.rotate_daily and self._file_day != datetime.date.today() and self._file.tell():
+            self._rotate()
+        size = self._file.tell()
+        chunk = []
+        for line in lines:
+            length = len(line.encode("utf-8"))
+            if self.max_bytes and size and size + length > self.max_bytes:
+                self._file.write("".join(chunk))
+                chunk = []
+                self._rotate()
+                size = 0
+            chunk.append(line)
+            size += length
+        self._file.write("".join(chunk))
+        self._file.flush()
+
+    def _rotate(self):
+        """Move the current file aside as '<log>.<day>.<n>', compress it, prune old segments and reopen."""
+        self._close_file()
+        stem = f"{self.path}.{self._file_day.isoformat()}"
+        n = 1
+        while os.path.exists(f"{stem}.{n}") or os.path.exists(f"{stem}.{n}.gz"):
+            n += 1
+        segment = f"{stem}.{n}"
+        os.replace(self.path, segment)
+        if self.compress:
+            with open(segment, "rb") as src, gzip.open(segment + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(segment)
+        self._prune()
+        self._open()
+
+    def _prune(self):
+        # Oldest first; name length breaks mtime ties so '.2' sorts before '.10'
+        segments = sorted(glob.glob(glob.escape(self.path) + ".*"),
+                          key=lambda f: (os.path.getmtime(f), len(f), f))
+        for old in segments[:max(0, len(segments) - self.backup_count)]:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Block until every line written so far is on disk. False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            if self._thread is None:
+                return True
+            target = self._queued_seq
+            self._flush_requested = True
+            self._cond.notify_all()
+            while self._written_seq < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Write out the buffer and stop the worker. Later write() calls are ignored."""
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
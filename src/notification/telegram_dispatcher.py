@@ -0,0 +1,158 @@
+import time
+import queue
+import threading
+import requests
+from typing import Any, Dict, Optional
+
+_STOP = object()  # Queue sentinel: worker exits after everything queued before it
+
+
+class TelegramDispatcher:
+    """
+    Background sender for Telegram messages.
+
+    submit() only puts the message on a bounded queue and returns; a single
+    daemon thread posts queued messages in order over one pooled
+    requests.Session. Rate limits (429, honouring Telegram's retry_after),
+    server errors (5xx) and connection failures are retried with exponential
+    backoff; other 4xx responses are bad requests and are dropped. When the
+    queue is full, new messages are dropped (and counted) rather than
+    blocking the caller.
+    """
+
+    def __init__(self, token: str, chat_id: str, max_queue: int = 1000, max_retries: int = 3,
+                 backoff_seconds: float = 1.0, timeout: float = 5.0,
+                 base_url: str = "https://api.telegram.org"):
+        """
+        Args:
+            token (str): Bot token.
+            chat_id (str): Target chat.
+            max_queue (int): Messages waiting to be sent before new ones are dropped.
+            max_retries (int): Retries per message after the first attempt.
+            backoff_seconds (float): First retry delay; doubles on every retry.
+            timeout (float): HTTP timeout per request.
+            base_url (str): API root (a local stub server in tests).
+        """
+        self.url = f"{base_url.rstrip('/')}/bot{token}/sendMessage"
+        self.chat_id = chat_id
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.timeout = timeout
+        self.queue: "queue.Queue[Any]" = queue.Queue(maxsize=max_queue)
+        self.session = requests.Session()
+        self.counters = {'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0}
+        self._closing = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+    def _ensure_worker(self):
+        if self._thread is not None:
+            return
+        with self._thread_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="telegram-dispatch", daemon=True)
+                self._thread.start()
+
+    def submit(self, message: str, parse_mode: Optional[str] = "Markdown") -> bool:
+        """Queue a message. Returns False if it was dropped (queue full or closed)."""
+        if self._closing.is_set():
+            return False
+        self._ensure_worker()
+        payload = {"chat_id": self.chat_id, "text": message}
+        if parse_mode:
+            payload["parse_mode"] = parse_mode
+        try:
+            self.queue.put_nowait(payload)
+            return True
+        except queue.Full:
+            self.counters['dropped'] += 1
+            print(f"[AlertEngine] Telegram queue full; dropped message ({self.counters['dropped']} so far)")
+            return False
+
+    def _worker(self):
+        while True:
+            payload = self.queue.get()
+            try:
+                if payload is _STOP:
+                    return
+                self._post(payload)
+            except Exception as e:
+                self.counters['failed'] += 1
+                print(f"[AlertEngine] Telegram dispatch error: {e}")
+            finally:
+                self.queue.task_done()
+
+    def _retry_delay(self, response: Optional[requests.Response], attempt: int) -> float:
+        """Server-requested delay for 429s, else exponential backoff."""
+        if response is not None and response.status_code == 429:
+            try:
+                return float(response.json()['parameters']['retry_after'])
+            except Exception:
+                retry_after = response.headers.get('Retry-After')
+                if retry_after and retry_after.isdigit():
+                    return float(retry_after)
+        return self.backoff_seconds * (2 ** attempt)
+
+    def _post(self, payload: Dict[str, Any]) -> bool:
+        for attempt in range(self.max_retries + 1):
+            response = None
+            try:
+                response = self.session.post(self.url, json=payload, timeout=self.timeout)
+                if response.status_code == 200:
+                    self.counters['sent'] += 1
+                    return True
+                if response.status_code != 429 and response.status_code < 500:
+                    # Bad request / auth error: retrying will not help
+                    self.counters['failed'] += 1
+                    print(f"[AlertEngine] Telegram Error: {response.text}")
+                    return False
+                error = f"HTTP {response.status_code}"
+            except requests.RequestException as e:
+                error = str(e)
+
+            if attempt == self.max_retries:
+                break
+            self.counters['retries'] += 1
+            # Waiting on the closing event lets close() cut a long backoff short
+            if self._closing.wait(self._retry_delay(response, attempt)):
+                break
+
+        self.counters['failed'] += 1
+        print(f"[AlertEngine] Telegram Connection Failed: {error}")
+        return False
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message has been sent (or given up on). False on timeout."""
+        if self._thread is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.queue.all_tasks_done:
+            while self.queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Send what is queued (up to `timeout` seconds), then stop the worker and the session."""
+        if self._thread is not None and not self._closing.is_set():
+            flushed = self.flush(timeout)
+            self._closing.set()
+            if flushed:
+                self.queue.put(_STOP)
+                self._thread.join(timeout)
+            else:
+                # Discard what is left so the worker stops after the message in flight
+                unsent = 0
+                while True:
+                    try:
+                        self.queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    self.queue.task_done()
+                    unsent += 1
+                self.queue.put(_STOP)
+                print(f"[AlertEngine] Telegram flush timed out; {unsent} messages not sent")
+        self._closing.set()
+        self.session.close()
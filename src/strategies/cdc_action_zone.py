@@ -1,5 +1,54 @@
+import os
+import json
+import threading
 import pandas as pd
 import numpy as np
+from typing import Dict, Any, Optional
+
+# Integer zone codes (int8), the native colour representation
+ZONE_NEUTRAL = 0
+ZONE_GREEN = 1
+ZONE_BLUE = 2
+ZONE_RED = 3
+ZONE_YELLOW = 4
+
+# Lookup tables indexed by zone code
+ZONE_LABELS = ['Neutral', 'Green', 'Blue', 'Red', 'Yellow']
+ZONE_SIGNALS = np.array([0, 1, 0, -1, 0], dtype=np.int8)
+
+
+def ema_matrix(values: np.ndarray, span: int) -> np.ndarray:
+    """
+    EMA along axis 0 (time) for every column at once, same recursion as
+    ewm(span, adjust=False). Leading NaNs stay NaN until a column's first
+    price; a NaN inside a column carries the previous EMA forward.
+    """
+    values = np.asarray(values, dtype=float)
+    alpha = 2.0 / (span + 1)
+    out = np.empty_like(values)
+    prev = values[0].copy()
+    out[0] = prev
+    for t in range(1, len(values)):
+        x = values[t]
+        ema = (1 - alpha) * prev + alpha * x
+        # Column not started yet -> start at x; missing price -> keep previous EMA
+        ema = np.where(np.isnan(prev), x, np.where(np.isnan(x), prev, ema))
+        out[t] = ema
+        prev = ema
+    return out
+
+
+def zone_codes(close: np.ndarray, ema_fast: np.ndarray, ema_slow: np.ndarray) -> np.ndarray:
+    """Vectorized colour rules of CDCActionZone.calculate(), as int8 zone codes."""
+    up = ema_fast > ema_slow
+    down = ema_fast < ema_slow
+    zone = np.full(np.shape(close), ZONE_NEUTRAL, dtype=np.int8)
+    zone[up & (close > ema_fast)] = ZONE_GREEN
+    zone[up & (close <= ema_fast)] = ZONE_BLUE
+    zone[down & (close < ema_fast)] = ZONE_RED
+    zone[down & (close >= ema_fast)] = ZONE_YELLOW
+    return zone
+
 
 class CDCActionZone:
     def __init__(self, slow_period=26, fast_period=12):
@@ -15,7 +64,7 @@ class CDCActionZone:
             close_col (str): The column name for closing prices.
             
         Returns:
-            pd.DataFrame: DataFrame with 'Color' and 'Action_Zone_Signal' columns.
+            pd.DataFrame: DataFrame with 'Zone' (int8 code), 'Color' and 'Action_Zone_Signal' columns.
         """
         if df.empty:
             return df
@@ -30,28 +79,196 @@ class CDCActionZone:
         # Red: EMA12 < EMA26 and Close < EMA12 (Strong Downtrend - Sell)
         # Yellow: EMA12 < EMA26 and Close >= EMA12 (Weak Downtrend - Hold/Rebound)
         
-        conditions = [
-            (df['EMA12'] > df['EMA26']) & (df[close_col] > df['EMA12']), # Green
-            (df['EMA12'] > df['EMA26']) & (df[close_col] <= df['EMA12']),# Blue
-            (df['EMA12'] < df['EMA26']) & (df[close_col] < df['EMA12']), # Red
-            (df['EMA12'] < df['EMA26']) & (df[close_col] >= df['EMA12']) # Yellow
-        ]
-        
-        choices = ['Green', 'Blue', 'Red', 'Yellow']
-        
-        df['Color'] = np.select(conditions, choices, default='Neutral')
+        # 'Zone' (int8 ZONE_* code) is the native representation; compare against it.
+        # 'Color' is a Categorical over the same codes, for reporting.
+        zone = zone_codes(df[close_col].to_numpy(dtype=float), df['EMA12'].to_numpy(), df['EMA26'].to_numpy())
+        df['Zone'] = zone
+        df['Color'] = pd.Categorical.from_codes(zone, categories=ZONE_LABELS)
         
         # Action Zone Signal: 1 (Buy/Green), -1 (Sell/Red), 0 (Neutral)
-        df['Action_Zone_Signal'] = 0
-        df.loc[df['Color'] == 'Green', 'Action_Zone_Signal'] = 1
-        df.loc[df['Color'] == 'Red', 'Action_Zone_Signal'] = -1
+        df['Action_Zone_Signal'] = ZONE_SIGNALS[zone]
         
         return df
 
+    def calculate_matrix(self, close: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Universe-wide CDC in one vectorized pass.
+        
+        Args:
+            close (np.ndarray): (time x symbols) close matrix, NaN where a symbol has no bar.
+            
+        Returns:
+            Dict of (time x symbols) arrays: 'ema_fast', 'ema_slow',
+            'zone' (int8 ZONE_* codes) and 'signal' (int8: 1 Green, -1 Red, 0 otherwise).
+        """
+        close = np.asarray(close, dtype=float)
+        ema_fast = ema_matrix(close, self.fast_period)
+        ema_slow = ema_matrix(close, self.slow_period)
+        zone = zone_codes(close, ema_fast, ema_slow)
+        return {
+            'ema_fast': ema_fast,
+            'ema_slow': ema_slow,
+            'zone': zone,
+            'signal': ZONE_SIGNALS[zone]
+        }
+
+    @staticmethod
+    def classify(close: float, ema_fast: float, ema_slow: float) -> int:
+        """Zone code of a single bar. Same rules as calculate(), for scalar values."""
+        if ema_fast > ema_slow:
+            return ZONE_GREEN if close > ema_fast else ZONE_BLUE
+        if ema_fast < ema_slow:
+            return ZONE_RED if close < ema_fast else ZONE_YELLOW
+        return ZONE_NEUTRAL
+
+
+class IncrementalCDC:
+    """
+    Stateful CDC Action Zone: keeps the last EMA values and colours per symbol
+    so a new bar (or a tick revising the current bar) is an O(1) update
+    instead of an ewm() pass over the whole history.
+    
+    Per-symbol state:
+        date / close / ema_fast / ema_slow / zone  -> the latest bar
+        base_fast / base_slow                      -> EMAs as of the bar before it
+        prev_close / prev_zone                     -> the bar before it
+    
+    The recursion is the one ewm(adjust=False) uses, so zones match
+    CDCActionZone.calculate() on the same bars.
+    """
+
+    def __init__(self, strategy: Optional[CDCActionZone] = None, state_file: Optional[str] = None):
+        self.strategy = strategy or CDCActionZone()
+        self.alpha_fast = 2.0 / (self.strategy.fast_period + 1)
+        self.alpha_slow = 2.0 / (self.strategy.slow_period + 1)
+        self.state_file = state_file
+        self.state: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        
+        if self.state_file:
+            self.load()
+
+    def seed(self, symbol: str, df: pd.DataFrame, close_col='Close') -> Dict[str, Any]:
+        """Initialise a symbol's state from full history (one batch calculate)."""
+        df = self.strategy.calculate(df.copy(), close_col=close_col)
+        last, prev = df.iloc[-1], df.iloc[-2]
+        state = {
+            'date': pd.Timestamp(self._raw_dates(df)[-1]).isoformat(),
+            'close': float(last[close_col]),
+            'ema_fast': float(last['EMA12']),
+            'ema_slow': float(last['EMA26']),
+            'zone': int(last['Zone']),
+            'base_fast': float(prev['EMA12']),
+            'base_slow': float(prev['EMA26']),
+            'prev_close': float(prev[close_col]),
+            'prev_zone': int(prev['Zone'])
+        }
+        with self._lock:
+            self.state[symbol] = state
+        return state
+
+    def update(self, symbol: str, close: float, date: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Feed one price into a seeded symbol.
+        
+        Args:
+            close: Latest close (or last trade price for a bar still forming).
+            date: Bar timestamp (ISO string). None or the current bar's date
+                  revises the current bar; a new date starts a new bar.
+        """
+        with self._lock:
+            state = self.state[symbol]
+            if date is not None and date != state['date']:
+                # New bar: the current bar becomes the previous one
+                state['base_fast'] = state['ema_fast']
+                state['base_slow'] = state['ema_slow']
+                state['prev_close'] = state['close']
+                state['prev_zone'] = state['zone']
+                state['date'] = date
+            
+            close = float(close)
+            a_f, a_s = self.alpha_fast, self.alpha_slow
+            state['ema_fast'] = (1 - a_f) * state['base_fast'] + a_f * close
+            state['ema_slow'] = (1 - a_s) * state['base_slow'] + a_s * close
+            state['close'] = close
+            state['zone'] = CDCActionZone.classify(close, state['ema_fast'], state['ema_slow'])
+            return state
+
+    def sync(self, symbol: str, df: pd.DataFrame, close_col='Close') -> Dict[str, Any]:
+        """
+        Bring a symbol's state up to the end of `df`, feeding only the bars
+        from the last known bar onwards. Falls back to seed() when the symbol
+        is unknown or its last known bar is no longer in `df`.
+        """
+        state = self.state.get(symbol)
+        if state is None or len(df) < 2:
+            return self.seed(symbol, df, close_col=close_col)
+        
+        # Walk back from the end to the last known bar; normally 0-1 steps
+        raw_dates = self._raw_dates(df)
+        start = None
+        for i in range(len(df) - 1, -1, -1):
+            date = pd.Timestamp(raw_dates[i]).isoformat()
+            if date == state['date']:
+                start = i
+                break
+            if date < state['date']:
+                break
+        if start is None:
+            return self.seed(symbol, df, close_col=close_col)
+        
+        closes = df[close_col].to_numpy()
+        for i in range(start, len(df)):
+            state = self.update(symbol, closes[i], pd.Timestamp(raw_dates[i]).isoformat())
+        return state
+
+    def _raw_dates(self, df: pd.DataFrame):
+        if 'Date' in df.columns:
+            return df['Date'].to_numpy()
+        if 'Datetime' in df.columns:
+            return df['Datetime'].to_numpy()
+        return df.index.to_numpy()
+
+    def save(self, path: Optional[str] = None):
+        """Persist all symbol states to JSON."""
+        path = path or self.state_file
+        if not path:
+            return
+        with self._lock:
+            data = {
+                'fast_period': self.strategy.fast_period,
+                'slow_period': self.strategy.slow_period,
+                'symbols': {symbol: dict(state) for symbol, state in self.state.items()}
+            }
+        try:
+            if os.path.dirname(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w') as f:
+                json.dump(data, f)
+        except Exception as e:
+            print(f"[CDC] Error saving incremental state: {e}")
+
+    def load(self, path: Optional[str] = None):
+        """Restore symbol states saved by save(). States for other EMA periods are ignored."""
+        path = path or self.state_file
+        if not path or not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r') as f:
+                data = json.load(f)
+            if (data.get('fast_period') == self.strategy.fast_period
+                    and data.get('slow_period') == self.strategy.slow_period):
+                with self._lock:
+                    # States without zone codes predate them; those symbols are re-seeded
+                    self.state = {symbol: state for symbol, state in data.get('symbols', {}).items()
+                                  if 'zone' in state}
+        except Exception as e:
+            print(f"[CDC] Error loading incremental state: {e}")
+
 if __name__ == "__main__":
     # Test Data
     data = {'Close': [100, 105, 110, 108, 115, 120, 118, 112, 105, 100]}
     df_test = pd.DataFrame(data)
     cdc = CDCActionZone()
     result = cdc.calculate(df_test)
-    print(result[['Close', 'EMA12', 'EMA26', 'Color', 'Action_Zone_Signal']])
+    print(result[['Close', 'EMA12', 'EMA26', 'Zone', 'Color', 'Action_Zone_Signal']])
@@ -1,10 +1,48 @@
 import pandas as pd
 import numpy as np
+from typing import Dict, Iterable, Optional, Tuple
+from src.strategies.range_index import RangeIndex
+from src.strategies.swing_engine import SwingEngine
+
+
+def swing_levels(high_index: RangeIndex, low_index: RangeIndex, window: int,
+                 preceding_low: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Swing High / Swing Low for one lookback, gathered from prebuilt range indexes.
+    Matches SwingEngine (preceding_low=True) or plain rolling max/min (False).
+
+    Args:
+        high_index: RangeIndex(high, 'max').
+        low_index: RangeIndex(low, 'min') over the same bars.
+
+    Returns:
+        (swing_high, swing_low), NaN before the first full window or if the
+        window holds a missing High/Low.
+    """
+    swing_high, hi_idx = high_index.rolling(window)
+    if not preceding_low:
+        return swing_high, low_index.rolling(window)[0]
+    swing_low = np.full(swing_high.shape, np.nan)
+    n = len(high_index)
+    if 0 < window <= n:
+        start = np.arange(n - window + 1)
+        end = np.arange(window - 1, n)
+        # Lowest Low from the window start up to the Swing High bar
+        swing_low[window - 1:] = low_index.query(start, hi_idx[window - 1:])
+        # Like SwingEngine: a missing High or Low anywhere in the window -> NaN
+        missing = low_index.has_nan(start, end) | np.isnan(swing_high[window - 1:])
+        swing_high[window - 1:][missing] = np.nan
+        swing_low[window - 1:][missing] = np.nan
+    return swing_high, swing_low
+
 
 class FiboZoneStrategy:
-    def __init__(self, lookback_period=60):
+    def __init__(self, lookback_period=60, preceding_low=True):
         # lookback_period: timeframe to find the Swing High/Low
         self.lookback = lookback_period
+        # preceding_low: take the Swing Low from before the Swing High (SwingEngine).
+        # False = plain rolling min of the whole window (the original simplification).
+        self.preceding_low = preceding_low
 
     def calculate(self, df: pd.DataFrame, close_col='Close', high_col='High', low_col='Low') -> pd.DataFrame:
         """
@@ -17,16 +55,17 @@ class FiboZoneStrategy:
         # Create copies to avoid SettingWithCopy warnings
         df = df.copy()
 
-        # 1. Identify Swing High (Rolling Max)
+        # 1. Identify Swing High / Swing Low
         # We assume the 'Trend' is the move from a recent Low to the recent High.
-        # This is a simplified dynamic Fibo logic.
-        
-        # Current Swing High over the lookback window
-        df['Swing_High'] = df[high_col].rolling(window=self.lookback).max()
-        
-        # Low of the lookback window (This is a simplification; ideally we find the low *preceding* the high)
-        # For efficiency, we'll take the Rolling Min.
-        df['Swing_Low'] = df[low_col].rolling(window=self.lookback).min()
+        # Swing High = highest High over the lookback window.
+        # Swing Low  = lowest Low *preceding* that high (SwingEngine, O(n)).
+        if self.preceding_low:
+            swings = SwingEngine(self.lookback).compute(df[high_col].to_numpy(), df[low_col].to_numpy())
+            df['Swing_High'] = swings['swing_high']
+            df['Swing_Low'] = swings['swing_low']
+        else:
+            df['Swing_High'] = df[high_col].rolling(window=self.lookback).max()
+            df['Swing_Low'] = df[low_col].rolling(window=self.lookback).min()
         
         df['Range'] = df['Swing_High'] - df['Swing_Low']
         
@@ -83,3 +122,57 @@ class FiboZoneStrategy:
         df.loc[sell_cond_loss, 'Action_Zone_Signal'] = -1   # Stop loss if breaks low
         
         return df
+
+    def calculate_matrix(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                         high_index: Optional[RangeIndex] = None,
+                         low_index: Optional[RangeIndex] = None) -> Dict[str, np.ndarray]:
+        """
+        Universe-wide Fibo zones in one vectorized pass. Same rules as calculate().
+        
+        Args:
+            close, high, low (np.ndarray): (time x symbols) matrices, NaN where a symbol has no bar.
+            high_index, low_index (RangeIndex): Optional prebuilt indexes over high/low,
+                                                to share across lookbacks (see calculate_lookbacks).
+            
+        Returns:
+            Dict of (time x symbols) arrays: 'swing_high', 'swing_low', 'fibo_500',
+            'fibo_786', 'in_zone' (bool) and 'signal' (int8: 1 buy, -1 sell, 0 none).
+        """
+        close = np.asarray(close, dtype=float)
+        high_index = high_index or RangeIndex(high, 'max')
+        low_index = low_index or RangeIndex(low, 'min')
+        swing_high, swing_low = swing_levels(high_index, low_index, self.lookback, self.preceding_low)
+        fibo_range = swing_high - swing_low
+        fibo_500 = swing_high - fibo_range * 0.5
+        fibo_786 = swing_high - fibo_range * 0.786
+        
+        in_zone = (close <= fibo_500) & (close >= fibo_786)
+        signal = in_zone.astype(np.int8)
+        signal[close > fibo_500] = -1  # Take profit when bounces back above 50%
+        signal[close < swing_low] = -1  # Stop loss if breaks low
+        
+        return {
+            'swing_high': swing_high,
+            'swing_low': swing_low,
+            'fibo_500': fibo_500,
+            'fibo_786': fibo_786,
+            'in_zone': in_zone,
+            'signal': signal
+        }
+
+    def calculate_lookbacks(self, close: np.ndarray, high: np.ndarray, low: np.ndarray,
+                            lookbacks: Iterable[int]) -> Dict[int, Dict[str, np.ndarray]]:
+        """
+        calculate_matrix() for many lookback periods. The High/Low range indexes
+        are built once, so each extra lookback is only a gather.
+        
+        Returns:
+            lookback -> calculate_matrix() result
+        """
+        high_index = RangeIndex(high, 'max')
+        low_index = RangeIndex(low, 'min')
+        results = {}
+        for lookback in lookbacks:
+            strategy = FiboZoneStrategy(lookback_period=lookback, preceding_low=self.preceding_low)
+            results[lookback] = strategy.calculate_matrix(close, high, low, high_index, low_index)
+        return results
@@ -0,0 +1,122 @@
+import numpy as np
+from typing import Tuple
+
+
+class RangeIndex:
+    """
+    Sparse table over a price series (or a time x symbols matrix) answering
+    "max / min of bars [start, end]" in O(1) per query after an O(n log n) build.
+
+    Level j holds, for every bar i, the index of the extreme over [i, i + 2^j).
+    Any range is covered by two overlapping power-of-two blocks, so one
+    index serves every lookback: rolling windows of any length, or ranges
+    whose ends differ per bar (e.g. from a window start up to its swing high).
+
+    Ties resolve to the latest bar, as in SwingEngine. Missing values (NaN)
+    never win; ranges that contain one report NaN, like rolling().
+    """
+
+    def __init__(self, values: np.ndarray, mode: str = 'max'):
+        if mode not in ('max', 'min'):
+            raise ValueError(f"Unsupported mode: {mode}")
+        values = np.asarray(values, dtype=float)
+        self._single = values.ndim == 1
+        if self._single:
+            values = values[:, None]
+        self.mode = mode
+        self.values = values
+        n, n_cols = values.shape
+        self._cols = np.arange(n_cols)
+
+        missing = np.isnan(values)
+        self._keys = np.where(missing, -np.inf if mode == 'max' else np.inf, values)
+        self._nan_count = np.zeros((n + 1, n_cols), dtype=np.int64)
+        np.cumsum(missing, axis=0, out=self._nan_count[1:])
+
+        # floor(log2(length)) for every range length 1..n
+        self._log2 = np.zeros(n + 1, dtype=np.int64)
+        self._log2[2:] = np.floor(np.log2(np.arange(2, n + 1))).astype(np.int64)
+
+        levels = max(1, int(n).bit_length())
+        self._table = np.empty((levels, n, n_cols), dtype=np.int32)
+        self._table[0] = np.arange(n)[:, None]
+        for j in range(1, levels):
+            half = 1 << (j - 1)
+            count = n - (1 << j) + 1
+            self._table[j] = self._table[j - 1]  # Tail entries are never queried at this level
+            if count > 0:
+                a = self._table[j - 1, :count]
+                b = self._table[j - 1, half:half + count]
+                self._table[j, :count] = np.where(self._better(b, a), b, a)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def _better(self, b: np.ndarray, a: np.ndarray) -> np.ndarray:
+        """True where bar b should win over bar a (>= keeps the later bar on ties)."""
+        key_a = self._keys[a, self._cols]
+        key_b = self._keys[b, self._cols]
+        return key_b >= key_a if self.mode == 'max' else key_b <= key_a
+
+    def _prepare(self, start, end) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows x columns) start/end arrays; a per-bar vector applies to every column."""
+        start = np.atleast_1d(np.asarray(start, dtype=np.int64))
+        end = np.atleast_1d(np.asarray(end, dtype=np.int64))
+        start = start[:, None] if start.ndim == 1 else start
+        end = end[:, None] if end.ndim == 1 else end
+        return np.broadcast_arrays(start, end, self._cols)[:2]
+
+    def _argquery(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        level = self._log2[end - start + 1]
+        a = self._table[level, start, self._cols]
+        b = self._table[level, end - (1 << level) + 1, self._cols]
+        return np.where(self._better(b, a), b, a)
+
+    def _has_nan(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        return self._nan_count[end + 1, self._cols] > self._nan_count[start, self._cols]
+
+    def _query(self, start: np.ndarray, end: np.ndarray) -> np.ndarray:
+        idx = self._argquery(start, end)
+        return np.where(self._has_nan(start, end), np.nan, self.values[idx, self._cols])
+
+    def _shape(self, result: np.ndarray, start=None, end=None) -> np.ndarray:
+        """Drop the column axis for a single series, and the row axis for a scalar query."""
+        result = result[:, 0] if self._single else result
+        if start is not None and np.ndim(start) == 0 and np.ndim(end) == 0:
+            return result[0]
+        return result
+
+    def argquery(self, start, end) -> np.ndarray:
+        """
+        Index of the extreme over each inclusive range [start, end] (latest on ties).
+
+        Args:
+            start, end: Bar indices (0 <= start <= end < len). For a matrix, pass
+                        per-bar vectors (shared by all columns) or (rows x columns) arrays.
+        """
+        return self._shape(self._argquery(*self._prepare(start, end)), start, end)
+
+    def has_nan(self, start, end) -> np.ndarray:
+        """True where the inclusive range [start, end] contains a missing value."""
+        return self._shape(self._has_nan(*self._prepare(start, end)), start, end)
+
+    def query(self, start, end) -> np.ndarray:
+        """Extreme value over each inclusive range [start, end]; NaN if the range holds a NaN."""
+        return self._shape(self._query(*self._prepare(start, end)), start, end)
+
+    def rolling(self, window: int) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Rolling extreme over the last `window` bars, for every bar.
+
+        Returns:
+            (values: NaN before the first full window or if the window holds a NaN,
+             indices: bar of the extreme, -1 before the first full window)
+        """
+        n = len(self.values)
+        values = np.full(self.values.shape, np.nan)
+        indices = np.full(self.values.shape, -1, dtype=np.int64)
+        if 0 < window <= n:
+            start, end = self._prepare(np.arange(n - window + 1), np.arange(window - 1, n))
+            indices[window - 1:] = self._argquery(start, end)
+            values[window - 1:] = self._query(start, end)
+        return self._shape(values), self._shape(indices)
@@ -0,0 +1,104 @@
+import numpy as np
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+
+class SwingEngine:
+    """
+    Rolling swing-high / preceding swing-low detector in O(n) using monotonic deques.
+
+    For every bar, over the last `lookback` bars:
+        Swing High = highest High in the window (latest bar on ties)
+        Swing Low  = lowest Low from the start of the window up to the Swing High bar,
+                     i.e. the low the move into the high started from.
+
+    As the window slides, the Swing High bar only ever moves forward, so the
+    range searched for the low has two non-decreasing ends and a second
+    monotonic deque answers it in amortized O(1) per bar.
+
+    Use compute() for a whole history, or update() bar by bar in the live loop.
+    """
+
+    def __init__(self, lookback: int = 60):
+        self.lookback = lookback
+        self.reset()
+
+    def reset(self):
+        self._index = -1             # Index of the last bar seen
+        self._max_q = deque()        # (index, high) with decreasing highs: front = Swing High bar
+        self._min_q = deque()        # (index, low) with increasing lows: front = Swing Low bar
+        self._pending = deque()      # (index, low) not yet pushed into _min_q
+        self._last_nan = -1          # Last bar with a missing High/Low
+
+    def update(self, high: float, low: float) -> Optional[Tuple[float, float, int, int]]:
+        """
+        Feed the next bar.
+
+        Returns:
+            (swing_high, swing_low, swing_high_index, swing_low_index), or None
+            until `lookback` bars have been seen (or if the window holds a missing bar).
+            Indices count bars fed since the last reset().
+        """
+        self._index += 1
+        i = self._index
+        start = i - self.lookback + 1
+
+        # Missing prices never win the max/min; windows containing them report None
+        if np.isnan(high) or np.isnan(low):
+            self._last_nan = i
+            high, low = -np.inf, np.inf
+
+        # Max deque: drop bars that can never be the window max again
+        while self._max_q and self._max_q[-1][1] <= high:
+            self._max_q.pop()
+        self._max_q.append((i, high))
+        while self._max_q[0][0] < start:
+            self._max_q.popleft()
+
+        self._pending.append((i, low))
+
+        if start < 0 or self._last_nan >= start:
+            return None
+
+        hi_idx, hi_val = self._max_q[0]
+
+        # Min deque covers [start, hi_idx]; extend its right end up to the high bar
+        while self._pending and self._pending[0][0] <= hi_idx:
+            j, value = self._pending.popleft()
+            while self._min_q and self._min_q[-1][1] >= value:
+                self._min_q.pop()
+            self._min_q.append((j, value))
+        while self._min_q[0][0] < start:
+            self._min_q.popleft()
+
+        lo_idx, lo_val = self._min_q[0]
+        return hi_val, lo_val, hi_idx, lo_idx
+
+    def compute(self, high: np.ndarray, low: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Batch mode over a whole history.
+
+        Returns:
+            Dict of arrays: 'swing_high', 'swing_low' (NaN before the first full
+            window) and 'swing_high_idx', 'swing_low_idx' (-1 where undefined).
+        """
+        high = np.asarray(high, dtype=float)
+        low = np.asarray(low, dtype=float)
+        n = len(high)
+        swing_high = np.full(n, np.nan)
+        swing_low = np.full(n, np.nan)
+        high_idx = np.full(n, -1, dtype=np.int64)
+        low_idx = np.full(n, -1, dtype=np.int64)
+
+        engine = SwingEngine(self.lookback)
+        for i in range(n):
+            result = engine.update(high[i], low[i])
+            if result is not None:
+                swing_high[i], swing_low[i], high_idx[i], low_idx[i] = result
+
+        return {
+            'swing_high': swing_high,
+            'swing_low': swing_low,
+            'swing_high_idx': high_idx,
+            'swing_low_idx': low_idx
+        }
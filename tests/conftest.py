@@ -0,0 +1,45 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Tests import the app the way the run_*.py scripts do: `src.` from the repo root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def make_history(n_bars: int = 300, seed: int = 0, start: str = "2022-01-03") -> pd.DataFrame:
+    """Random-walk daily OHLCV in the shape MarketData.get_history returns ('Date' column)."""
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n_bars)))
+    spread = close * rng.uniform(0.002, 0.03, n_bars)
+    return pd.DataFrame({
+        'Date': pd.bdate_range(start, periods=n_bars),
+        'Open': close * (1 + rng.normal(0, 0.005, n_bars)),
+        'High': close + spread,
+        'Low': close - spread,
+        'Close': close,
+        'Volume': rng.integers(1_000_000, 5_000_000, n_bars)
+    })
+
+
+@pytest.fixture
+def history():
+    return make_history()
+
+
+@pytest.fixture
+def histories():
+    """Symbols with different lengths and start dates, so the aligned matrix has gaps."""
+    return {
+        'AAA': make_history(300, seed=1),
+        'BBB': make_history(260, seed=2, start="2022-02-14"),
+        'CCC': make_history(280, seed=3).drop(index=[50, 51, 120]).reset_index(drop=True)
+    }
+
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    """Run every test in a scratch directory, so default data/ paths never touch the repo."""
+    monkeypatch.chdir(tmp_path)
@@ -0,0 +1,86 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.engine.backtest_engine as backtest_engine
+from src.data.market_data import MarketData
+from src.data.strategy_stats import StrategyStats
+from src.engine.backtest_engine import BacktestEngine
+from src.strategies.cdc_action_zone import CDCActionZone
+from src.strategies.fibo_strategy import FiboZoneStrategy
+
+
+def reference_simulate(df: pd.DataFrame, initial_capital: float):
+    """The original iterrows() loop of BacktestEngine.run, plus the equity it implied per bar."""
+    trades, equity = [], []
+    position, capital, shares = 0, initial_capital, 0
+    for index, row in df.iterrows():
+        signal, price = row['Action_Zone_Signal'], row['Close']
+        date = row['Date'] if 'Date' in row else index
+        if position == 0 and signal == 1:
+            position, shares = 1, capital / price
+            trades.append({'Date': date, 'Type': 'BUY', 'Price': price, 'Shares': shares,
+                           'Value': capital, 'PnL': 0.0})
+        elif position == 1 and signal == -1:
+            position = 0
+            new_capital = shares * price
+            pnl, capital = new_capital - capital, new_capital
+            trades.append({'Date': date, 'Type': 'SELL', 'Price': price, 'Shares': shares,
+                           'Value': capital, 'PnL': pnl})
+        equity.append(shares * price if position == 1 else capital)
+    return pd.DataFrame(trades), np.array(equity)
+
+
+@pytest.fixture
+def engine():
+    return BacktestEngine(initial_capital=10000.0)
+
+
+@pytest.mark.parametrize('strategy', [CDCActionZone(), FiboZoneStrategy(lookback_period=20)])
+def test_simulate_matches_iterrows_loop(engine, history, strategy):
+    df = strategy.calculate(history.copy())
+    trades, equity = engine.simulate(df)
+    expected_trades, expected_equity = reference_simulate(df, engine.initial_capital)
+
+    assert len(trades) > 2
+    pd.testing.assert_frame_equal(trades, expected_trades, check_dtype=False)
+    np.testing.assert_allclose(equity, expected_equity, rtol=1e-12)
+
+
+def test_simulate_without_entries(engine, history):
+    df = history.assign(Action_Zone_Signal=-1)
+    trades, equity = engine.simulate(df)
+    assert trades.empty
+    assert (equity == engine.initial_capital).all()
+
+
+def test_positions_follow_the_last_nonzero_signal():
+    signal = np.array([0, -1, 1, 0, 0, -1, 0, 1, 1, -1])
+    assert BacktestEngine.positions(signal).tolist() == [0, 0, 1, 1, 1, 0, 0, 1, 1, 0]
+    matrix = np.stack([signal, -signal], axis=1)
+    np.testing.assert_array_equal(BacktestEngine.positions(matrix)[:, 0], BacktestEngine.positions(signal))
+    np.testing.assert_array_equal(BacktestEngine.positions(matrix)[:, 1], BacktestEngine.positions(-signal))
+
+
+def test_run_many_matches_run(monkeypatch, histories):
+    # Serve the fixtures instead of downloading, and run the pool in-process
+    monkeypatch.setattr(MarketData, 'get_history', lambda self, symbol, period="1y", interval="1d":
+                        histories[symbol].copy())
+    monkeypatch.setattr(MarketData, 'get_history_many', lambda self, symbols, period="1y": {})
+    monkeypatch.setattr(backtest_engine, 'ProcessPoolExecutor', ThreadPoolExecutor)
+    engine = BacktestEngine()
+    stats = StrategyStats(state_file=None)
+
+    summary, all_trades = engine.run_many(list(histories), CDCActionZone(), stats=stats)
+
+    assert summary['Symbol'].tolist() == list(histories)
+    for symbol in histories:
+        trades, df = engine.run(symbol, CDCActionZone())
+        row = summary.set_index('Symbol').loc[symbol]
+        assert row['Trades'] == len(trades)
+        assert np.isclose(row['Final Value'], df['Equity'].iloc[-1])
+        pd.testing.assert_frame_equal(all_trades[all_trades['Symbol'] == symbol].drop(columns='Symbol')
+                                      .reset_index(drop=True), trades)
+    assert len(stats.stats) == len(histories)
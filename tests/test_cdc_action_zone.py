@@ -0,0 +1,27 @@
+import numpy as np
+import pandas as pd
+
+from src.strategies.cdc_action_zone import CDCActionZone, ZONE_LABELS
+
+
+def reference_colors(close: pd.Series, fast: int = 12, slow: int = 26) -> pd.Series:
+    """The original string-based colour rules (before zone codes)."""
+    ema_fast = close.ewm(span=fast, adjust=False).mean()
+    ema_slow = close.ewm(span=slow, adjust=False).mean()
+    color = pd.Series('Neutral', index=close.index)
+    color[(ema_fast > ema_slow) & (close > ema_fast)] = 'Green'
+    color[(ema_fast > ema_slow) & (close <= ema_fast)] = 'Blue'
+    color[(ema_fast < ema_slow) & (close < ema_fast)] = 'Red'
+    color[(ema_fast < ema_slow) & (close >= ema_fast)] = 'Yellow'
+    return color
+
+
+def test_zone_codes_match_string_rules(history):
+    df = CDCActionZone().calculate(history.copy())
+    expected = reference_colors(history['Close'])
+
+    assert df['Zone'].dtype == np.int8
+    assert (df['Color'].astype(str) == expected).all()
+    assert (np.array(ZONE_LABELS)[df['Zone']] == expected.to_numpy()).all()
+    signal = np.select([expected == 'Green', expected == 'Red'], [1, -1], 0)
+    assert (df['Action_Zone_Signal'].to_numpy() == signal).all()
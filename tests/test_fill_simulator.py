@@ -0,0 +1,137 @@
+import time
+
+import numpy as np
+import pytest
+
+from src.execution.fill_simulator import FILLED, REJECTED, UNFILLED, FillSimulator
+from src.execution.order_manager import OrderManager
+
+
+def order(symbol='AAA', action='BUY', quantity=10, order_type='MARKET', limit_price=None,
+          reference_price=100.0, signal_time=1000.0):
+    return {'order_id': f"{symbol}-{action}-{quantity}", 'symbol': symbol, 'action': action, 'quantity': quantity,
+            'order_type': order_type, 'limit_price': limit_price, 'reference_price': reference_price,
+            'signal_time': signal_time, 'status': 'PENDING'}
+
+
+@pytest.fixture
+def simulator():
+    return FillSimulator(slippage_bps=10.0, spread_bps=4.0, commission_per_share=0.01,
+                         commission_min=1.0, commission_pct=0.0)
+
+
+def test_without_quotes_limit_orders_fill_at_their_limit(simulator):
+    result = simulator.simulate([order(order_type='LIMIT', limit_price=100.0),
+                                 order(symbol='BBB', action='SELL', order_type='LIMIT', limit_price=50.0,
+                                       reference_price=50.0)],
+                                holdings={'BBB': 10})
+    assert result['status'].tolist() == [FILLED, FILLED]
+    assert result['fill_price'].tolist() == [100.0, 50.0]
+
+
+def test_order_manager_fills_limit_orders_without_quotes():
+    manager = OrderManager(cash_balance=10000.0, state_file=None)
+    limit_buy = order(order_type='LIMIT', limit_price=100.0)
+    manager.execute_orders([limit_buy], None)
+
+    assert limit_buy['status'] == FILLED
+    assert manager.working_orders == []
+    assert manager.portfolio == {'AAA': 10}
+
+
+def test_without_quotes_unpriced_orders_are_rejected(simulator):
+    result = simulator.simulate([order(reference_price=None)])
+    assert result['status'].tolist() == [REJECTED]
+    assert np.isnan(result['fill_price'][0])
+    assert UNFILLED not in result['status']
+
+
+def quote(price=100.0, open_=None, high=None, low=None, at=2000.0):
+    return {'open': price if open_ is None else open_, 'high': price if high is None else high,
+            'low': price if low is None else low, 'close': price, 'time': at}
+
+
+def test_market_orders_pay_spread_slippage_and_commission(simulator):
+    orders = [order(), order(symbol='BBB', action='SELL', quantity=500)]
+    result = simulator.simulate(orders, {'AAA': quote(), 'BBB': quote(50.0)}, holdings={'BBB': 500})
+
+    # Half of the 4 bps spread plus 10 bps slippage, against the trader
+    np.testing.assert_allclose(result['fill_price'], [100.0 * 1.0012, 50.0 * 0.9988])
+    # $0.01 a share with a $1 minimum
+    np.testing.assert_allclose(result['commission'], [1.0, 5.0])
+    np.testing.assert_allclose(result['cash_delta'], [-1001.2 - 1.0, 500 * 49.94 - 5.0])
+
+
+def test_commission_percentage_of_notional():
+    simulator = FillSimulator(slippage_bps=0.0, spread_bps=0.0, commission_per_share=0.0,
+                              commission_min=0.0, commission_pct=0.1)
+    result = simulator.simulate([order(quantity=20)], {'AAA': quote()})
+    assert np.isclose(result['commission'][0], 2.0)
+    assert np.isclose(result['cash_delta'][0], -2002.0)
+
+
+def test_limit_orders_fill_only_when_touched_through_the_spread(simulator):
+    orders = [order(order_type='LIMIT', limit_price=99.0),
+              order(symbol='BBB', order_type='LIMIT', limit_price=99.0),
+              order(symbol='CCC', order_type='LIMIT', limit_price=99.0),
+              order(symbol='DDD', action='SELL', order_type='LIMIT', limit_price=101.0)]
+    quotes = {'AAA': quote(100.0, low=98.9),             # Ask at the low 98.92: touched
+              'BBB': quote(100.0, low=99.0),             # Ask at the low 99.02: not touched
+              'CCC': quote(98.0),                        # Gapped below the limit: fills at the open's ask
+              'DDD': quote(100.0, high=101.05)}          # Bid at the high 101.03: touched
+    result = simulator.simulate(orders, quotes, holdings={'DDD': 10})
+
+    assert result['status'].tolist() == [FILLED, UNFILLED, FILLED, FILLED]
+    np.testing.assert_allclose(result['fill_price'][[0, 2, 3]], [99.0, 98.0 * 1.0002, 101.0])
+    assert np.isnan(result['fill_price'][1]) and result['cash_delta'][1] == 0.0
+
+
+def test_quotes_at_or_before_the_signal_bar_never_fill(simulator):
+    orders = [order(signal_time=2000.0), order(symbol='BBB', signal_time=1999.0), order(symbol='CCC')]
+    quotes = {'AAA': quote(at=2000.0), 'BBB': quote(at=2000.0), 'CCC': {'close': 100.0}}
+    result = simulator.simulate(orders, quotes)
+
+    # The signal's own bar stays working; a later quote (or one without a time) fills
+    assert result['status'].tolist() == [UNFILLED, FILLED, FILLED]
+
+
+def test_cash_is_allocated_in_batch_order(simulator):
+    orders = [order(quantity=60), order(symbol='BBB', quantity=60),
+              order(symbol='CCC', action='SELL', quantity=100), order(symbol='DDD', quantity=60)]
+    result = simulator.simulate(orders, {s: quote() for s in ('AAA', 'BBB', 'CCC', 'DDD')},
+                                cash=10000.0, holdings={'CCC': 100})
+
+    # BBB does not fit after AAA; CCC's proceeds fund DDD
+    assert result['status'].tolist() == [FILLED, REJECTED, FILLED, FILLED]
+    assert result['cash_delta'][1] == 0.0
+
+
+def test_working_orders_carry_over_until_filled(simulator):
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", fill_simulator=simulator)
+    limit_buy = order(order_type='LIMIT', limit_price=95.0)
+    manager.execute_orders([limit_buy], {'AAA': quote()})
+    assert limit_buy['status'] == UNFILLED
+    assert [o['order_id'] for o in manager.working_orders] == [limit_buy['order_id']]
+
+    # Restored from the journal and retried without being passed again
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", fill_simulator=simulator)
+    manager.execute_orders([], {'AAA': quote(100.0, at=3000.0)})
+    assert len(manager.working_orders) == 1
+    manager.execute_orders([], {'AAA': quote(96.0, low=94.0, at=4000.0)})
+
+    assert manager.working_orders == []
+    assert manager.portfolio == {'AAA': 10}
+    assert np.isclose(manager.cash_balance, 10000.0 - 950.0 - 1.0)
+    assert OrderManager(cash_balance=0.0, state_file="data/state.json").working_orders == []
+
+
+def test_stale_working_orders_expire():
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", working_order_max_age=60.0)
+    limit_buy = dict(order(order_type='LIMIT', limit_price=95.0), timestamp=time.time() - 120.0)
+    manager.execute_orders([limit_buy], {'AAA': quote()})
+    assert len(manager.working_orders) == 1
+
+    manager.execute_orders([], {'AAA': quote(90.0, at=3000.0)})
+    assert limit_buy['status'] == 'EXPIRED'
+    assert manager.working_orders == [] and manager.portfolio == {}
+    assert OrderManager(cash_balance=10000.0, state_file="data/state.json").working_orders == []
@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.strategies.cdc_action_zone import CDCActionZone, IncrementalCDC
+
+from conftest import make_history
+
+
+def test_classify_matches_zone_codes(history):
+    df = CDCActionZone().calculate(history.copy())
+    scalar = [CDCActionZone.classify(c, f, s) for c, f, s in zip(df['Close'], df['EMA12'], df['EMA26'])]
+    assert (np.array(scalar) == df['Zone'].to_numpy()).all()
+
+
+def test_incremental_sync_matches_full_calculation(history):
+    strategy = CDCActionZone()
+    incremental = IncrementalCDC(strategy)
+    incremental.seed('AAA', history.iloc[:60])
+
+    # Feed the rest bar by bar, as the live loop sees it
+    for end in range(61, len(history) + 1):
+        state = incremental.sync('AAA', history.iloc[:end])
+
+    full = strategy.calculate(history.copy())
+    assert np.isclose(state['ema_fast'], full['EMA12'].iloc[-1], rtol=1e-10)
+    assert np.isclose(state['ema_slow'], full['EMA26'].iloc[-1], rtol=1e-10)
+    assert state['zone'] == full['Zone'].iloc[-1]
+    assert state['prev_zone'] == full['Zone'].iloc[-2]
+    assert state['close'] == full['Close'].iloc[-1]
+
+
+def test_incremental_update_revises_the_forming_bar(history):
+    strategy = CDCActionZone()
+    incremental = IncrementalCDC(strategy)
+    incremental.seed('AAA', history.iloc[:-1])
+
+    # Ticks on a new bar: only the last one may count
+    date = history['Date'].iloc[-1].isoformat()
+    incremental.update('AAA', history['Close'].iloc[-1] * 1.05, date)
+    incremental.update('AAA', history['Close'].iloc[-1] * 0.95)
+    state = incremental.update('AAA', history['Close'].iloc[-1], date)
+
+    full = strategy.calculate(history.copy())
+    assert np.isclose(state['ema_fast'], full['EMA12'].iloc[-1], rtol=1e-10)
+    assert np.isclose(state['ema_slow'], full['EMA26'].iloc[-1], rtol=1e-10)
+    assert state['zone'] == full['Zone'].iloc[-1]
+
+
+def test_incremental_reseeds_when_history_is_replaced(history):
+    incremental = IncrementalCDC()
+    incremental.seed('AAA', history)
+    other = make_history(200, seed=7, start="2024-01-02")
+    state = incremental.sync('AAA', other)
+
+    full = CDCActionZone().calculate(other.copy())
+    assert state['date'] == other['Date'].iloc[-1].isoformat()
+    assert np.isclose(state['ema_slow'], full['EMA26'].iloc[-1], rtol=1e-10)
+
+
+def test_incremental_state_round_trip(tmp_path, history):
+    path = str(tmp_path / "cdc_state.json")
+    incremental = IncrementalCDC(state_file=path)
+    incremental.seed('AAA', history)
+    incremental.save()
+
+    assert IncrementalCDC(state_file=path).state == incremental.state
+    # State saved for other EMA periods is not reused
+    assert IncrementalCDC(CDCActionZone(slow_period=30), state_file=path).state == {}
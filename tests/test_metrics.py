@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.metrics import compute_metrics
+from src.strategies.cdc_action_zone import CDCActionZone
+
+
+def reference_metrics(equity: np.ndarray, position: np.ndarray, periods_per_year: int = 252):
+    """compute_metrics() written out trade by trade and bar by bar."""
+    rets = equity[1:] / equity[:-1] - 1
+    peak, max_dd, since_peak, max_dd_bars = equity[0], 0.0, 0, 0
+    for value in equity:
+        if value >= peak:
+            peak, since_peak = value, 0
+        else:
+            since_peak += 1
+        max_dd = min(max_dd, value / peak - 1)
+        max_dd_bars = max(max_dd_bars, since_peak)
+
+    trade_returns, holds, entry = [], [], None
+    for i, held in enumerate(position):
+        if held and entry is None:
+            entry = i
+        elif not held and entry is not None:
+            trade_returns.append(equity[i] / equity[entry] - 1)
+            holds.append(i - entry)
+            entry = None
+    trade_returns = np.array(trade_returns)
+    wins = trade_returns[trade_returns > 0]
+    return {
+        'total_return_pct': (equity[-1] / equity[0] - 1) * 100,
+        'sharpe': rets.mean() / rets.std(ddof=1) * np.sqrt(periods_per_year),
+        'max_drawdown_pct': max_dd * 100,
+        'max_drawdown_bars': max_dd_bars,
+        'exposure_pct': np.mean(position) * 100,
+        'trades': len(trade_returns),
+        'win_rate_pct': len(wins) / len(trade_returns) * 100,
+        'avg_holding_bars': np.mean(holds)
+    }
+
+
+@pytest.fixture
+def engine():
+    return BacktestEngine(initial_capital=10000.0)
+
+
+def test_compute_metrics_matches_reference(engine, history):
+    df = CDCActionZone(slow_period=20, fast_period=5).calculate(history.copy())
+    _, equity = engine.simulate(df)
+    position = BacktestEngine.positions(df['Action_Zone_Signal'].to_numpy())
+    metrics = compute_metrics(equity, position)
+
+    for key, value in reference_metrics(equity, position).items():
+        assert np.isclose(metrics[key], value, rtol=1e-9), key
+
+
+def test_compute_metrics_columns_match_single_curves(engine, histories):
+    strategy = CDCActionZone()
+    curves, positions = [], []
+    for df in histories.values():
+        df = strategy.calculate(df.copy()).iloc[-200:]
+        curves.append(engine.simulate(df)[1])
+        positions.append(BacktestEngine.positions(df['Action_Zone_Signal'].to_numpy()))
+    batch = compute_metrics(np.stack(curves, axis=1), np.stack(positions, axis=1))
+
+    for k, (equity, position) in enumerate(zip(curves, positions)):
+        single = compute_metrics(equity, position)
+        for key, value in single.items():
+            np.testing.assert_allclose(batch[key][k], value, rtol=1e-12, err_msg=key)
@@ -0,0 +1,115 @@
+import json
+import os
+
+from src.execution.order_journal import OrderJournal
+from src.execution.order_manager import OrderManager
+from src.execution.trade_store import TradeStore
+
+
+def order(symbol='AAA', action='BUY', quantity=10, limit_price=100.0):
+    return {'order_id': f"{symbol}-{action}-{quantity}", 'symbol': symbol, 'action': action, 'quantity': quantity,
+            'order_type': 'LIMIT', 'limit_price': limit_price, 'reference_price': limit_price,
+            'signal_time': 1000.0, 'status': 'PENDING'}
+
+
+def journal_seqs(path: str) -> list:
+    with open(path) as f:
+        return [json.loads(line)['seq'] for line in f if line.strip()]
+
+
+def test_seq_continues_after_the_history_when_the_snapshot_is_lost():
+    store = TradeStore(":memory:")
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", trade_store=store)
+    manager.execute_orders([order('AAA')], None)
+    manager.save_state()
+    os.remove("data/state.json")
+
+    # Snapshot gone, history kept: new events must not reuse seq 1
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", trade_store=store)
+    assert manager.journal.seq == 1
+    manager.execute_orders([order('BBB')], None)
+    manager.save_state()
+
+    assert journal_seqs("data/order_history.jsonl") == [1, 2]
+    assert store.last_seq() == 2
+    assert [p['symbol'] for p in store.positions()] == ['AAA', 'BBB']
+
+
+def test_seq_continues_after_a_stale_snapshot():
+    journal = OrderJournal("j.jsonl", "h.jsonl", "snap.json")
+    journal.tail(0)
+    for _ in range(3):
+        journal.append({'type': 'cancel', 'order_id': 'x'})
+
+    # A snapshot older than the journal (e.g. restored from a backup)
+    journal = OrderJournal("j.jsonl", "h.jsonl", "snap.json")
+    assert len(journal.tail(1)) == 2
+    assert journal.append({'type': 'cancel', 'order_id': 'y'})['seq'] == 4
+
+
+def state(manager: OrderManager) -> tuple:
+    return manager.cash_balance, manager.portfolio, manager.working_orders
+
+
+def test_replay_restores_fills_after_the_snapshot():
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json")
+    manager.execute_orders([order('AAA')], None)
+    manager.save_state()
+    manager.execute_orders([order('BBB', limit_price=50.0), order('AAA', action='SELL', quantity=4)], None)
+
+    # Crash before the next snapshot: the journal tail replays on top of it
+    restored = OrderManager(cash_balance=0.0, state_file="data/state.json")
+    assert restored.journal.pending == 2
+    assert state(restored) == state(manager)
+    assert restored.portfolio == {'AAA': 6, 'BBB': 10}
+
+
+def test_compaction_moves_the_journal_into_the_history():
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json", snapshot_every=2)
+    manager.execute_orders([order('AAA'), order('BBB', limit_price=50.0)], None)
+
+    # snapshot_every reached: snapshot written, journal emptied
+    assert os.path.getsize("data/order_journal.jsonl") == 0
+    assert journal_seqs("data/order_history.jsonl") == [1, 2]
+    with open("data/state.json") as f:
+        assert json.load(f)['journal_seq'] == 2
+
+    manager.execute_orders([order('CCC', limit_price=20.0)], None)
+    assert [e['seq'] for e in manager.journal.history()] == [1, 2, 3]
+    restored = OrderManager(cash_balance=0.0, state_file="data/state.json")
+    assert restored.journal.pending == 1
+    assert state(restored) == state(manager)
+
+
+def test_torn_last_line_is_dropped_on_replay():
+    manager = OrderManager(cash_balance=10000.0, state_file="data/state.json")
+    manager.execute_orders([order('AAA')], None)
+    with open("data/order_journal.jsonl", 'a') as f:
+        f.write('{"seq":2,"ts":1.0,"type":"fi')   # Crash mid-append
+
+    restored = OrderManager(cash_balance=10000.0, state_file="data/state.json")
+    assert state(restored) == state(manager)
+    assert restored.journal.seq == 1
+
+    # The next event starts on its own line instead of being glued to the torn one
+    restored.execute_orders([order('BBB', limit_price=50.0)], None)
+    assert journal_seqs("data/order_journal.jsonl") == [1, 2]
+    assert OrderManager(cash_balance=0.0, state_file="data/state.json").portfolio == {'AAA': 10, 'BBB': 10}
+
+
+def test_compaction_after_a_crash_does_not_duplicate_history():
+    journal = OrderJournal("j.jsonl", "h.jsonl", "snap.json")
+    journal.tail(0)
+    for _ in range(3):
+        journal.append({'type': 'cancel', 'order_id': 'x'})
+    # Crash after the history append, before the snapshot and journal reset
+    with open("j.jsonl") as src, open("h.jsonl", 'w') as dst:
+        dst.write(src.read())
+
+    journal = OrderJournal("j.jsonl", "h.jsonl", "snap.json")
+    journal.tail(0)
+    journal.append({'type': 'cancel', 'order_id': 'y'})
+    journal.compact({})
+
+    assert journal_seqs("h.jsonl") == [1, 2, 3, 4]
+    assert [e['seq'] for e in journal.history()] == [1, 2, 3, 4]
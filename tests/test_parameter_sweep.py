@@ -0,0 +1,76 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.metrics import compute_metrics
+from src.engine.parameter_sweep import CDCParameterSweep
+from src.strategies.cdc_action_zone import CDCActionZone
+
+
+METRICS = ['total_return_pct', 'cagr_pct', 'sharpe', 'max_drawdown_pct', 'exposure_pct',
+           'trades', 'win_rate_pct', 'avg_holding_bars']
+
+
+def single_run_metrics(df: pd.DataFrame, strategy) -> dict:
+    """One parameter set on one symbol through the per-symbol path."""
+    df = strategy.calculate(df.copy())
+    _, equity = BacktestEngine(initial_capital=10000.0).simulate(df)
+    return compute_metrics(equity, BacktestEngine.positions(df['Action_Zone_Signal'].to_numpy()))
+
+
+def assert_metrics_equal(row: pd.Series, expected: dict, keys=METRICS):
+    for key in keys:
+        if np.isnan(expected[key]):
+            assert np.isnan(row[key]), key
+        else:
+            assert np.isclose(row[key], expected[key], rtol=1e-9), key
+
+
+@pytest.fixture
+def engine():
+    return BacktestEngine(initial_capital=10000.0)
+
+
+def test_cdc_pairs_skip_fast_not_below_slow():
+    assert CDCParameterSweep.pairs([5, 12, 26], [12, 26]) == [(5, 12), (5, 26), (12, 26)]
+
+
+def test_equity_matrix_matches_simulate(engine, histories):
+    strategy = CDCActionZone()
+    for df in histories.values():
+        df = strategy.calculate(df.copy())
+        _, equity = engine.simulate(df)
+        close = df['Close'].to_numpy()[:, None]
+        position = BacktestEngine.positions(df['Action_Zone_Signal'].to_numpy())[:, None]
+        matrix = BacktestEngine.equity_matrix(close, position, engine.initial_capital)
+        np.testing.assert_allclose(matrix[:, 0], equity, rtol=1e-10)
+
+
+def test_cdc_sweep_matches_per_pair_backtests(histories):
+    ranked, detail = CDCParameterSweep().run(histories, [5, 12], [20, 26])
+    assert len(detail) == 4 * len(histories)
+
+    for fast, slow in CDCParameterSweep.pairs([5, 12], [20, 26]):
+        strategy = CDCActionZone(slow_period=slow, fast_period=fast)
+        rows = detail[(detail['fast'] == fast) & (detail['slow'] == slow)].set_index('symbol')
+        # AAA spans the whole matrix, so its curve is bar-for-bar the single-symbol one
+        assert_metrics_equal(rows.loc['AAA'], single_run_metrics(histories['AAA'], strategy))
+        # BBB only gains flat bars before its first price: same trades and return
+        assert_metrics_equal(rows.loc['BBB'], single_run_metrics(histories['BBB'], strategy),
+                             ['total_return_pct', 'trades', 'win_rate_pct', 'avg_holding_bars'])
+        # CCC's missing bars carry its EMAs and position: same trades and return
+        assert_metrics_equal(rows.loc['CCC'], single_run_metrics(histories['CCC'], strategy),
+                             ['total_return_pct', 'trades', 'win_rate_pct'])
+
+
+def test_sweep_ranking_averages_symbols(histories):
+    ranked, detail = CDCParameterSweep().run(histories, [5, 12], [20, 26], sort_by='total_return_pct')
+    expected = detail.groupby(['fast', 'slow'])['total_return_pct'].mean()
+
+    assert ranked['rank'].tolist() == [1, 2, 3, 4]
+    assert ranked['total_return_pct'].is_monotonic_decreasing
+    for _, row in ranked.iterrows():
+        assert np.isclose(row['total_return_pct'], expected.loc[(row['fast'], row['slow'])])
+        assert row['trades'] == detail[(detail['fast'] == row['fast'])
+                                       & (detail['slow'] == row['slow'])]['trades'].sum()
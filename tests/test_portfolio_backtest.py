@@ -0,0 +1,23 @@
+import numpy as np
+
+from src.engine.portfolio_backtest import PortfolioBacktester
+from src.strategies.cdc_action_zone import CDCActionZone
+
+
+def test_portfolio_backtest_accounting(histories):
+    result = PortfolioBacktester(initial_capital=50000.0).run(histories, CDCActionZone())
+    trades = result['trades']
+    assert (trades['Type'] == 'BUY').any()
+
+    # Replaying the trades never spends cash that is not there
+    cash = 50000.0
+    for _, trade in trades.sort_values('Date', kind='stable').iterrows():
+        cash += trade['Value'] if trade['Type'] == 'SELL' else -trade['Value']
+        assert cash >= -1e-6
+
+    # Final equity = cash + open positions at their last mark
+    open_value = sum(p['shares'] * p['mark'] for p in result['positions'].values())
+    assert np.isclose(result['final_value'], cash + open_value)
+    realised = trades.loc[trades['Type'] == 'SELL', 'PnL'].sum()
+    unrealised = sum(p['shares'] * (p['mark'] - p['entry']) for p in result['positions'].values())
+    assert np.isclose(result['final_value'], 50000.0 + realised + unrealised)
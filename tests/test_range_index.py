@@ -0,0 +1,103 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.market_data import MarketData
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.metrics import compute_metrics
+from src.engine.parameter_sweep import FiboLookbackSweep
+from src.strategies.fibo_strategy import FiboZoneStrategy, swing_levels
+from src.strategies.range_index import RangeIndex
+from src.strategies.swing_engine import SwingEngine
+
+
+METRICS = ['total_return_pct', 'cagr_pct', 'sharpe', 'max_drawdown_pct', 'exposure_pct',
+           'trades', 'win_rate_pct', 'avg_holding_bars']
+
+
+def single_run_metrics(df: pd.DataFrame, strategy) -> dict:
+    """One parameter set on one symbol through the per-symbol path."""
+    df = strategy.calculate(df.copy())
+    _, equity = BacktestEngine(initial_capital=10000.0).simulate(df)
+    return compute_metrics(equity, BacktestEngine.positions(df['Action_Zone_Signal'].to_numpy()))
+
+
+def assert_metrics_equal(row: pd.Series, expected: dict, keys=METRICS):
+    for key in keys:
+        if np.isnan(expected[key]):
+            assert np.isnan(row[key]), key
+        else:
+            assert np.isclose(row[key], expected[key], rtol=1e-9), key
+
+
+@pytest.mark.parametrize('mode', ['max', 'min'])
+def test_range_index_matches_rolling(history, mode):
+    values = history['High' if mode == 'max' else 'Low'].to_numpy(copy=True)
+    values[42] = np.nan
+    index = RangeIndex(values, mode)
+    for window in (1, 2, 17, 60, len(values)):
+        rolled = getattr(pd.Series(values).rolling(window), mode)().to_numpy()
+        np.testing.assert_array_equal(index.rolling(window)[0], rolled)
+
+
+def test_range_index_arbitrary_ranges_and_matrix():
+    rng = np.random.default_rng(5)
+    values = rng.normal(size=(200, 3))
+    index = RangeIndex(values, 'min')
+    start = rng.integers(0, 200, 500)
+    end = np.minimum(start + rng.integers(0, 80, 500), 199)
+    result = index.query(start, end)
+    for k in range(len(start)):
+        np.testing.assert_array_equal(result[k], values[start[k]:end[k] + 1].min(axis=0))
+    assert index.query(3, 3).tolist() == values[3].tolist()
+
+
+@pytest.mark.parametrize('lookback', [10, 60])
+def test_swing_levels_match_swing_engine(history, lookback):
+    high, low = history['High'].to_numpy(copy=True), history['Low'].to_numpy(copy=True)
+    low[77] = np.nan
+    swing_high, swing_low = swing_levels(RangeIndex(high, 'max'), RangeIndex(low, 'min'), lookback)
+    expected = SwingEngine(lookback).compute(high, low)
+    np.testing.assert_array_equal(swing_high, expected['swing_high'])
+    np.testing.assert_array_equal(swing_low, expected['swing_low'])
+
+
+def test_calculate_lookbacks_matches_single_lookbacks(histories):
+    close = MarketData.to_matrix(histories, 'Close').to_numpy()
+    high = MarketData.to_matrix(histories, 'High').to_numpy()
+    low = MarketData.to_matrix(histories, 'Low').to_numpy()
+    results = FiboZoneStrategy().calculate_lookbacks(close, high, low, [20, 45, 60])
+    for lookback, result in results.items():
+        expected = FiboZoneStrategy(lookback_period=lookback).calculate_matrix(close, high, low)
+        for key in ('swing_high', 'swing_low', 'signal'):
+            np.testing.assert_array_equal(result[key], expected[key])
+
+
+@pytest.mark.parametrize('preceding_low', [True, False])
+def test_fibo_sweep_matches_per_lookback_backtests(histories, preceding_low):
+    _, detail = FiboLookbackSweep(preceding_low=preceding_low).run(histories, [20, 60])
+
+    for lookback in (20, 60):
+        strategy = FiboZoneStrategy(lookback_period=lookback, preceding_low=preceding_low)
+        row = detail[detail['lookback'] == lookback].set_index('symbol').loc['AAA']
+        assert_metrics_equal(row, single_run_metrics(histories['AAA'], strategy))
+
+
+def test_fibo_sweep_evaluates_gapped_symbols_on_their_own_bars(histories):
+    sweep = FiboLookbackSweep()
+    stack = sweep.signals(histories, [20, 60])
+    _, detail = sweep.run(histories, [20, 60])
+    j = stack['symbols'].index('CCC')
+    rows = stack['dates'].get_indexer(histories['CCC']['Date'])
+    missing = np.setdiff1d(np.arange(len(stack['dates'])), rows)
+
+    for k, lookback in enumerate((20, 60)):
+        strategy = FiboZoneStrategy(lookback_period=lookback)
+        df = strategy.calculate(histories['CCC'].copy())
+        column = stack['signal'][:, k * len(stack['symbols']) + j]
+        assert (column[rows] == df['Action_Zone_Signal'].to_numpy()).all()
+        assert (column[missing] == 0).all()
+        # Missing bars only add flat bars: same trades and return
+        row = detail[detail['lookback'] == lookback].set_index('symbol').loc['CCC']
+        assert_metrics_equal(row, single_run_metrics(histories['CCC'], strategy),
+                             ['total_return_pct', 'trades', 'win_rate_pct'])
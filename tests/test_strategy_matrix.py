@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+
+from src.data.market_data import MarketData
+from src.strategies.cdc_action_zone import CDCActionZone, ema_matrix, zone_codes
+from src.strategies.fibo_strategy import FiboZoneStrategy
+
+
+def test_ema_matrix_matches_ewm(history):
+    close = history['Close'].to_numpy()
+    expected = history['Close'].ewm(span=12, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ema_matrix(close[:, None], 12)[:, 0], expected, rtol=1e-12)
+
+
+def test_zone_codes_broadcast_over_matrix():
+    close = np.array([[10.0, 10.0], [12.0, 8.0]])
+    fast = np.array([[11.0, 9.0], [11.0, 9.0]])
+    slow = np.array([[10.0, 10.0], [10.0, 10.0]])
+    assert zone_codes(close, fast, slow).tolist() == [[2, 4], [1, 3]]
+
+
+def test_cdc_matrix_matches_per_symbol_calculate(histories):
+    strategy = CDCActionZone(slow_period=21, fast_period=8)
+    close_df = MarketData.to_matrix(histories, 'Close')
+    result = strategy.calculate_matrix(close_df.to_numpy())
+
+    for j, symbol in enumerate(close_df.columns):
+        df = strategy.calculate(histories[symbol].copy())
+        rows = close_df.index.get_indexer(df['Date'])
+        np.testing.assert_allclose(result['ema_fast'][rows, j], df['EMA12'], rtol=1e-12)
+        np.testing.assert_allclose(result['ema_slow'][rows, j], df['EMA26'], rtol=1e-12)
+        assert (result['zone'][rows, j] == df['Zone'].to_numpy()).all()
+        assert (result['signal'][rows, j] == df['Action_Zone_Signal'].to_numpy()).all()
+
+
+@pytest.mark.parametrize('preceding_low', [True, False])
+def test_fibo_matrix_matches_per_symbol_calculate(histories, preceding_low):
+    strategy = FiboZoneStrategy(lookback_period=30, preceding_low=preceding_low)
+    close_df = MarketData.to_matrix(histories, 'Close')
+    high = MarketData.to_matrix(histories, 'High').to_numpy()
+    low = MarketData.to_matrix(histories, 'Low').to_numpy()
+    result = strategy.calculate_matrix(close_df.to_numpy(), high, low)
+
+    # Symbols without gaps see the same windows as in their own frame (CCC has missing bars)
+    for symbol in ('AAA', 'BBB'):
+        j = close_df.columns.get_loc(symbol)
+        df = strategy.calculate(histories[symbol])
+        rows = close_df.index.get_indexer(df['Date'])
+        np.testing.assert_array_equal(result['swing_high'][rows, j], df['Swing_High'])
+        np.testing.assert_array_equal(result['swing_low'][rows, j], df['Swing_Low'])
+        assert (result['signal'][rows, j] == df['Action_Zone_Signal'].to_numpy()).all()
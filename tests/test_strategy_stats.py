@@ -0,0 +1,44 @@
+import pytest
+
+from src.data.strategy_stats import StrategyStats
+from src.engine.scanner import MarketScanner
+from src.strategies.cdc_action_zone import CDCActionZone
+
+
+def entry(stats: StrategyStats, symbol: str = 'AAA', strategy: str = 'Scanner_CDC') -> dict:
+    return {k: v for k, v in stats.stats[stats._key(symbol, strategy)].items() if k != 'updated_at'}
+
+
+@pytest.mark.parametrize('incremental', [None, 'cdc_state.json'])
+def test_scans_feed_every_completed_bar_once(history, incremental):
+    stats = StrategyStats(state_file=None)
+    scanner = MarketScanner(incremental_state_file=incremental, stats=stats)
+
+    # A new symbol, a scan after missed sessions, then the usual one new bar
+    for end in (200, 230, 231, 231):
+        scanner._evaluate_symbol('AAA', history.iloc[:end].copy(), scanner._empty_results())
+
+    # Same bars applied in one pass; the last (forming) bar never counts
+    df = CDCActionZone().calculate(history.iloc[:231].copy())
+    expected = StrategyStats(state_file=None)
+    expected.update_bars('AAA', 'Scanner_CDC', df['Date'].to_numpy()[:-1], df['Close'].to_numpy()[:-1],
+                         df['Action_Zone_Signal'].to_numpy()[:-1])
+
+    assert entry(expected)['trades'] > 0
+    assert entry(stats) == entry(expected)
+    assert stats.last_date('AAA', 'Scanner_CDC') == df['Date'].iloc[-2].isoformat()
+
+
+def test_scans_continue_after_the_backtest(history):
+    stats = StrategyStats(state_file=None)
+    stats.record_backtest('AAA', 'Scanner_CDC', None, last_date=history['Date'].iloc[249])
+    scanner = MarketScanner(stats=stats)
+    scanner._evaluate_symbol('AAA', history.copy(), scanner._empty_results())
+
+    # Bars 250 .. second-to-last applied, nothing before the backtest's end
+    df = CDCActionZone().calculate(history.copy())
+    expected = StrategyStats(state_file=None)
+    expected.record_backtest('AAA', 'Scanner_CDC', None, last_date=history['Date'].iloc[249])
+    expected.update_bars('AAA', 'Scanner_CDC', df['Date'].to_numpy()[250:-1], df['Close'].to_numpy()[250:-1],
+                         df['Action_Zone_Signal'].to_numpy()[250:-1])
+    assert entry(stats) == entry(expected)
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.strategies.fibo_strategy import FiboZoneStrategy
+from src.strategies.swing_engine import SwingEngine
+
+
+def brute_force_swings(high: np.ndarray, low: np.ndarray, lookback: int):
+    """Swing High (latest on ties) and the lowest Low up to it, window by window."""
+    n = len(high)
+    swing_high = np.full(n, np.nan)
+    swing_low = np.full(n, np.nan)
+    for i in range(lookback - 1, n):
+        start = i - lookback + 1
+        window_high, window_low = high[start:i + 1], low[start:i + 1]
+        if np.isnan(window_high).any() or np.isnan(window_low).any():
+            continue
+        hi = start + len(window_high) - 1 - int(np.argmax(window_high[::-1]))
+        swing_high[i] = high[hi]
+        swing_low[i] = low[start:hi + 1].min()
+    return swing_high, swing_low
+
+
+def reference_fibo_signal(df: pd.DataFrame, lookback: int) -> np.ndarray:
+    """The original rolling max/min FiboZoneStrategy.calculate()."""
+    swing_high = df['High'].rolling(window=lookback).max()
+    swing_low = df['Low'].rolling(window=lookback).min()
+    fibo_range = swing_high - swing_low
+    fibo_500 = swing_high - fibo_range * 0.5
+    fibo_786 = swing_high - fibo_range * 0.786
+    signal = pd.Series(0, index=df.index)
+    signal[(df['Close'] <= fibo_500) & (df['Close'] >= fibo_786)] = 1
+    signal[df['Close'] > fibo_500] = -1
+    signal[df['Close'] < swing_low] = -1
+    return signal.to_numpy()
+
+
+@pytest.mark.parametrize('lookback', [1, 5, 60])
+def test_swing_engine_matches_brute_force(history, lookback):
+    high, low = history['High'].to_numpy(copy=True), history['Low'].to_numpy(copy=True)
+    high[100] = np.nan
+    result = SwingEngine(lookback).compute(high, low)
+    expected_high, expected_low = brute_force_swings(high, low, lookback)
+
+    np.testing.assert_array_equal(result['swing_high'], expected_high)
+    np.testing.assert_array_equal(result['swing_low'], expected_low)
+    valid = ~np.isnan(expected_high)
+    assert (high[result['swing_high_idx'][valid]] == expected_high[valid]).all()
+    assert (low[result['swing_low_idx'][valid]] == expected_low[valid]).all()
+
+
+def test_swing_engine_keeps_latest_high_on_ties():
+    high = np.array([5.0, 7.0, 6.0, 7.0, 4.0])
+    low = np.array([1.0, 3.0, 0.5, 2.0, 1.0])
+    result = SwingEngine(4).compute(high, low)
+    assert result['swing_high_idx'].tolist() == [-1, -1, -1, 3, 3]
+    # Low from the window start up to the latest 7.0, not the lowest overall
+    assert result['swing_low'][4] == 0.5
+
+
+def test_rolling_mode_matches_original_strategy(history):
+    df = FiboZoneStrategy(lookback_period=40, preceding_low=False).calculate(history)
+    assert (df['Action_Zone_Signal'].to_numpy() == reference_fibo_signal(history, 40)).all()
@@ -0,0 +1,214 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.notification.telegram_dispatcher import TelegramDispatcher
+
+
+class StubTelegram:
+    """
+    Local stand-in for api.telegram.org. Each POST is recorded and answered
+    with the next scripted (status, body) reply; once the script runs out,
+    every request gets 200. Set `gate` to hold requests until it is released.
+    """
+
+    def __init__(self):
+        self.script = []
+        self.requests = []          # (monotonic time, path, json payload)
+        self.gate = None
+        self.received = threading.Condition()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+                with stub.received:
+                    stub.requests.append((time.monotonic(), self.path, payload))
+                    stub.received.notify_all()
+                    status, body = stub.script.pop(0) if stub.script else (200, {'ok': True})
+                if stub.gate is not None:
+                    stub.gate.wait(10)
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def wait_for(self, count: int, timeout: float = 5.0) -> bool:
+        with self.received:
+            return self.received.wait_for(lambda: len(self.requests) >= count, timeout)
+
+    def close(self):
+        if self.gate is not None:
+            self.gate.set()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubTelegram()
+    yield server
+    server.close()
+
+
+def make_dispatcher(stub, **kwargs):
+    options = {'max_retries': 3, 'backoff_seconds': 0.01, 'timeout': 5.0}
+    options.update(kwargs)
+    return TelegramDispatcher("TOKEN", "42", base_url=stub.url, **options)
+
+
+def test_posts_message_payload(stub):
+    dispatcher = make_dispatcher(stub)
+    assert dispatcher.submit("*hello*")
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    _, path, payload = stub.requests[0]
+    assert path == "/botTOKEN/sendMessage"
+    assert payload == {'chat_id': "42", 'text': "*hello*", 'parse_mode': "Markdown"}
+    assert dispatcher.counters == {'sent': 1, 'failed': 0, 'dropped': 0, 'retries': 0}
+
+
+def test_server_errors_are_retried_with_backoff(stub):
+    stub.script = [(500, {'ok': False}), (502, {'ok': False})]
+    dispatcher = make_dispatcher(stub, backoff_seconds=0.1)
+    dispatcher.submit("retry me")
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    assert len(stub.requests) == 3
+    assert dispatcher.counters['sent'] == 1
+    assert dispatcher.counters['retries'] == 2
+    # Exponential: 0.1s, then 0.2s
+    gaps = [b[0] - a[0] for a, b in zip(stub.requests, stub.requests[1:])]
+    assert gaps[0] >= 0.1
+    assert gaps[1] >= 0.2
+
+
+def test_gives_up_after_max_retries(stub):
+    stub.script = [(503, {'ok': False})] * 10
+    dispatcher = make_dispatcher(stub, max_retries=2)
+    dispatcher.submit("never delivered")
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    assert len(stub.requests) == 3
+    assert dispatcher.counters['failed'] == 1
+    assert dispatcher.counters['sent'] == 0
+
+
+def test_rate_limit_honours_retry_after(stub):
+    stub.script = [(429, {'ok': False, 'error_code': 429, 'parameters': {'retry_after': 0.3}})]
+    # Backoff far longer than retry_after: the retry must follow the server's delay
+    dispatcher = make_dispatcher(stub, backoff_seconds=30)
+    dispatcher.submit("slow down")
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    assert len(stub.requests) == 2
+    gap = stub.requests[1][0] - stub.requests[0][0]
+    assert 0.3 <= gap < 5
+    assert dispatcher.counters['sent'] == 1
+    assert dispatcher.counters['retries'] == 1
+
+
+def test_bad_request_is_dropped_without_retry(stub):
+    stub.script = [(400, {'ok': False, 'description': "Bad Request: can't parse entities"})]
+    dispatcher = make_dispatcher(stub)
+    dispatcher.submit("_unbalanced")
+    dispatcher.submit("next message")
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+    assert [payload['text'] for _, _, payload in stub.requests] == ["_unbalanced", "next message"]
+    assert dispatcher.counters == {'sent': 1, 'failed': 1, 'dropped': 0, 'retries': 0}
+
+
+def test_full_queue_drops_new_messages(stub):
+    stub.gate = threading.Event()
+    dispatcher = make_dispatcher(stub, max_queue=2)
+    assert dispatcher.submit("in flight")
+    assert stub.wait_for(1)                 # Worker is now blocked on the first post
+    assert dispatcher.submit("queued 1")
+    assert dispatcher.submit("queued 2")
+    assert not dispatcher.submit("dropped")
+    assert dispatcher.counters['dropped'] == 1
+
+    stub.gate.set()
+    assert dispatcher.flush(5)
+    dispatcher.close()
+    assert [payload['text'] for _, _, payload in stub.requests] == ["in flight", "queued 1", "queued 2"]
+    assert dispatcher.counters['sent'] == 3
+
+
+def test_submit_does_not_wait_for_the_network(stub):
+    stub.gate = threading.Event()
+    dispatcher = make_dispatcher(stub)
+    started = time.monotonic()
+    for i in range(5):
+        dispatcher.submit(f"message {i}")
+    assert time.monotonic() - started < 0.5
+    stub.gate.set()
+    assert dispatcher.flush(5)
+    dispatcher.close()
+    assert dispatcher.counters['sent'] == 5
+
+
+def test_flush_times_out_while_blocked(stub):
+    stub.gate = threading.Event()
+    dispatcher = make_dispatcher(stub)
+    dispatcher.submit("stuck")
+    assert stub.wait_for(1)
+    assert not dispatcher.flush(0.2)
+    stub.gate.set()
+    assert dispatcher.flush(5)
+    dispatcher.close()
+
+
+def test_close_sends_queued_messages_and_stops(stub):
+    dispatcher = make_dispatcher(stub)
+    for i in range(3):
+        dispatcher.submit(f"message {i}")
+    dispatcher.close(timeout=5)
+
+    assert len(stub.requests) == 3
+    assert not dispatcher._thread.is_alive()
+    assert not dispatcher.submit("after close")
+
+
+def test_close_cuts_a_long_backoff_short(stub):
+    stub.script = [(500, {'ok': False})] * 10
+    dispatcher = make_dispatcher(stub, backoff_seconds=30)
+    dispatcher.submit("failing")
+    dispatcher.submit("never sent")
+    assert stub.wait_for(1)
+    started = time.monotonic()
+    dispatcher.close(timeout=0.2)
+    dispatcher._thread.join(5)
+
+    assert time.monotonic() - started < 5
+    assert not dispatcher._thread.is_alive()
+    # The message in flight gives up; the one still queued is discarded
+    assert dispatcher.counters['failed'] == 1
+    assert len(stub.requests) == 1
+    assert dispatcher.queue.unfinished_tasks == 0
+
+
+def test_flush_and_close_without_messages():
+    dispatcher = TelegramDispatcher("TOKEN", "42", base_url="http://127.0.0.1:9")
+    assert dispatcher.flush(0.1)
+    dispatcher.close(timeout=0.1)
+    assert dispatcher._thread is None
@@ -0,0 +1,88 @@
+from src.execution.order_journal import OrderJournal
+from src.execution.trade_store import TradeStore
+
+
+def fill(seq, symbol='AAA', action='BUY', quantity=10, price=100.0, commission=1.0, strategy='Scanner_CDC'):
+    order = {'order_id': f"{symbol}-{seq}", 'symbol': symbol, 'action': action, 'quantity': quantity,
+             'order_type': 'LIMIT', 'limit_price': price, 'filled_price': price, 'status': 'FILLED',
+             'strategy': strategy, 'timestamp': 1000.0 + seq}
+    sign = -1 if action == 'BUY' else 1
+    return {'seq': seq, 'ts': 1000.0 + seq, 'type': 'fill', 'order': order, 'symbol': symbol,
+            'quantity': quantity, 'cash_delta': sign * quantity * price - commission, 'commission': commission}
+
+
+EVENTS = [fill(1), {'seq': 2, 'ts': 1002.0, 'type': 'cancel', 'order_id': 'x'},
+          fill(3, 'BBB', price=50.0), fill(4, action='SELL', quantity=4, price=110.0),
+          fill(5, action='SELL', quantity=6, price=90.0)]
+
+
+def snapshot(store: TradeStore) -> tuple:
+    return (store.positions(), store.symbol_pnl(), store.strategy_summary(),
+            store._rows("SELECT * FROM fills ORDER BY seq"), store._rows("SELECT * FROM cash_ledger ORDER BY seq"))
+
+
+def test_sync_imports_only_events_after_the_watermark():
+    store = TradeStore(":memory:")
+    assert store.sync(EVENTS[:2]) == 1
+    assert store.last_seq() == 2
+
+    # The whole history again: events up to the watermark are skipped
+    assert store.sync(EVENTS) == 3
+    assert store.sync(EVENTS) == 0
+    assert store.last_seq() == 5
+
+    full = TradeStore(":memory:")
+    full.sync(EVENTS)
+    assert snapshot(store) == snapshot(full)
+
+
+def test_realized_pnl_against_average_cost():
+    store = TradeStore(":memory:")
+    store.sync(EVENTS)
+
+    # Bought 10 @ 100 + $1: avg 100.1; sold 4 @ 110 and 6 @ 90, $1 each
+    aaa = {row['symbol']: row for row in store.symbol_pnl()}['AAA']
+    assert aaa['position'] == 0 and aaa['closed_trades'] == 2 and aaa['win_rate'] == 50.0
+    assert abs(aaa['realized_pnl'] - ((110 - 100.1) * 4 - 1 + (90 - 100.1) * 6 - 1)) < 1e-9
+    assert store.positions() == [{'symbol': 'BBB', 'quantity': 10, 'avg_price': 50.1,
+                                  'realized_pnl': 0.0, 'updated_ts': 1003.0}]
+
+
+def test_record_event_refuses_gaps_until_synced():
+    store = TradeStore(":memory:")
+    assert store.record_event(EVENTS[0])
+    assert store.record_event(EVENTS[0])          # Already stored
+    assert not store.record_event(EVENTS[2])      # seq 2 missing
+    assert store.last_seq() == 1 and len(store.positions()) == 1
+
+    # The journal backfills the gap and the refused event
+    assert store.sync(EVENTS[:3]) == 1
+    assert store.last_seq() == 3
+    assert [p['symbol'] for p in store.positions()] == ['AAA', 'BBB']
+
+
+def test_store_written_before_the_watermark_is_rebuilt():
+    store = TradeStore(":memory:")
+    store.sync(EVENTS[:3])
+    with store.conn:
+        store.conn.execute("DELETE FROM sync_state")   # Legacy store: fills, no watermark
+    assert not store.record_event(EVENTS[3])
+
+    assert store.sync(EVENTS) == 4
+    full = TradeStore(":memory:")
+    full.sync(EVENTS)
+    assert snapshot(store) == snapshot(full)
+
+
+def test_deleted_store_is_rebuilt_from_the_journal_history():
+    journal = OrderJournal("data/j.jsonl", "data/h.jsonl", "data/state.json", snapshot_every=2)
+    journal.tail(0)
+    for event in EVENTS:
+        journal.append({k: v for k, v in event.items() if k not in ('seq', 'ts')})
+        if journal.needs_compaction():
+            journal.compact({})
+
+    store = TradeStore("data/trades.db")
+    assert store.sync(journal.history()) == 4
+    assert store.last_seq() == 5
+    assert store.strategy_summary()[0]['fills'] == 4
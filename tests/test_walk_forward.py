@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import src.engine.walk_forward as walk_forward
+from src.engine.backtest_engine import BacktestEngine
+from src.engine.parameter_sweep import CDCParameterSweep
+from src.engine.walk_forward import WalkForwardOptimizer
+
+
+def test_stacked_signals_are_causal(histories):
+    """Signals over a prefix of history equal the prefix of the full-history signals."""
+    sweep = CDCParameterSweep()
+    full = sweep.signals(histories, [5, 12], [20, 26])
+    cutoff = full['dates'][150]
+    truncated = sweep.signals({symbol: df[df['Date'] <= cutoff] for symbol, df in histories.items()},
+                              [5, 12], [20, 26])
+    np.testing.assert_array_equal(truncated['signal'], full['signal'][:151])
+
+
+@pytest.fixture
+def in_process_pool(monkeypatch):
+    monkeypatch.setattr(walk_forward, 'ProcessPoolExecutor', ThreadPoolExecutor)
+
+
+def test_walk_forward_windows():
+    optimizer = WalkForwardOptimizer(train_bars=100, test_bars=40, step_bars=30)
+    assert optimizer.windows(220) == [(0, 100, 140), (30, 130, 170), (60, 160, 200)]
+    assert WalkForwardOptimizer(train_bars=100, test_bars=40).windows(139) == []
+
+
+def test_walk_forward_picks_in_sample_best_and_trades_it_out_of_sample(in_process_pool, histories):
+    histories = {symbol: histories[symbol] for symbol in ('AAA', 'CCC')}
+    sweep = CDCParameterSweep()
+    stack = sweep.signals(histories, [5, 12], [20, 26])
+    optimizer = WalkForwardOptimizer(train_bars=120, test_bars=50, objective='total_return_pct')
+    result = optimizer.run(stack)
+    windows = result['windows']
+    assert len(windows) == len(optimizer.windows(len(stack['close'])))
+
+    engine = BacktestEngine(initial_capital=10000.0)
+    close_df = sweep.market_data.to_matrix(histories, 'Close').ffill()
+    for (start, train_end, test_end), (_, row) in zip(optimizer.windows(len(close_df)), windows.iterrows()):
+        # In-sample: best pair by mean return over symbols, each traded from flat on the train bars
+        scores = {}
+        for k, pair in enumerate(stack['grid']):
+            returns = []
+            for j in range(len(stack['symbols'])):
+                df = pd.DataFrame({'Close': close_df.iloc[start:train_end, j].to_numpy(),
+                                   'Action_Zone_Signal': stack['signal'][start:train_end, k * 2 + j]})
+                _, equity = engine.simulate(df)
+                returns.append((equity[-1] / equity[0] - 1) * 100)
+            scores[pair] = np.mean(returns)
+        best = max(scores, key=scores.get)
+        assert (row['fast'], row['slow']) == best
+        assert np.isclose(row['is_total_return_pct'], scores[best])
+
+    # Out-of-sample equity chains the test periods back to back
+    assert len(result['oos_equity']) == len(windows) * optimizer.step_bars
+    assert result['oos_equity'].index.is_monotonic_increasing
+    assert list(result['oos_metrics'].index) == stack['symbols']
+
+
+def test_walk_forward_without_enough_history(in_process_pool, histories):
+    stack = CDCParameterSweep().signals(histories, [5], [20])
+    result = WalkForwardOptimizer(train_bars=1000, test_bars=100).run(stack)
+    assert result['windows'].empty and result['oos_equity'].empty